@@ -86,3 +86,45 @@ def test_corpus_save_and_load(tmpdir, corpus):
     assert new_corpus[0].spacy_doc.user_data['textacy'].get('spacy_lang_meta') is None
     for i in range(len(new_corpus)):
         assert new_corpus[i].metadata == corpus[i].metadata
+
+
+def test_corpus_attach_doc_term_matrix():
+    texts = list(DATASET.texts(limit=10))
+    corpus = Corpus('en', texts=texts[:3])
+    dtm = corpus.attach_doc_term_matrix(ngrams=1, named_entities=False)
+
+    def assert_aligned():
+        assert dtm.n_docs == len(corpus)
+        assert dtm.matrix.shape[0] == len(corpus)
+        expected = dtm.vectorizer.transform(
+            doc.to_terms_list(ngrams=1, named_entities=False, as_strings=True)
+            for doc in corpus)
+        assert dtm.matrix.shape == expected.shape
+        assert (dtm.matrix != expected).nnz == 0
+
+    assert_aligned()
+    corpus.add_text(texts[3])
+    assert_aligned()
+    corpus.add_texts(texts[4:9], batch_size=2)
+    assert_aligned()
+    del corpus[1]
+    assert_aligned()
+    del corpus[2:5]
+    assert_aligned()
+    corpus.add_doc(Doc(texts[9], lang=corpus.spacy_lang))
+    assert_aligned()
+    assert len(corpus) == 6
+    # docs that fail to be added to the matrix aren't added to the corpus either
+    tokenizer = dtm.tokenizer
+
+    def bad_tokenizer(doc):
+        raise RuntimeError()
+
+    dtm.tokenizer = bad_tokenizer
+    with pytest.raises(RuntimeError):
+        corpus.add_text(texts[0])
+    with pytest.raises(RuntimeError):
+        corpus.add_texts(texts[:2])
+    dtm.tokenizer = tokenizer
+    assert len(corpus) == 6
+    assert_aligned()
@@ -139,6 +139,16 @@ def test_named_entities_drop_determiners(spacy_doc):
     assert all(ent.label_ for ent in ents)
 
 
+def test_named_entities_as_offsets(spacy_doc):
+    for drop_determiners in (True, False):
+        expected = [
+            (ent.start, ent.end, ent.label_)
+            for ent in extract.named_entities(spacy_doc, drop_determiners=drop_determiners)]
+        observed = list(extract.named_entities(
+            spacy_doc, drop_determiners=drop_determiners, as_offsets=True))
+        assert observed == expected
+
+
 def test_noun_chunks(spacy_doc):
     expected = [
         'I', 'Kuwait', 'I.M.F. seminar', 'Arab educators', '30 minutes', 'we',
@@ -164,6 +174,15 @@ def test_noun_chunks_min_freq(spacy_doc):
     assert observed == expected
 
 
+def test_noun_chunks_as_offsets(spacy_doc):
+    expected = [
+        (nc.start, nc.end) for nc in extract.noun_chunks(spacy_doc, drop_determiners=True)]
+    observed = [
+        offset[:2] for offset in extract.noun_chunks(
+            spacy_doc, drop_determiners=True, as_offsets=True)]
+    assert observed == expected
+
+
 def test_pos_regex_matches(spacy_doc):
     expected = [
         'Two weeks', 'Kuwait', 'an I.M.F. seminar', 'Arab educators',
@@ -210,3 +229,25 @@ def test_direct_quotations(spacy_doc):
         ', '.join(item.text for item in triple)
         for triple in extract.direct_quotations(spacy_doc)]
     assert observed == expected
+
+
+def test_batch(spacy_doc):
+    entities = list(extract.named_entities(spacy_doc, drop_determiners=True))
+    cols = extract.batch(
+        [spacy_doc, spacy_doc], extract.named_entities, normalize='lower',
+        drop_determiners=True)
+    assert all(len(col) == 2 * len(entities) for col in cols.values())
+    assert cols['doc_idx'].tolist() == [0] * len(entities) + [1] * len(entities)
+    assert cols['start'].tolist()[:len(entities)] == [ent.start for ent in entities]
+    assert cols['end'].tolist()[:len(entities)] == [ent.end for ent in entities]
+    stringstore = spacy_doc.vocab.strings
+    assert [stringstore[id_] for id_ in cols['norm'][:len(entities)]] == [
+        ent.lower_ for ent in entities]
+
+
+def test_batch_n_jobs(spacy_doc):
+    expected = extract.batch([spacy_doc] * 3, extract.words, normalize='lower')
+    observed = extract.batch(
+        [spacy_doc] * 3, extract.words, normalize='lower', n_jobs=2, chunk_size=1)
+    for name, col in expected.items():
+        assert observed[name].tolist() == col.tolist()
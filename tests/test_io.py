@@ -308,6 +308,93 @@ def test_read_write_sparse_matrix_csc_compressed(tmpdir):
     assert abs(observed - expected).nnz == 0
 
 
+def test_read_write_sparse_matrix_chunks_csr(tmpdir):
+    expected = sp.csr_matrix(
+        (np.array([1, 2, 3, 4, 5, 6]),
+         (np.array([0, 0, 1, 2, 2, 2]), np.array([0, 2, 2, 0, 1, 2]))),
+        shape=(3, 3))
+    dirname = str(tmpdir.join('test_read_write_sparse_matrix_chunks_csr'))
+    shape = io.write_sparse_matrix_chunks((expected[:1], expected[1:2]), dirname)
+    assert shape == (2, 3)
+    shape = io.write_sparse_matrix_chunks((expected[2:], ), dirname, mode='a')
+    assert shape == (3, 3)
+    for mmap in (False, True):
+        observed = io.read_sparse_matrix(dirname, kind='csr', mmap=mmap)
+        assert abs(observed - expected).nnz == 0
+    assert isinstance(np.load(os.path.join(dirname, 'data.npy'), mmap_mode='r'), np.memmap)
+
+
+def test_read_write_sparse_matrix_chunks_csc(tmpdir):
+    expected = sp.csc_matrix(
+        (np.array([1, 2, 3, 4, 5, 6]),
+         (np.array([0, 0, 1, 2, 2, 2]), np.array([0, 2, 2, 0, 1, 2]))),
+        shape=(3, 3))
+    dirname = str(tmpdir.join('test_read_write_sparse_matrix_chunks_csc'))
+    shape = io.write_sparse_matrix_chunks((expected[:, :2], expected[:, 2:]), dirname)
+    assert shape == (3, 3)
+    observed = io.read_sparse_matrix(dirname, kind='csc', mmap=True)
+    assert abs(observed - expected).nnz == 0
+
+
+def test_write_sparse_matrix_chunks_upcast_indices(tmpdir):
+    expected = sp.csr_matrix(np.arange(12).reshape(4, 3))
+    block = expected[2:]
+    block.indices = block.indices.astype(np.int64)
+    block.indptr = block.indptr.astype(np.int64)
+    dirname = str(tmpdir.join('test_write_sparse_matrix_chunks_upcast_indices'))
+    _ = io.write_sparse_matrix_chunks((expected[:2], block), dirname)
+    assert np.load(os.path.join(dirname, 'indices.npy')).dtype == np.int64
+    assert np.load(os.path.join(dirname, 'indptr.npy')).dtype == np.int64
+    observed = io.read_sparse_matrix(dirname, kind='csr')
+    assert abs(observed - expected).nnz == 0
+
+
+def test_write_sparse_matrix_chunks_dtypes(tmpdir):
+    expected = sp.csr_matrix(np.arange(12, dtype=np.int32).reshape(4, 3))
+    dirname = str(tmpdir.join('test_write_sparse_matrix_chunks_dtypes'))
+    # an empty matrix takes on the dtypes of blocks appended to it
+    assert io.write_sparse_matrix_chunks((), dirname) == (0, 0)
+    _ = io.write_sparse_matrix_chunks((expected[:2], ), dirname, mode='a')
+    assert np.load(os.path.join(dirname, 'data.npy')).dtype == np.int32
+    # but values are upcast, rather than truncated, to fit wider blocks
+    _ = io.write_sparse_matrix_chunks((expected[2:] / 2, ), dirname, mode='a')
+    assert np.load(os.path.join(dirname, 'data.npy')).dtype == np.float64
+    observed = io.read_sparse_matrix(dirname, kind='csr')
+    assert observed[:2].toarray().tolist() == expected[:2].toarray().tolist()
+    assert observed[2:].toarray().tolist() == (expected[2:] / 2).toarray().tolist()
+
+
+def test_write_sparse_matrix_chunks_mismatch(tmpdir):
+    dirname = str(tmpdir.join('test_write_sparse_matrix_chunks_mismatch'))
+    with pytest.raises(ValueError):
+        io.write_sparse_matrix_chunks((sp.csr_matrix((2, 3)), sp.csr_matrix((2, 4))), dirname)
+    with pytest.raises(TypeError):
+        io.write_sparse_matrix_chunks((sp.csr_matrix((2, 3)), sp.csc_matrix((2, 3))), dirname)
+
+
+def test_write_sparse_matrix_chunks_failure(tmpdir):
+    expected = sp.csr_matrix(np.arange(20, dtype=np.int32).reshape(5, 4))
+    dirname = str(tmpdir.join('test_write_sparse_matrix_chunks_failure'))
+    _ = io.write_sparse_matrix_chunks((expected, ), dirname)
+
+    def bad_blocks():
+        yield expected[:2]
+        yield expected[2:] / 2  # upcasts values on disk
+        raise RuntimeError()
+
+    # a failed write leaves the matrix already on disk as it was
+    with pytest.raises(ValueError):
+        io.write_sparse_matrix_chunks(
+            (expected[:2], expected[:2], sp.csr_matrix((2, 7))), dirname, mode='a')
+    for mode in ('a', 'w'):
+        with pytest.raises(RuntimeError):
+            io.write_sparse_matrix_chunks(bad_blocks(), dirname, mode=mode)
+    observed = io.read_sparse_matrix(dirname, kind='csr')
+    assert observed.dtype == np.int32
+    assert observed.toarray().tolist() == expected.toarray().tolist()
+    assert sorted(os.listdir(dirname)) == ['data.npy', 'indices.npy', 'indptr.npy', 'shape.npy']
+
+
 def test_get_filenames():
     expected = sorted(os.path.join(TESTS_DIR, fname)
                       for fname in os.listdir(TESTS_DIR)
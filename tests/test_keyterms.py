@@ -6,9 +6,11 @@ necessarily the same across runs.
 """
 from __future__ import absolute_import, unicode_literals
 
+import networkx as nx
 import pytest
 
-from textacy import cache, keyterms, preprocess_text, spacy_utils
+from textacy import Corpus
+from textacy import cache, keyterms, network, preprocess_text, spacy_utils, vsm
 
 
 @pytest.fixture(scope='module')
@@ -131,6 +133,26 @@ def test_sgrank_window_width(spacy_doc):
     #     asert e == o
 
 
+def test_incremental_sgrank(spacy_doc):
+    extractor = keyterms.IncrementalSGRank(ngrams=(1, 2, 3), window_width=50)
+    for n_toks in (5, 60, 61, 200, len(spacy_doc)):
+        extractor.update(spacy_doc[:n_toks])
+        assert extractor.n_toks == n_toks
+        observed = dict(extractor.get_keyterms(n_keyterms=1.0))
+        expected = dict(keyterms.sgrank(
+            spacy_doc[:n_toks], ngrams=(1, 2, 3), window_width=50, n_keyterms=1.0))
+        assert set(observed) == set(expected)
+        for term, rank in expected.items():
+            assert observed[term] == pytest.approx(rank, abs=1e-4)
+
+
+def test_incremental_sgrank_shrunk_doc(spacy_doc):
+    extractor = keyterms.IncrementalSGRank()
+    extractor.update(spacy_doc)
+    with pytest.raises(ValueError):
+        extractor.update(spacy_doc[:10])
+
+
 def test_textrank(spacy_doc):
     expected = [
         'friedman', 'beirut', 'reporting', 'arab', 'new', 'award', 'foreign',
@@ -251,3 +273,128 @@ def test_singlegrank_norm_normalized_str(spacy_doc):
     # can't do this owing to randomness of results
     # for e, o in zip(expected, observed):
     #     asert e == o
+
+
+def test_rank_nodes_by_pagerank_graph_and_matrix():
+    terms = ['a', 'b', 'c', 'a', 'd', 'b', 'a', 'e', 'c', 'a']
+    graph = network.terms_to_semantic_network(terms, window_width=3)
+    cooc_mat, id_to_term = network.terms_to_cooc_matrix(terms, window_width=3)
+    graph_ranks = keyterms.rank_nodes_by_pagerank(graph)
+    mat_ranks = keyterms.rank_nodes_by_pagerank(cooc_mat)
+    assert set(graph_ranks) == set(id_to_term)
+    for term_id, rank in mat_ranks.items():
+        assert rank == pytest.approx(graph_ranks[id_to_term[term_id]])
+    assert sum(mat_ranks.values()) == pytest.approx(1.0)
+
+
+def test_rank_nodes_by_pagerank_nstart():
+    graph = nx.path_graph(10)
+    ranks = keyterms.rank_nodes_by_pagerank(graph)
+    warm_ranks = keyterms.rank_nodes_by_pagerank(graph, nstart=ranks)
+    for node, rank in ranks.items():
+        assert warm_ranks[node] == pytest.approx(rank, abs=1e-5)
+
+
+def test_rank_nodes_by_divrank_graph_and_matrix():
+    terms = ['a', 'b', 'c', 'a', 'd', 'b', 'a', 'e', 'c', 'a']
+    graph = network.terms_to_semantic_network(terms, window_width=3)
+    cooc_mat, id_to_term = network.terms_to_cooc_matrix(terms, window_width=3)
+    graph_ranks = keyterms.rank_nodes_by_divrank(graph)
+    mat_ranks = keyterms.rank_nodes_by_divrank(cooc_mat)
+    assert [id_to_term[term_id] for term_id in mat_ranks] == list(graph_ranks)
+    for term_id, rank in mat_ranks.items():
+        assert rank == pytest.approx(graph_ranks[id_to_term[term_id]])
+
+
+def test_rank_nodes_by_bestcoverage_graph_and_matrix():
+    terms = ['a', 'b', 'c', 'a', 'd', 'b', 'a', 'e', 'c', 'a', 'f', 'g', 'f']
+    graph = network.terms_to_semantic_network(terms, window_width=2)
+    cooc_mat, id_to_term = network.terms_to_cooc_matrix(terms, window_width=2)
+    for c in (1, 2):
+        graph_ranks = keyterms.rank_nodes_by_bestcoverage(graph, k=3, c=c)
+        mat_ranks = keyterms.rank_nodes_by_bestcoverage(cooc_mat, k=3, c=c)
+        assert [id_to_term[term_id] for term_id in mat_ranks] == list(graph_ranks)
+
+
+def test_batch(spacy_doc):
+    results = list(keyterms.batch(
+        [spacy_doc, spacy_doc], algorithms=('sgrank', 'textrank'), n_keyterms=5, idf={}))
+    assert len(results) == 2
+    for result in results:
+        assert set(result) == {'sgrank', 'textrank'}
+        assert result['sgrank'] == keyterms.sgrank(spacy_doc, n_keyterms=5)
+        assert result['textrank'] == keyterms.textrank(spacy_doc, n_keyterms=5)
+
+
+def test_batch_invalid_algorithm(spacy_doc):
+    with pytest.raises(ValueError):
+        list(keyterms.batch([spacy_doc], algorithms='foo'))
+
+
+def test_batch_invalid_kwargs(spacy_doc):
+    # arguments are validated on calling batch(), not on iterating over its results
+    with pytest.raises(ValueError):
+        keyterms.batch([spacy_doc], algorithms={'sgrank': {'window_widht': 500}})
+    with pytest.raises(ValueError):
+        keyterms.batch([spacy_doc], algorithms={'textrank': {'ngrams': (1, 2)}})
+    with pytest.raises(ValueError):
+        keyterms.batch([spacy_doc], algorithms={'sgrank': {'window_width': 1}})
+    with pytest.raises(ValueError):
+        keyterms.batch([spacy_doc], n_keyterms=1.5)
+
+
+def test_batch_corpus_idf_normalize(spacy_doc):
+    corpus = Corpus('en', docs=[spacy_doc])
+    with pytest.raises(ValueError):
+        keyterms.batch(corpus, normalize=lambda term: term.text.upper())
+    results = list(keyterms.batch(
+        corpus, normalize=lambda term: term.text.upper(), n_keyterms=5, idf={}))
+    assert all(keyterm == keyterm.upper() for keyterm, _ in results[0]['sgrank'])
+
+
+def test_batch_n_jobs(spacy_doc):
+    algorithms = {'sgrank': {'window_width': 500}, 'singlerank': {}}
+    docs = [spacy_doc, spacy_doc[:200].as_doc(), spacy_doc]
+    expected = list(keyterms.batch(docs, algorithms=algorithms, n_keyterms=5, idf={}))
+    observed = list(keyterms.batch(
+        docs, algorithms=algorithms, n_keyterms=5, idf={}, n_jobs=2, chunk_size=1))
+    assert observed == expected
+    assert observed[0] != observed[1]
+
+
+def test_most_discriminating_terms_doc_term_matrix():
+    terms_lists = (
+        [['apple', 'banana', 'cherry', 'date'] for _ in range(5)] +
+        [['apple', 'banana', 'elderberry', 'fig'] for _ in range(5)] +
+        [['cherry', 'elderberry'], ['date', 'fig']])
+    bool_array_grp1 = [True] * 5 + [False] * 5 + [True, False]
+    expected = keyterms.most_discriminating_terms(
+        terms_lists, bool_array_grp1, top_n_terms=2)
+    vectorizer = vsm.Vectorizer(
+        weighting='tf', normalize=False, min_df=3, max_df=0.95, max_n_terms=1000)
+    doc_term_matrix = vectorizer.fit_transform(terms_lists)
+    observed = keyterms.most_discriminating_terms(
+        None, bool_array_grp1, top_n_terms=2,
+        doc_term_matrix=doc_term_matrix, id_to_term=vectorizer.id_to_term)
+    assert observed == expected
+    assert set(observed[0]) == {'cherry', 'date'}
+    assert set(observed[1]) == {'elderberry', 'fig'}
+
+
+def test_aggregate_term_variants():
+    terms = {
+        'new york times', 'york times', 'new-york', 'new york',
+        'international monetary fund', 'imf',
+        'department of justice', 'justice department',
+        'natural language processing', 'language processing natural',
+        'computational linguist', 'computational linguists'}
+    observed = keyterms.aggregate_term_variants(
+        terms, acro_defs={'IMF': 'International Monetary Fund'})
+    observed = sorted(sorted(variants) for variants in observed)
+    expected = sorted(sorted(variants) for variants in [
+        {'new york times', 'york times', 'new york'}, {'new-york'},
+        {'international monetary fund', 'imf'},
+        {'department of justice', 'justice department'},
+        {'natural language processing', 'language processing natural'},
+        {'computational linguists', 'computational linguist'}])
+    assert observed == expected
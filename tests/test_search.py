@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import, unicode_literals
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from textacy import search, vsm
+
+
+@pytest.fixture(scope='module')
+def tokenized_docs():
+    texts = ["Mary had a little lamb. Its fleece was white as snow.",
+             "Everywhere that Mary went the lamb was sure to go.",
+             "It followed her to school one day, which was against the rule.",
+             "It made the children laugh and play to see a lamb at school.",
+             "And so the teacher turned it out, but still it lingered near.",
+             "It waited patiently about until Mary did appear.",
+             "Why does the lamb love Mary so? The eager children cry.",
+             "Mary loves the lamb, you know, the teacher did reply."]
+    return [[word.lower().strip('.,?') for word in text.split()] for text in texts]
+
+
+@pytest.fixture(scope='module')
+def vectorizer_and_dtm(tokenized_docs):
+    vectorizer = vsm.Vectorizer(weighting='tf')
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    return vectorizer, doc_term_matrix
+
+
+@pytest.mark.parametrize('scoring', ['bm25', 'tfidf'])
+def test_inverted_index_search(vectorizer_and_dtm, scoring):
+    vectorizer, doc_term_matrix = vectorizer_and_dtm
+    index = search.InvertedIndex(
+        doc_term_matrix, vectorizer.vocabulary_terms, scoring=scoring)
+    assert index.n_docs == doc_term_matrix.shape[0]
+    assert index.n_terms == doc_term_matrix.shape[1]
+    impacts = index._impacts.tocsr()
+    for query in (['lamb'], ['mary', 'lamb', 'school'], ['teacher', 'teacher', 'lamb']):
+        query_vec = np.zeros(index.n_terms)
+        for term in query:
+            query_vec[vectorizer.vocabulary_terms[term]] += 1
+        scores = impacts.dot(query_vec)
+        results = index.search(query, top_n=3)
+        assert len(results) == 3
+        assert [score for _, score in results] == pytest.approx(
+            sorted(scores, reverse=True)[:3])
+        assert all(scores[doc_id] == pytest.approx(score) for doc_id, score in results)
+
+
+def test_inverted_index_search_no_matches(vectorizer_and_dtm):
+    vectorizer, doc_term_matrix = vectorizer_and_dtm
+    index = search.InvertedIndex(doc_term_matrix, vectorizer.vocabulary_terms)
+    assert index.search(['missing']) == []
+    assert index.search(['lamb'], top_n=0) == []
+    assert len(index.search(['lamb'], top_n=100)) == 5
+    assert index.search({'mary': 2.0}) == [
+        (doc_id, 2.0 * score) for doc_id, score in index.search(['mary'])]
+
+
+def test_inverted_index_search_ties():
+    # docs 0-3 all match the query equally well
+    doc_term_matrix = sp.csr_matrix(np.array([[1, 0], [1, 0], [1, 0], [1, 0], [0, 1]]))
+    index = search.InvertedIndex(doc_term_matrix, {'lamb': 0, 'snow': 1})
+    for top_n in (1, 2, 3):
+        assert [doc_id for doc_id, _ in index.search(['lamb'], top_n=top_n)] == \
+            list(range(top_n))
+
+
+def test_inverted_index_save_load(vectorizer_and_dtm, tmpdir):
+    vectorizer, doc_term_matrix = vectorizer_and_dtm
+    index = search.InvertedIndex(
+        doc_term_matrix, vectorizer.vocabulary_terms, scoring='tfidf', smooth_idf=False)
+    filepath = str(tmpdir.join('index.npz'))
+    index.save(filepath)
+    loaded_index = search.InvertedIndex.load(filepath)
+    assert loaded_index.scoring == 'tfidf'
+    assert loaded_index.smooth_idf is False
+    assert loaded_index.vocabulary_terms.is_frozen is True
+    assert dict(loaded_index.vocabulary_terms) == dict(index.vocabulary_terms)
+    query = ['mary', 'lamb', 'children']
+    assert loaded_index.search(query) == index.search(query)
+
+
+def test_inverted_index_vocabulary_copy(tokenized_docs, tmpdir):
+    vectorizer = vsm.Vectorizer(weighting='tf')
+    index = search.InvertedIndex(
+        vectorizer.fit_transform(tokenized_docs[:4]), vectorizer.vocabulary_terms)
+    n_terms = index.n_terms
+    # terms added to the vectorizer's vocabulary aren't added to the index's
+    vectorizer.partial_fit(tokenized_docs[4:])
+    assert len(vectorizer.vocabulary_terms) > n_terms
+    assert len(index.vocabulary_terms) == n_terms
+    assert index.search(['teacher']) == []
+    filepath = str(tmpdir.join('index.npz'))
+    index.save(filepath)
+    assert len(search.InvertedIndex.load(filepath).vocabulary_terms) == n_terms
+
+
+def test_inverted_index_bad_init_params(vectorizer_and_dtm):
+    vectorizer, doc_term_matrix = vectorizer_and_dtm
+    bad_init_params = (
+        {'scoring': 'tf'},
+        {'k1': -1.0},
+        {'b': 1.5},
+    )
+    for bad_init_param in bad_init_params:
+        with pytest.raises(ValueError):
+            search.InvertedIndex(
+                doc_term_matrix, vectorizer.vocabulary_terms, **bad_init_param)
+    with pytest.raises(ValueError):
+        search.InvertedIndex(-doc_term_matrix, vectorizer.vocabulary_terms)
+    with pytest.raises(ValueError):
+        search.InvertedIndex(doc_term_matrix[:, :5], vectorizer.vocabulary_terms)
+    hash_vectorizer = vsm.Vectorizer(n_features=8, alternate_sign=False)
+    with pytest.raises(ValueError):
+        search.InvertedIndex(
+            hash_vectorizer.fit_transform([['lamb', 'snow']]),
+            hash_vectorizer.vocabulary_terms)
@@ -115,3 +115,20 @@ def test_clean_terms_crufty():
     expected = ['(foo bar)', 'foo-bar', '-123.4', 'foo bar', 'foo', 'bar?!',
                 "foo's bar", "foo'll bar", 'foo bar', 'foo bar.']
     assert observed == expected
+
+
+def test_get_superstrings():
+    strings = ['york', 'new york', 'new york city', 'city', 'new york']
+    expected = {
+        'york': {'new york', 'new york city'},
+        'new york': {'new york city'},
+        'new york city': set(),
+        'city': {'new york city'},
+        }
+    assert text_utils.get_superstrings(strings) == expected
+
+
+def test_get_superstrings_brute_force():
+    strings = ['a', 'ab', 'b', 'bab', 'abab', 'ba b', '', 'aab']
+    expected = {s1: {s2 for s2 in strings if s2 != s1 and s1 in s2} for s1 in strings}
+    assert text_utils.get_superstrings(strings) == expected
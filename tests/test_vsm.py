@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import, unicode_literals
 
+import numpy as np
 import pytest
+import scipy.sparse as sp
 from scipy.sparse import coo_matrix
 
 from textacy import Corpus
-from textacy import compat, vsm
+from textacy import compat, io, vsm
 
 
 @pytest.fixture(scope='module')
@@ -95,6 +97,63 @@ def test_grp_vectorizer_terms_and_grp_list(grp_vectorizer_and_gtm):
     assert len(grp_vectorizer.grps_list) == gtm.shape[0]
 
 
+def test_vectorizer_id_to_term_refit(tokenized_docs):
+    vectorizer = vsm.Vectorizer()
+    _ = vectorizer.fit(tokenized_docs[:4])
+    _ = vectorizer.id_to_term
+    _ = vectorizer.fit(tokenized_docs[4:])
+    assert vectorizer.id_to_term == {
+        term_id: term for term, term_id in vectorizer.vocabulary_terms.items()}
+
+
+def test_vocabulary():
+    vocab = vsm.Vocabulary(['lamb', 'snow', 'school'])
+    assert len(vocab) == 3
+    assert vocab['snow'] == 1
+    assert vocab.get_term(2) == 'school'
+    assert list(vocab) == vocab.terms == ['lamb', 'snow', 'school']
+    assert dict(vocab.items()) == {'lamb': 0, 'snow': 1, 'school': 2}
+    assert vocab.add('rule') == 3
+    assert vocab.add('lamb') == 0
+    assert vsm.Vocabulary({'lamb': 1, 'snow': 0}).terms == ['snow', 'lamb']
+    with pytest.raises(ValueError):
+        _ = vsm.Vocabulary(['lamb', 'lamb'])
+    for bad_terms in ({'lamb': 0, 'snow': 0}, {'lamb': 0, 'snow': 2}, {'lamb': 'snow'}):
+        with pytest.raises(ValueError):
+            _ = vsm.Vocabulary(bad_terms)
+    vocab = vocab.freeze()
+    assert vocab.is_frozen is True
+    with pytest.raises(ValueError):
+        _ = vocab.add('teacher')
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_vocabulary_save_load(tmpdir, mmap):
+    vocab = vsm.Vocabulary(['lamb', 'snow', 'school', 'rule', 'teacher', 'écolier'])
+    filepath = str(tmpdir.join('vocab.bin'))
+    vocab.save(filepath)
+    loaded_vocab = vsm.Vocabulary.load(filepath, mmap=mmap)
+    assert loaded_vocab.is_frozen is True
+    assert len(loaded_vocab) == len(vocab)
+    assert all(loaded_vocab[term] == term_id for term, term_id in vocab.items())
+    assert all(loaded_vocab.get_term(term_id) == term for term, term_id in vocab.items())
+    assert 'child' not in loaded_vocab
+    assert 5 not in loaded_vocab
+    assert loaded_vocab.get(5) is None
+    assert loaded_vocab == vocab
+    vectorizer = vsm.Vectorizer(vocabulary_terms=loaded_vocab)
+    doc_term_matrix = vectorizer.transform([['lamb', 'child', 'écolier']])
+    assert doc_term_matrix.indices.tolist() == [0, 5]
+
+
+def test_vocabulary_load_bad_file(tmpdir):
+    filepath = str(tmpdir.join('vocab.bin'))
+    with open(filepath, mode='wb') as f:
+        f.write(b'not a vocabulary at all')
+    with pytest.raises(ValueError):
+        _ = vsm.Vocabulary.load(filepath)
+
+
 def test_vectorizer_fixed_vocab(tokenized_docs):
     vocabulary_terms = ['lamb', 'snow', 'school', 'rule', 'teacher']
     vectorizer = vsm.Vectorizer(vocabulary_terms=vocabulary_terms)
@@ -119,6 +178,77 @@ def test_grp_vectorizer_fixed_vocab(tokenized_docs, groups):
     assert sorted(grp_vectorizer.grps_list) == sorted(vocabulary_grps)
 
 
+def test_vectorizer_hashing(tokenized_docs):
+    vectorizer = vsm.Vectorizer(
+        weighting='tfidf', normalize=True, n_features=100, max_reverse_terms=10)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    assert doc_term_matrix.shape == (len(tokenized_docs), 100)
+    assert 0 < len(vectorizer.id_to_term) <= 10
+    assert len(vectorizer.terms_list) == 100
+    # batches of docs can be transformed independently, then stacked
+    stacked_doc_term_matrix = sp.vstack([
+        vectorizer.transform(tokenized_docs[:4]), vectorizer.transform(tokenized_docs[4:])])
+    assert abs(stacked_doc_term_matrix - doc_term_matrix).max() == pytest.approx(0.0)
+
+
+def test_grp_vectorizer_hashing(tokenized_docs, groups):
+    grp_vectorizer = vsm.GroupVectorizer(n_features=100, alternate_sign=False)
+    grp_term_matrix = grp_vectorizer.fit_transform(tokenized_docs, groups)
+    assert grp_term_matrix.shape == (len(set(groups)), 100)
+    assert grp_term_matrix.sum() == sum(len(terms) for terms in tokenized_docs)
+
+
+def test_vectorizer_dtype(tokenized_docs):
+    params = {'weighting': 'tfidf', 'sublinear_tf': True, 'normalize': True}
+    vectorizer = vsm.Vectorizer(**params)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    assert doc_term_matrix.dtype == np.float64
+    vectorizer32 = vsm.Vectorizer(dtype=np.float32, **params)
+    doc_term_matrix32 = vectorizer32.fit_transform(tokenized_docs)
+    assert doc_term_matrix32.dtype == np.float32
+    assert doc_term_matrix32.toarray() == pytest.approx(doc_term_matrix.toarray(), abs=1e-6)
+    assert vectorizer32.transform(tokenized_docs).dtype == np.float32
+    assert vectorizer32.transform_doc(tokenized_docs[0]).dtype == np.float32
+
+
+@pytest.mark.parametrize('index_dtype', [np.int32, np.int64])
+def test_vectorizer_index_dtype(tokenized_docs, index_dtype):
+    vectorizer = vsm.Vectorizer(weighting='tfidf', index_dtype=index_dtype)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    assert doc_term_matrix.indices.dtype == index_dtype
+    assert doc_term_matrix.indptr.dtype == index_dtype
+    doc_term_matrix = vectorizer.transform(tokenized_docs)
+    assert doc_term_matrix.indices.dtype == index_dtype
+    assert doc_term_matrix.indptr.dtype == index_dtype
+    # un-weighted counts are widened along with indices, as for groups
+    vectorizer = vsm.Vectorizer(weighting='tf', index_dtype=index_dtype)
+    assert vectorizer.fit_transform(tokenized_docs).dtype == index_dtype
+    assert vectorizer.transform(tokenized_docs).dtype == index_dtype
+    assert vectorizer.transform_doc(tokenized_docs[0]).dtype == index_dtype
+
+
+def test_grp_vectorizer_index_dtype(tokenized_docs, groups):
+    grp_vectorizer = vsm.GroupVectorizer(index_dtype=np.int64)
+    grp_term_matrix = grp_vectorizer.fit_transform(tokenized_docs, groups)
+    assert grp_term_matrix.indices.dtype == np.int64
+    assert grp_term_matrix.indptr.dtype == np.int64
+    # counts summed over groups are widened along with indices
+    assert grp_term_matrix.dtype == np.int64
+
+
+def test_get_indptr():
+    indptr = vsm._get_indptr(np.array([2, 0, 3], dtype=np.intc))
+    assert indptr.tolist() == [0, 2, 2, 5]
+    assert indptr.dtype == np.int32
+    max_int32 = np.iinfo(np.int32).max
+    indptr = vsm._get_indptr(np.array([max_int32, 1], dtype=np.intc))
+    assert indptr.tolist() == [0, max_int32, max_int32 + 1]
+    assert indptr.dtype == np.int64
+    assert vsm._get_indptr(np.array([1], dtype=np.intc), np.int64).dtype == np.int64
+    with pytest.raises(ValueError):
+        _ = vsm._get_indptr(np.array([max_int32, 1], dtype=np.intc), np.int32)
+
+
 def test_vectorizer_bad_init_params():
     bad_init_params = (
         {'min_df': -1},
@@ -127,6 +257,11 @@ def test_vectorizer_bad_init_params():
         {'min_ic': -1.0},
         {'min_ic': 1.1},
         {'vocabulary_terms': 'foo bar bat baz'},
+        {'n_features': 0},
+        {'n_features': 100, 'min_df': 2},
+        {'n_features': 100, 'vocabulary_terms': ['lamb', 'snow']},
+        {'index_dtype': np.int16},
+        {'dtype': np.int32},
         )
     for bad_init_param in bad_init_params:
         with pytest.raises(ValueError):
@@ -139,6 +274,136 @@ def test_vectorizer_bad_transform(tokenized_docs):
         _ = vectorizer.transform(tokenized_docs)
 
 
+def test_vectorizer_transform_fitted_idf(tokenized_docs):
+    vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    # a single transformed doc gets the same weights as when it was fit
+    doc_term_vector = vectorizer.transform(tokenized_docs[:1])
+    assert abs(doc_term_vector - doc_term_matrix[0]).max() == pytest.approx(0.0)
+
+
+def test_vectorizer_transform_doc(tokenized_docs):
+    for weighting in ('tf', 'tfidf', 'binary'):
+        vectorizer = vsm.Vectorizer(
+            weighting=weighting, normalize=True, sublinear_tf=True, min_df=2)
+        vectorizer.fit(tokenized_docs)
+        for terms in tokenized_docs:
+            doc_term_vector = vectorizer.transform_doc(terms)
+            expected = vectorizer.transform([terms])
+            assert doc_term_vector.shape == expected.shape
+            assert doc_term_vector.toarray() == pytest.approx(expected.toarray())
+
+
+def test_vectorizer_transform_to_disk(tokenized_docs, tmpdir):
+    vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    dirname = str(tmpdir.join('doc_term_matrix'))
+    shape = vectorizer.transform_to_disk(tokenized_docs[:5], dirname, chunk_size=2)
+    assert shape == (5, doc_term_matrix.shape[1])
+    shape = vectorizer.transform_to_disk(
+        tokenized_docs[5:], dirname, chunk_size=2, mode='a')
+    assert shape == doc_term_matrix.shape
+    observed = io.read_sparse_matrix(dirname, kind='csr', mmap=True)
+    assert abs(observed - doc_term_matrix).max() == pytest.approx(0.0)
+
+
+def test_vectorizer_partial_fit(tokenized_docs):
+    vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True, min_df=2)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    inc_vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True, min_df=2)
+    inc_vectorizer.partial_fit(tokenized_docs[:4])
+    vocabulary_terms = dict(inc_vectorizer.vocabulary_terms)
+    inc_vectorizer.partial_fit(tokenized_docs[4:])
+    # existing terms keep their ids, and new terms are appended
+    assert all(inc_vectorizer.vocabulary_terms[term] == term_id
+               for term, term_id in vocabulary_terms.items())
+    inc_doc_term_matrix = inc_vectorizer.transform(tokenized_docs)
+    assert inc_doc_term_matrix.shape == (
+        len(tokenized_docs), len(inc_vectorizer.vocabulary_terms))
+    # filtered terms' columns are zeroed out, others match a full fit
+    for term, term_id in inc_vectorizer.vocabulary_terms.items():
+        inc_col = inc_doc_term_matrix[:, term_id].toarray()
+        if term in vectorizer.vocabulary_terms:
+            col = doc_term_matrix[:, vectorizer.vocabulary_terms[term]].toarray()
+            assert inc_col == pytest.approx(col)
+        else:
+            assert not inc_col.any()
+
+
+def test_vectorizer_fit_then_partial_fit():
+    tokenized_docs = [['x', 'y'], ['x', 'z'], ['w'], ['w', 'y'], ['w']]
+    vectorizer = vsm.Vectorizer(weighting='tfidf', min_df=2)
+    vectorizer.fit(tokenized_docs[:3])
+    assert sorted(vectorizer.vocabulary_terms) == ['x']
+    # terms filtered out by fit are filtered again with their stats intact
+    vectorizer.partial_fit(tokenized_docs[3:])
+    assert vectorizer.vocabulary_terms['x'] == 0
+    inc_vectorizer = vsm.Vectorizer(weighting='tfidf', min_df=2)
+    inc_vectorizer.partial_fit(tokenized_docs[:3])
+    inc_vectorizer.partial_fit(tokenized_docs[3:])
+    doc_term_matrix = vectorizer.transform(tokenized_docs)
+    inc_doc_term_matrix = inc_vectorizer.transform(tokenized_docs)
+    for term, term_id in inc_vectorizer.vocabulary_terms.items():
+        assert inc_doc_term_matrix[:, term_id].toarray() == pytest.approx(
+            doc_term_matrix[:, vectorizer.vocabulary_terms[term]].toarray())
+    assert doc_term_matrix[:, vectorizer.vocabulary_terms['y']].nnz == 2
+
+
+def test_vectorizer_fit_transform_n_jobs(tokenized_docs):
+    vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True, min_df=2)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    par_vectorizer = vsm.Vectorizer(weighting='tfidf', normalize=True, min_df=2)
+    par_doc_term_matrix = par_vectorizer.fit_transform(
+        tokenized_docs, n_jobs=2, chunk_size=3)
+    assert par_vectorizer.vocabulary_terms == vectorizer.vocabulary_terms
+    assert np.array_equal(par_doc_term_matrix.indptr, doc_term_matrix.indptr)
+    assert np.array_equal(par_doc_term_matrix.indices, doc_term_matrix.indices)
+    assert np.array_equal(par_doc_term_matrix.data, doc_term_matrix.data)
+    # terms' column ids kept by a hasher are collected from worker processes
+    hash_vectorizer = vsm.Vectorizer(n_features=16, max_reverse_terms=10)
+    hash_doc_term_matrix = hash_vectorizer.fit_transform(tokenized_docs)
+    par_hash_vectorizer = vsm.Vectorizer(n_features=16, max_reverse_terms=10)
+    par_hash_doc_term_matrix = par_hash_vectorizer.fit_transform(
+        tokenized_docs, n_jobs=2, chunk_size=2)
+    assert (par_hash_doc_term_matrix != hash_doc_term_matrix).nnz == 0
+    assert par_hash_vectorizer.id_to_term == hash_vectorizer.id_to_term
+    assert len(par_hash_vectorizer.id_to_term) > 0
+
+
+def test_grp_vectorizer_multi_label(tokenized_docs, groups):
+    multi_groups = [
+        [grp, 'z'] if i % 2 == 0 else frozenset([grp])
+        for i, grp in enumerate(groups)]
+    grp_vectorizer = vsm.GroupVectorizer()
+    grp_term_matrix = grp_vectorizer.fit_transform(tokenized_docs, multi_groups)
+    assert sorted(grp_vectorizer.grps_list) == sorted(set(groups) | {'z'})
+    # single-label groups are unaffected by docs also belonging to another group
+    single_grp_vectorizer = vsm.GroupVectorizer(
+        vocabulary_terms=grp_vectorizer.vocabulary_terms)
+    single_grp_term_matrix = single_grp_vectorizer.fit_transform(tokenized_docs, groups)
+    for grp, grp_id in single_grp_vectorizer.vocabulary_grps.items():
+        observed = grp_term_matrix[grp_vectorizer.vocabulary_grps[grp]].toarray()
+        expected = single_grp_term_matrix[grp_id].toarray()
+        assert (observed == expected).all()
+    z_grp_vectorizer = vsm.GroupVectorizer(
+        vocabulary_terms=grp_vectorizer.vocabulary_terms, vocabulary_grps=['z'])
+    expected = z_grp_vectorizer.fit_transform(
+        tokenized_docs[::2], ['z' for _ in tokenized_docs[::2]]).toarray()
+    observed = grp_term_matrix[grp_vectorizer.vocabulary_grps['z']].toarray()
+    assert (observed == expected).all()
+    # tuples are the names of single groups
+    tuple_groups = [(grp, i % 2) for i, grp in enumerate(groups)]
+    tuple_grp_vectorizer = vsm.GroupVectorizer()
+    _ = tuple_grp_vectorizer.fit_transform(tokenized_docs, tuple_groups)
+    assert sorted(tuple_grp_vectorizer.grps_list) == sorted(set(tuple_groups))
+
+
+def test_grp_vectorizer_partial_fit(tokenized_docs, groups):
+    grp_vectorizer = vsm.GroupVectorizer()
+    with pytest.raises(ValueError):
+        _ = grp_vectorizer.partial_fit(tokenized_docs, groups)
+
+
 def test_grp_vectorizer_bad_transform(tokenized_docs, groups):
     grp_vectorizer = vsm.GroupVectorizer()
     with pytest.raises(ValueError):
@@ -260,3 +525,111 @@ def test_filter_terms_by_ic_max_n_terms(vectorizer_and_dtm):
         min_ic=0.0, max_n_terms=3)
     assert dtm.shape == (8, 3)
     assert len(vocab) == 3
+
+
+def test_vectorizer_filter_terms_by_fit_stats(tokenized_docs):
+    vectorizer = vsm.Vectorizer(weighting='tf', min_df=2, max_n_terms=5)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    all_vectorizer = vsm.Vectorizer(weighting='tf')
+    dtm, vocab = vsm.filter_terms_by_df(
+        all_vectorizer.fit_transform(tokenized_docs), all_vectorizer.vocabulary_terms,
+        min_df=2, max_n_terms=5)
+    assert dict(vectorizer.vocabulary_terms) == vocab
+    assert (doc_term_matrix != dtm).nnz == 0
+    assert np.array_equal(
+        vectorizer._doc_freqs, vsm.get_doc_freqs(dtm, normalized=False))
+
+
+def test_filter_columns():
+    matrix = sp.random(20, 30, density=0.3, format='csr', random_state=42)
+    mask = np.arange(30) % 3 != 0
+    expected = matrix[:, np.flatnonzero(mask)].toarray()
+    assert np.array_equal(vsm._filter_columns(matrix, mask).toarray(), expected)
+    filtered = vsm._filter_columns(matrix, mask, copy=False)
+    assert filtered is matrix
+    assert np.array_equal(filtered.toarray(), expected)
+
+
+def test_get_doc_knn_matrix(vectorizer_and_dtm):
+    _, doc_term_matrix = vectorizer_and_dtm
+    sims = doc_term_matrix.dot(doc_term_matrix.T).toarray()
+    np.fill_diagonal(sims, 0.0)
+    knn_matrix = vsm.get_doc_knn_matrix(doc_term_matrix, top_n=2, block_size=3)
+    assert knn_matrix.shape == sims.shape
+    for i, row in enumerate(sims):
+        knn_row = knn_matrix[i]
+        assert knn_row.nnz == min(2, np.count_nonzero(row))
+        assert sorted(knn_row.data, reverse=True) == pytest.approx(
+            sorted(row, reverse=True)[:knn_row.nnz])
+        assert knn_row.toarray().ravel()[knn_row.indices] == pytest.approx(row[knn_row.indices])
+    par_knn_matrix = vsm.get_doc_knn_matrix(
+        doc_term_matrix, top_n=2, block_size=3, n_jobs=2)
+    assert (par_knn_matrix != knn_matrix).nnz == 0
+    min_sim = np.median(knn_matrix.data)
+    knn_matrix = vsm.get_doc_knn_matrix(
+        doc_term_matrix, top_n=2, min_sim=min_sim, include_self=True)
+    assert knn_matrix.data.min() >= min_sim
+    # ties are broken in favor of lower doc ids, however docs are blocked
+    tied_matrix = sp.csr_matrix(np.ones((10, 2)))
+    for block_size in (1, 3, 10):
+        knn_matrix = vsm.get_doc_knn_matrix(tied_matrix, top_n=3, block_size=block_size)
+        assert knn_matrix[0].indices.tolist() == [1, 2, 3]
+        assert knn_matrix[5].indices.tolist() == [0, 1, 2]
+    with pytest.raises(ValueError):
+        vsm.get_doc_knn_matrix(doc_term_matrix, top_n=0)
+
+
+def test_vectorizer_term_ids(tokenized_docs):
+    term_strings = dict(enumerate(sorted({term for terms in tokenized_docs for term in terms})))
+    string_ids = {term: term_id for term_id, term in term_strings.items()}
+    tokenized_id_docs = [np.array([string_ids[term] for term in terms], dtype=np.uint64)
+                         for terms in tokenized_docs]
+    vectorizer = vsm.Vectorizer(weighting='tfidf', min_df=2)
+    doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+    id_vectorizer = vsm.Vectorizer(weighting='tfidf', min_df=2, term_strings=term_strings)
+    id_doc_term_matrix = id_vectorizer.fit_transform(tokenized_id_docs, chunk_size=3)
+    assert id_vectorizer.vocabulary_terms == vectorizer.vocabulary_terms
+    assert (id_doc_term_matrix != doc_term_matrix).nnz == 0
+    assert (id_vectorizer.transform(tokenized_id_docs[:2]) !=
+            vectorizer.transform(tokenized_docs[:2])).nnz == 0
+    assert (id_vectorizer.transform_doc(tokenized_id_docs[0]) !=
+            vectorizer.transform_doc(tokenized_docs[0])).nnz == 0
+    # without a mapping to strings, terms are their integer ids
+    raw_id_vectorizer = vsm.Vectorizer(weighting='tfidf', min_df=2)
+    raw_id_vectorizer.fit(tokenized_id_docs)
+    assert [term_strings[term_id] for term_id in raw_id_vectorizer.terms_list] == \
+        vectorizer.terms_list
+    # a mapping only of ids to strings can't count ids against a vocabulary of strings
+    with pytest.raises(ValueError):
+        vsm.Vectorizer(vocabulary_terms=vectorizer.terms_list, term_strings=term_strings) \
+            .transform(tokenized_id_docs[:1])
+    bidirectional_term_strings = dict(term_strings)
+    bidirectional_term_strings.update(string_ids)
+    fixed_id_vectorizer = vsm.Vectorizer(
+        vocabulary_terms=vectorizer.terms_list, term_strings=bidirectional_term_strings)
+    assert (fixed_id_vectorizer.transform(tokenized_id_docs[:2]) !=
+            vsm.Vectorizer(vocabulary_terms=vectorizer.terms_list)
+            .transform(tokenized_docs[:2])).nnz == 0
+
+
+def test_doc_term_matrix(tokenized_docs):
+    doc_term_matrix = vsm.DocTermMatrix(
+        vectorizer=vsm.Vectorizer(weighting='tfidf'), max_removed_frac=0.4)
+    doc_term_matrix.add(tokenized_docs[:4])
+    doc_term_matrix.add(tokenized_docs[4:])
+    doc_term_matrix.remove([1, 3])
+    assert len(doc_term_matrix) == doc_term_matrix.n_docs == len(tokenized_docs) - 2
+    # enough removals to trigger compaction
+    doc_term_matrix.remove([0, 1])
+    assert len(doc_term_matrix._is_removed) == len(doc_term_matrix)
+    kept_docs = [doc for i, doc in enumerate(tokenized_docs) if i not in {0, 1, 2, 3}]
+    vectorizer = vsm.Vectorizer(weighting='tfidf')
+    expected = vectorizer.fit_transform(kept_docs)
+    term_ids = [doc_term_matrix.vectorizer.vocabulary_terms[term]
+                for term in vectorizer.terms_list]
+    assert doc_term_matrix.matrix.shape[0] == len(kept_docs)
+    assert np.allclose(doc_term_matrix.matrix[:, term_ids].toarray(), expected.toarray())
+    with pytest.raises(IndexError):
+        doc_term_matrix.remove([len(kept_docs)])
+    with pytest.raises(ValueError):
+        vsm.DocTermMatrix(vectorizer=vsm.GroupVectorizer())
@@ -20,6 +20,7 @@ from spacy.util import get_lang_class
 from . import cache
 from . import compat
 from . import io
+from . import vsm
 from .doc import Doc
 
 LOGGER = logging.getLogger(__name__)
@@ -81,6 +82,13 @@ class Corpus(object):
         >>> counts = corpus.word_freqs(lemmatize=True, weighting='count')
         >>> idf = corpus.word_doc_freqs(lemmatize=True, weighting='idf')
 
+    Attach a doc-term matrix that's kept up-to-date as docs are added and removed::
+
+        >>> dtm = corpus.attach_doc_term_matrix(ngrams=1, named_entities=True)
+        >>> corpus.add_text('The House will be in order.')
+        >>> dtm.matrix.shape[0] == len(corpus)
+        True
+
     Save to and load from disk::
 
         >>> corpus.save('~/Desktop/congress.pkl')
@@ -127,6 +135,8 @@ class Corpus(object):
         spacy_lang (``spacy.Language``): http://spacy.io/docs/#english
         spacy_vocab (``spacy.Vocab``): https://spacy.io/docs#vocab
         spacy_stringstore (``spacy.StringStore``): https://spacy.io/docs#stringstore
+        doc_term_matrix (:class:`textacy.vsm.DocTermMatrix`): Doc-term matrix
+            attached via :meth:`Corpus.attach_doc_term_matrix()`, if any.
     """
     def __init__(self, lang, texts=None, docs=None, metadatas=None):
         if isinstance(lang, compat.unicode_):
@@ -143,6 +153,7 @@ class Corpus(object):
         self.n_docs = 0
         self.n_tokens = 0
         self.n_sents = 0 if self.spacy_lang.parser else None
+        self.doc_term_matrix = None
 
         if texts and docs:
             msg = 'Corpus may be initialized with either `texts` or `docs`, but not both.'
@@ -187,6 +198,35 @@ class Corpus(object):
         """Constituent docs' word vectors stacked together in a matrix."""
         return np.vstack((doc.spacy_doc.vector for doc in self))
 
+    def attach_doc_term_matrix(self, vectorizer=None, max_removed_frac=0.25, **kwargs):
+        """
+        Attach a doc-term matrix to :class:`Corpus`, whose rows are automatically
+        added and removed along with docs, so that it's always up-to-date without
+        being re-built from scratch. Any previously attached matrix is replaced.
+
+        Args:
+            vectorizer (:class:`textacy.vsm.Vectorizer`): Vectorizer by which terms
+                are counted and values weighted. If None, a new one with default
+                parameters is used.
+            max_removed_frac (float): Max fraction of rows that may be marked as
+                removed before they're deleted.
+            **kwargs: Passed to :meth:`Doc.to_terms_list() <textacy.doc.Doc.to_terms_list>`,
+                by which docs are tokenized; terms are strings, unless
+                ``as_strings=False`` is specified.
+
+        Returns:
+            :class:`textacy.vsm.DocTermMatrix`: Matrix already including all
+            docs in :class:`Corpus`, whose current values are available via
+            its ``matrix`` attribute.
+        """
+        kwargs.setdefault('as_strings', True)
+        self.doc_term_matrix = vsm.DocTermMatrix(
+            vectorizer=vectorizer,
+            tokenizer=lambda doc: doc.to_terms_list(**kwargs),
+            max_removed_frac=max_removed_frac)
+        self.doc_term_matrix.add(self.docs)
+        return self.doc_term_matrix
+
     ##########
     # FILEIO #
 
@@ -240,7 +280,11 @@ class Corpus(object):
     #################
     # ADD DOCUMENTS #
 
-    def _add_textacy_doc(self, doc):
+    def _add_textacy_doc(self, doc, update_matrix=True):
+        # add the doc to the doc-term matrix first, so that if that fails,
+        # the doc is in neither it nor the corpus, and they stay aligned
+        if update_matrix is True and self.doc_term_matrix is not None:
+            self.doc_term_matrix.add([doc])
         doc.corpus_index = self.n_docs
         doc.corpus = self
         self.docs.append(doc)
@@ -250,6 +294,17 @@ class Corpus(object):
         if self.spacy_lang.parser:
             self.n_sents += doc.n_sents
 
+    def _add_textacy_docs(self, docs, batch_size):
+        # add docs to the doc-term matrix a batch at a time rather than one by one,
+        # since each addition has an overhead beyond counting the docs' terms
+        # as in _add_textacy_doc(), docs are added to the corpus only once
+        # they've been added to the doc-term matrix
+        for batch in itertoolz.partition_all(batch_size, docs):
+            if self.doc_term_matrix is not None:
+                self.doc_term_matrix.add(batch)
+            for doc in batch:
+                self._add_textacy_doc(doc, update_matrix=False)
+
     def add_texts(self, texts, metadatas=None,
                   n_threads=_DEFAULT_N_THREADS, batch_size=1000):
         """
@@ -279,13 +334,12 @@ class Corpus(object):
         spacy_docs = self.spacy_lang.pipe(
             texts, n_threads=n_threads, batch_size=batch_size)
         if metadatas:
-            for spacy_doc, metadata in compat.zip_(spacy_docs, metadatas):
-                self._add_textacy_doc(
-                    Doc(spacy_doc, lang=self.spacy_lang, metadata=metadata))
+            docs = (Doc(spacy_doc, lang=self.spacy_lang, metadata=metadata)
+                    for spacy_doc, metadata in compat.zip_(spacy_docs, metadatas))
         else:
-            for spacy_doc in spacy_docs:
-                self._add_textacy_doc(
-                    Doc(spacy_doc, lang=self.spacy_lang, metadata=None))
+            docs = (Doc(spacy_doc, lang=self.spacy_lang, metadata=None)
+                    for spacy_doc in spacy_docs)
+        self._add_textacy_docs(docs, batch_size)
 
     def add_text(self, text, metadata=None):
         """
@@ -387,6 +441,8 @@ class Corpus(object):
         n_sents_removed = doc.n_sents if self.spacy_lang.parser else None
         # actually remove the doc
         del self.docs[index]
+        if self.doc_term_matrix is not None:
+            self.doc_term_matrix.remove([index])
         # shift `corpus_index` attribute on docs higher up in the list
         for doc in self[index:]:
             doc.corpus_index -= 1
@@ -399,6 +455,8 @@ class Corpus(object):
     def _remove_many_docs_by_index(self, indexes):
         indexes = sorted(indexes, reverse=True)
         n_docs_removed = len(indexes)
+        if self.doc_term_matrix is not None:
+            self.doc_term_matrix.remove(indexes)
         n_sents_removed = 0
         n_tokens_removed = 0
         for index in indexes:
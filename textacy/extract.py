@@ -7,6 +7,7 @@ triples, and acronyms.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import collections
+import functools
 import itertools
 import operator
 import re
@@ -20,6 +21,7 @@ from . import compat
 from . import constants
 from . import spacy_utils
 from . import text_utils
+from . import utils
 
 
 def words(doc,
@@ -180,7 +182,7 @@ def ngrams(doc, n,
 
 def named_entities(doc,
                    include_types=None, exclude_types=None,
-                   drop_determiners=True, min_freq=1):
+                   drop_determiners=True, min_freq=1, as_offsets=False):
     """
     Extract an ordered sequence of named entities (PERSON, ORG, LOC, etc.) from
     a spacy-parsed doc, optionally filtering by entity types and frequencies.
@@ -206,10 +208,14 @@ def named_entities(doc,
 
         min_freq (int): remove named entities that occur in `doc` fewer
             than `min_freq` times
+        as_offsets (bool): If True, yield each named entity's (start, end, label)
+            instead of a ``spacy.Span``, where ``start`` and ``end`` are token
+            indexes in ``doc`` and ``label`` is the entity type, as a str.
+            This avoids creating new span objects for determiner-less entities.
 
     Yields:
-        ``spacy.Span``: the next named entity from ``doc`` passing all specified
-        filters in order of appearance in the document
+        ``spacy.Span`` or Tuple[int, int, str]: the next named entity from ``doc``
+        passing all specified filters in order of appearance in the document
 
     Raises:
         TypeError: if `include_types` or `exclude_types` is not a str, a set of
@@ -245,10 +251,24 @@ def named_entities(doc,
         else:
             msg = 'invalid `exclude_types` type: "{}"'.format(type(exclude_types))
             raise TypeError(msg)
-    if drop_determiners is True:
-        nes = (
-            ne if ne[0].pos != DET else SpacySpan(ne.doc, ne.start + 1, ne.end, label=ne.label, vector=ne.vector)
+    if as_offsets is True:
+        offsets = (
+            (ne.start + 1 if drop_determiners is True and ne[0].pos == DET else ne.start,
+             ne.end, ne.label_)
             for ne in nes)
+        if min_freq > 1:
+            offsets = list(offsets)
+            spacy_doc = doc.spacy_doc if hasattr(doc, 'spacy_doc') else doc
+            freqs = itertoolz.frequencies(
+                spacy_doc[start: end].lower_ for start, end, _ in offsets)
+            offsets = (offset for offset in offsets
+                       if freqs[spacy_doc[offset[0]: offset[1]].lower_] >= min_freq)
+        for offset in offsets:
+            yield offset
+        return
+
+    if drop_determiners is True:
+        nes = (_drop_determiner(ne) for ne in nes)
     if min_freq > 1:
         nes = list(nes)
         freqs = itertoolz.frequencies(ne.lower_ for ne in nes)
@@ -259,7 +279,18 @@ def named_entities(doc,
         yield ne
 
 
-def noun_chunks(doc, drop_determiners=True, min_freq=1):
+def _drop_determiner(span):
+    """
+    Return ``span`` without its leading determiner, if it has one, as a new span
+    with the same label. Its vector is left to be computed lazily, on access,
+    since it's rarely used and costly to average over the span's tokens.
+    """
+    if span[0].pos != DET:
+        return span
+    return SpacySpan(span.doc, span.start + 1, span.end, label=span.label)
+
+
+def noun_chunks(doc, drop_determiners=True, min_freq=1, as_offsets=False):
     """
     Extract an ordered sequence of noun chunks from a spacy-parsed doc, optionally
     filtering by frequency and dropping leading determiners.
@@ -270,26 +301,32 @@ def noun_chunks(doc, drop_determiners=True, min_freq=1):
             from phrases (e.g. "the quick brown fox" => "quick brown fox")
         min_freq (int): remove chunks that occur in `doc` fewer than
             `min_freq` times
+        as_offsets (bool): If True, yield each noun chunk's (start, end, label)
+            instead of a ``spacy.Span``, where ``start`` and ``end`` are token
+            indexes in ``doc`` and ``label`` is the chunk's label, as a str.
 
     Yields:
-        ``spacy.Span``: the next noun chunk from ``doc`` in order of appearance
-        in the document
+        ``spacy.Span`` or Tuple[int, int, str]: the next noun chunk from ``doc``
+        in order of appearance in the document
     """
     if hasattr(doc, 'spacy_doc'):
         ncs = doc.spacy_doc.noun_chunks
     else:
         ncs = doc.noun_chunks
     if drop_determiners is True:
-        ncs = (nc if nc[0].pos != DET else nc[1:]
-               for nc in ncs)
+        ncs = (_drop_determiner(nc) for nc in ncs)
     if min_freq > 1:
         ncs = list(ncs)
         freqs = itertoolz.frequencies(nc.lower_ for nc in ncs)
         ncs = (nc for nc in ncs
                if freqs[nc.lower_] >= min_freq)
 
-    for nc in ncs:
-        yield nc
+    if as_offsets is True:
+        for nc in ncs:
+            yield (nc.start, nc.end, nc.label_)
+    else:
+        for nc in ncs:
+            yield nc
 
 
 def pos_regex_matches(doc, pattern):
@@ -830,3 +867,136 @@ def direct_quotations(doc):
 
             yield (speaker, rv, quote)
             break
+
+
+def batch(docs, func, normalize='lemma', n_jobs=1, chunk_size=100, **kwargs):
+    """
+    Extract elements of interest from a collection of documents, optionally
+    in parallel, and return them in compact, columnar form rather than as
+    spaCy ``Token`` s or ``Span`` s, which are neither cheap to pickle nor
+    compact to store.
+
+    Extract named entities from every doc in a corpus, using 4 processes::
+
+        >>> cols = extract.batch(
+        ...     corpus, extract.named_entities, n_jobs=4,
+        ...     exclude_types='NUMERIC', drop_determiners=True)
+        >>> cols['doc_idx'][:3], cols['start'][:3], cols['end'][:3]
+        (array([0, 0, 1]), array([5, 19, 2], dtype=int32), array([7, 20, 4], dtype=int32))
+        >>> [corpus.spacy_stringstore[id_] for id_ in cols['norm'][:3]]
+        ['united states', 'congress', 'mr. speaker']
+
+    Args:
+        docs (:class:`Corpus <textacy.corpus.Corpus>` or Iterable[:class:`Doc <textacy.doc.Doc>`] or Iterable[``spacy.Doc``]):
+            Documents from which to extract elements.
+        func (callable): Extraction function that accepts a ``spacy.Doc`` plus
+            ``kwargs`` and yields ``spacy.Token`` s or ``spacy.Span`` s, e.g.
+            :func:`words`, :func:`ngrams`, :func:`named_entities`, or
+            :func:`noun_chunks`. When ``n_jobs`` > 1, it must be picklable,
+            i.e. defined at the top level of a module.
+        normalize (str or callable): If 'lemma', lemmatize extracted elements;
+            if 'lower', lowercase them; if falsy, use their form as it appears
+            in the doc; if a callable, must accept a ``spacy.Token`` or
+            ``spacy.Span`` and return a str.
+        n_jobs (int): Number of worker processes among which extraction is
+            split. If 1, everything runs in the current process; if -1, all
+            available CPUs are used.
+        chunk_size (int): Number of documents sent to a worker process at a time.
+        **kwargs: Passed as-is into ``func``.
+
+    Returns:
+        Dict[str, :class:`numpy.ndarray`]: Mapping of column name to array,
+        all of equal length with one entry per extracted element:
+
+        - "doc_idx": index of the element's document in ``docs``
+        - "start": index of the element's first token in its document
+        - "end": index of the token just past the element's last token
+        - "label": unique integer id of the element's label (e.g. entity type),
+          or 0 if it doesn't have one
+        - "norm": unique integer id of the element's normalized string
+
+        Integer ids can be resolved into strings with the ``spacy.StringStore``
+        shared by ``docs``, to which any previously unseen strings are added.
+    """
+    if hasattr(docs, 'spacy_stringstore'):
+        stringstore = docs.spacy_stringstore
+    else:
+        first_doc, docs = itertoolz.peek(docs)
+        stringstore = (first_doc.spacy_stringstore
+                       if hasattr(first_doc, 'spacy_stringstore')
+                       else first_doc.vocab.strings)
+    chunks = itertoolz.partition_all(chunk_size, enumerate(utils.to_spacy_docs(docs)))
+    extract_chunk = functools.partial(
+        _batch_extract_chunk, func=func, normalize=normalize, kwargs=kwargs)
+
+    n_jobs = utils.get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        results = [extract_chunk(chunk) for chunk in chunks]
+    else:
+        results = list(utils.imap_in_pool(extract_chunk, chunks, n_jobs))
+
+    columns = {name: [] for name in ('doc_idx', 'start', 'end', 'label', 'norm')}
+    for chunk_columns, chunk_strings in results:
+        for name, values in chunk_columns.items():
+            columns[name].append(values)
+        for string in chunk_strings:
+            stringstore.add(string)
+    dtypes = {'doc_idx': np.int64, 'start': np.int32, 'end': np.int32,
+              'label': np.uint64, 'norm': np.uint64}
+    return {name: np.concatenate(values) if values else np.array([], dtype=dtypes[name])
+            for name, values in columns.items()}
+
+
+def _batch_extract_chunk(chunk, func, normalize, kwargs):
+    """
+    Extract elements from a chunk of ``(doc_idx, spacy_doc)`` pairs via ``func``,
+    and return their columnar values plus any strings that were newly added
+    to the docs' ``StringStore``, since those additions aren't visible outside
+    of a worker process.
+    """
+    doc_idxs = []
+    starts = []
+    ends = []
+    labels = []
+    norms = []
+    strings = set()
+    for doc_idx, spacy_doc in chunk:
+        stringstore = spacy_doc.vocab.strings
+        for item in func(spacy_doc, **kwargs):
+            if isinstance(item, SpacySpan):
+                starts.append(item.start)
+                ends.append(item.end)
+                labels.append(item.label)
+                if normalize == 'lemma':
+                    string = item.lemma_
+                elif normalize == 'lower':
+                    string = item.lower_
+                elif not normalize:
+                    string = item.text
+                else:
+                    string = normalize(item)
+                norms.append(stringstore.add(string))
+                strings.add(string)
+            else:
+                starts.append(item.i)
+                ends.append(item.i + 1)
+                labels.append(0)
+                if normalize == 'lemma':
+                    norms.append(item.lemma)
+                elif normalize == 'lower':
+                    norms.append(item.lower)
+                elif not normalize:
+                    norms.append(item.orth)
+                else:
+                    string = normalize(item)
+                    norms.append(stringstore.add(string))
+                    strings.add(string)
+            doc_idxs.append(doc_idx)
+    columns = {
+        'doc_idx': np.array(doc_idxs, dtype=np.int64),
+        'start': np.array(starts, dtype=np.int32),
+        'end': np.array(ends, dtype=np.int32),
+        'label': np.array(labels, dtype=np.uint64),
+        'norm': np.array(norms, dtype=np.uint64),
+        }
+    return columns, sorted(strings)
@@ -3,6 +3,6 @@ from .utils import (coerce_content_type, get_filenames, open_sesame,
 from .csv import read_csv, write_csv
 from .http import read_http_stream, write_http_stream
 from .json import read_json, read_json_mash, write_json
-from .matrix import read_sparse_matrix, write_sparse_matrix
+from .matrix import read_sparse_matrix, write_sparse_matrix, write_sparse_matrix_chunks
 from .spacy import read_spacy_docs, write_spacy_docs
 from .text import read_text, write_text
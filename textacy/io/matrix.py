@@ -3,24 +3,30 @@ Matrices
 --------
 
 Functions for reading from and writing to disk CSC and CSR sparse matrices
-in numpy binary format.
+in numpy binary format, either all at once or streaming block-by-block.
 """
 from __future__ import absolute_import, print_function, unicode_literals
 
+import os
+
 import numpy as np
 import scipy.sparse as sp
 
-from .utils import open_sesame
+from .utils import _make_dirs, _validate_write_mode
 
 
-def read_sparse_matrix(fname, kind='csc'):
+def read_sparse_matrix(fname, kind='csc', mmap=False):
     """
     Read the data, indices, indptr, and shape arrays from a ``.npz`` file on disk
-    at ``fname``, and return an instantiated sparse matrix.
+    at ``fname``, or from a directory of ``.npy`` files as written by
+    :func:`write_sparse_matrix_chunks()`, and return an instantiated sparse matrix.
 
     Args:
-        fname (str): Path to file on disk from which data will be read.
+        fname (str): Path to file or directory on disk from which data will be read.
         kind ({'csc', 'csr'}): Kind of sparse matrix to instantiate.
+        mmap (bool): If True and ``fname`` is a directory, memory-map its arrays
+            in read-only mode rather than loading them into memory, such that
+            matrices larger than available memory may be read.
 
     Returns:
         :class:`scipy.sparse.csc_matrix` or :class:`scipy.sparse.csr_matrix`:
@@ -29,18 +35,23 @@ def read_sparse_matrix(fname, kind='csc'):
     See Also:
         https://docs.scipy.org/doc/numpy-1.13.0/reference/routines.io.html#numpy-binary-files-npy-npz
     """
-    npz_file = np.load(fname)
     if kind == 'csc':
-        return sp.csc_matrix(
-            (npz_file['data'], npz_file['indices'], npz_file['indptr']),
-            shape=npz_file['shape'])
+        matrix_cls = sp.csc_matrix
     elif kind == 'csr':
-        return sp.csr_matrix(
-            (npz_file['data'], npz_file['indices'], npz_file['indptr']),
-            shape=npz_file['shape'])
+        matrix_cls = sp.csr_matrix
     else:
         raise ValueError(
             'kind="{}" is invalid; valid values are {}'.format(kind, ['csc', 'csr']))
+    if os.path.isdir(fname):
+        mmap_mode = 'r' if mmap is True else None
+        arrays = {
+            name: np.load(os.path.join(fname, name + '.npy'), mmap_mode=mmap_mode)
+            for name in ('data', 'indices', 'indptr', 'shape')}
+    else:
+        arrays = np.load(fname)
+    return matrix_cls(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(arrays['shape']), copy=False)
 
 
 def write_sparse_matrix(data, fname, compressed=True, make_dirs=False):
@@ -77,3 +88,251 @@ def write_sparse_matrix(data, fname, compressed=True, make_dirs=False):
             fname,
             data=data.data, indices=data.indices,
             indptr=data.indptr, shape=data.shape)
+
+
+def write_sparse_matrix_chunks(data, dirname, mode='w', make_dirs=False):
+    """
+    Write a sparse matrix to disk at ``dirname`` as a sequence of row (CSR)
+    or column (CSC) blocks, streaming block-by-block, into a directory of
+    uncompressed ``.npy`` files, such that the full matrix never has to fit
+    in memory. Read it back, memory-mapped, via :func:`read_sparse_matrix()`.
+
+    Args:
+        data (Iterable[:class:`scipy.sparse.csr_matrix`] or Iterable[:class:`scipy.sparse.csc_matrix`]):
+            Blocks of a sparse matrix, all of the same kind, which are stacked
+            along rows (CSR) or columns (CSC) in order.
+        dirname (str): Path to directory on disk to which data will be written.
+        mode ({'w', 'a'}): If 'w', overwrite any matrix already in ``dirname``;
+            if 'a', append blocks to it. Either way, values and indices on disk
+            are upcast as needed to fit wider blocks, and an empty matrix takes
+            on the dtypes of the first block appended to it. If writing fails
+            partway through, any matrix already in ``dirname`` is restored.
+        make_dirs (bool): If True, automatically create (sub)directories if
+            not already present in order to write ``dirname``.
+
+    Returns:
+        Tuple[int, int]: Shape of the full matrix written to ``dirname``.
+
+    Raises:
+        TypeError: if a block isn't a sparse csr or csc matrix, or it's not
+            the same kind as other blocks
+        ValueError: if blocks' shapes along the other axis don't match
+    """
+    _validate_write_mode(mode)
+    if make_dirs is True:
+        _make_dirs(dirname, 'w')
+    if not os.path.isdir(dirname):
+        os.mkdir(dirname)
+    shape_fname = os.path.join(dirname, 'shape.npy')
+    if 'a' in mode and os.path.exists(shape_fname):
+        shape = tuple(np.load(shape_fname).tolist())
+    else:
+        shape = (0, 0)
+    # blocks are stacked along the "major" axis: rows for csr, columns for csc
+    n_major = n_minor = None
+    is_csr = None
+    files = {}
+    try:
+        for block in data:
+            if not isinstance(block, (sp.csc_matrix, sp.csr_matrix)):
+                raise TypeError(
+                    '`data` blocks must be scipy sparse csr or csc matrices, '
+                    'not "{}"'.format(type(block)))
+            if is_csr is None:
+                is_csr = isinstance(block, sp.csr_matrix)
+                n_major, n_minor = shape if is_csr else shape[::-1]
+                # an empty matrix has no values whose dtypes must be kept,
+                # so it's overwritten with the first block's dtypes
+                for name, dtype in (('data', block.dtype),
+                                    ('indices', block.indices.dtype),
+                                    ('indptr', block.indptr.dtype)):
+                    files[name] = _NpyAppender(
+                        os.path.join(dirname, name + '.npy'), dtype,
+                        mode=mode if n_major > 0 else 'w')
+                if len(files['indptr']) == 0:
+                    files['indptr'].write(np.zeros(1, dtype=block.indptr.dtype))
+                if n_major == 0:
+                    n_minor = None
+            elif is_csr is not isinstance(block, sp.csr_matrix):
+                raise TypeError('`data` blocks must all be the same kind of matrix')
+            block_n_major, block_n_minor = block.shape if is_csr else block.shape[::-1]
+            if n_minor is None:
+                n_minor = block_n_minor
+            elif block_n_minor != n_minor:
+                raise ValueError(
+                    'block of shape {} does not match matrix with {} {}'.format(
+                        block.shape, n_minor, 'columns' if is_csr else 'rows'))
+            nnz = len(files['data'])
+            # upcast values on disk if a block's are wider, rather than
+            # casting its values down to them
+            data_dtype = np.promote_types(files['data'].dtype, block.dtype)
+            if data_dtype != files['data'].dtype:
+                files['data'].upcast(data_dtype)
+            # upcast indices on disk if a block's are wider, or if there are
+            # too many values in total for the current dtype
+            index_dtype = np.promote_types(files['indptr'].dtype, block.indptr.dtype)
+            if nnz + block.nnz > np.iinfo(index_dtype).max:
+                index_dtype = np.dtype(np.int64)
+            if index_dtype != files['indptr'].dtype:
+                files['indices'].upcast(index_dtype)
+                files['indptr'].upcast(index_dtype)
+            files['data'].write(block.data)
+            files['indices'].write(block.indices)
+            files['indptr'].write(block.indptr[1:].astype(np.int64) + nnz)
+            n_major += block_n_major
+    except BaseException:
+        # don't leave a partly written matrix on disk, whose arrays wouldn't
+        # match its shape, nor each other
+        for npy_file in files.values():
+            npy_file.abort()
+        raise
+    for npy_file in files.values():
+        npy_file.close()
+
+    if is_csr is None:
+        if 'a' in mode and os.path.exists(shape_fname):
+            return shape
+        # no blocks were written, so write an empty matrix
+        np.save(os.path.join(dirname, 'data.npy'), np.zeros(0, dtype=np.float64))
+        np.save(os.path.join(dirname, 'indices.npy'), np.zeros(0, dtype=np.int32))
+        np.save(os.path.join(dirname, 'indptr.npy'), np.zeros(1, dtype=np.int32))
+    else:
+        shape = (n_major, n_minor) if is_csr else (n_minor, n_major)
+    np.save(shape_fname, np.array(shape, dtype=np.int64))
+    return shape
+
+
+class _NpyAppender(object):
+    """
+    Append 1-dimensional arrays to a ``.npy`` file on disk at ``fname``, and
+    (re-)write its header on :meth:`_NpyAppender.close()`. Headers of new files
+    are padded to a fixed size, so they may be re-written in-place however
+    long the array gets; if ``mode`` is 'a', an existing file's dtype is kept.
+
+    Until the file is closed, :meth:`_NpyAppender.abort()` restores it as it was
+    when opened: an appended-to file is truncated back to its original length
+    and header, and an overwritten or upcast file is kept as a backup until then.
+    """
+
+    def __init__(self, fname, dtype, mode='w'):
+        self.fname = fname
+        self._backup_fname = fname + '.bak'
+        self._existed = os.path.exists(fname)
+        self._has_backup = False
+        self._original = None
+        if self._existed and 'a' not in mode:
+            self._backup()
+        self._open(dtype, mode)
+        if self._existed and 'a' in mode:
+            # record the file's length and header, to truncate back to on abort
+            self._file.seek(0)
+            header = self._file.read(self._header_size)
+            self._file.seek(0, os.SEEK_END)
+            self._original = (self._file.tell(), header)
+
+    def __len__(self):
+        return self.length
+
+    def _open(self, dtype, mode):
+        if 'a' in mode and os.path.exists(self.fname):
+            self._file = open(self.fname, mode='r+b')
+            version = np.lib.format.read_magic(self._file)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(self._file)
+            else:
+                header = np.lib.format.read_array_header_2_0(self._file)
+            (self.length, ), _, self.dtype = header
+            self._header_size = self._file.tell()
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(self.fname, mode='wb')
+            self.length = 0
+            self.dtype = np.dtype(dtype)
+            self._header_size = _NPY_HEADER_SIZE
+            self._write_header()
+
+    def write(self, arr):
+        arr = np.ascontiguousarray(arr, dtype=self.dtype)
+        self._file.write(arr.tobytes())
+        self.length += len(arr)
+
+    def upcast(self, dtype):
+        """Rewrite the array written so far as ``dtype``, streaming block-by-block."""
+        self._close()
+        # the first rewritten file is kept as a backup, to be restored on abort
+        if self._has_backup is True:
+            old_fname = self.fname + '.tmp'
+            _rename(self.fname, old_fname)
+        else:
+            old_fname = self._backup_fname
+            self._backup()
+        self._open(dtype, 'w')
+        old_arr = np.load(old_fname, mmap_mode='r')
+        for i in range(0, len(old_arr), _UPCAST_BLOCK_SIZE):
+            self.write(old_arr[i: i + _UPCAST_BLOCK_SIZE])
+        del old_arr
+        if old_fname != self._backup_fname:
+            os.remove(old_fname)
+
+    def close(self):
+        """Write the file's header and close it, discarding any backup."""
+        self._close()
+        if self._has_backup is True:
+            os.remove(self._backup_fname)
+            self._has_backup = False
+
+    def abort(self):
+        """Close the file, restoring it as it was when opened."""
+        if not self._file.closed:
+            self._file.close()
+        if self._existed is False:
+            for fname in (self.fname, self._backup_fname):
+                if os.path.exists(fname):
+                    os.remove(fname)
+        else:
+            if self._has_backup is True:
+                _rename(self._backup_fname, self.fname)
+            if self._original is not None:
+                length, header = self._original
+                with open(self.fname, mode='r+b') as f:
+                    f.truncate(length)
+                    f.seek(0)
+                    f.write(header)
+        self._has_backup = False
+
+    def _backup(self):
+        _rename(self.fname, self._backup_fname)
+        self._has_backup = True
+
+    def _close(self):
+        if self._file.closed:
+            return
+        self._write_header()
+        self._file.close()
+
+    def _write_header(self):
+        header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+            str(np.lib.format.dtype_to_descr(self.dtype)), self.length)
+        # pad with spaces, as numpy does, such that the header ends in a newline
+        # and the array's data starts at the same offset, regardless of its length
+        n_pad = self._header_size - len(np.lib.format.magic(1, 0)) - 2 - len(header) - 1
+        if n_pad < 0:
+            raise ValueError('header does not fit in "{}"'.format(self.fname))
+        header = (header + ' ' * n_pad + '\n').encode('latin1')
+        self._file.seek(0)
+        self._file.write(np.lib.format.magic(1, 0))
+        self._file.write(np.array(len(header), dtype='<u2').tobytes())
+        self._file.write(header)
+        self._file.seek(0, os.SEEK_END)
+
+
+def _rename(src, dst):
+    # os.rename() won't replace an existing file on windows, and
+    # os.replace() isn't available on py2
+    if os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+_NPY_HEADER_SIZE = 128
+_UPCAST_BLOCK_SIZE = 2 ** 24
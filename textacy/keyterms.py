@@ -6,20 +6,26 @@ Also includes a function to aggregate common key term variants of the same idea.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import bisect
 import collections
+import functools
 import itertools
 import logging
 import math
 import operator
-from decimal import Decimal
 
 import networkx as nx
 import numpy as np
+import scipy.sparse as sp
 from cytoolz import itertoolz
+from scipy.special import gammaln
 
+from . import compat
 from . import extract
 from . import network
 from . import similarity
+from . import text_utils
+from . import utils
 from . import vsm
 
 LOGGER = logging.getLogger(__name__)
@@ -71,7 +77,20 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
         n_keyterms = int(round(n_toks * n_keyterms))
     if window_width < 2:
         raise ValueError('`window_width` must be >= 2')
-    window_width = min(n_toks, window_width)
+    terms = _get_sgrank_candidates(doc, ngrams=ngrams, normalize=normalize, idf=idf)
+    return _rank_sgrank_candidates(
+        terms, n_toks, window_width=window_width, n_keyterms=n_keyterms, idf=idf)
+
+
+def _get_sgrank_candidates(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', idf=None):
+    """
+    Extract and normalize candidate key terms from ``doc`` for :func:`sgrank`.
+
+    Returns:
+        List[Tuple[str, int, int]]: normalized text, position of first token
+        in ``doc``, and number of tokens of each candidate term occurrence
+    """
+    n_toks = len(doc)
     min_term_freq = min(n_toks // 1000, 4)
     if isinstance(ngrams, int):
         ngrams = (ngrams,)
@@ -86,8 +105,14 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
                        include_pos=include_pos, min_freq=min_term_freq)
         for n in ngrams)
 
-    # get normalized term strings, as desired
-    # paired with positional index in document and length in a 3-tuple
+    return _normalize_sgrank_candidates(terms, normalize=normalize)
+
+
+def _normalize_sgrank_candidates(terms, normalize='lemma'):
+    """
+    Get normalized term strings of candidate key terms ``terms``, as desired,
+    paired with positional index in document and length in a 3-tuple.
+    """
     if normalize == 'lemma':
         terms = [(term.lemma_, term.start, len(term)) for term in terms]
     elif normalize == 'lower':
@@ -97,6 +122,16 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
     else:
         terms = [(normalize(term), term.start, len(term)) for term in terms]
 
+    return terms
+
+
+def _rank_sgrank_candidates(terms, n_toks, window_width=1500, n_keyterms=10, idf=None):
+    """
+    Rank candidate key terms, as produced by :func:`_get_sgrank_candidates()`
+    for a doc with ``n_toks`` tokens, via :func:`sgrank`.
+    """
+    window_width = min(n_toks, window_width)
+
     # pre-filter terms to the top N ranked by TF or modified TF*IDF
     n_prefilter_kts = max(3 * n_keyterms, 100)
     term_text_counts = collections.Counter(term[0] for term in terms)
@@ -116,6 +151,7 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
     term_weights = {}
     seen_terms = set()
     n_toks_plus_1 = n_toks + 1
+    superstrings = text_utils.get_superstrings(terms_set)
     for term in terms:
         term_text = term[0]
         # we only want the *first* occurrence of a unique term (by its text)
@@ -126,8 +162,7 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
         # TODO: assess how best to scale term len
         term_len = math.sqrt(term[2])  # term[2]
         term_count = term_text_counts[term_text]
-        subsum_count = sum(term_text_counts[t2] for t2 in terms_set
-                           if t2 != term_text and term_text in t2)
+        subsum_count = sum(term_text_counts[t2] for t2 in superstrings[term_text])
         term_freq_factor = term_count - subsum_count
         if idf and term[2] == 1:
             term_freq_factor *= idf.get(term_text, 1)
@@ -136,40 +171,545 @@ def sgrank(doc, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma', window_width=1500,
     # filter terms to only those with positive weights
     terms = [term for term in terms if term_weights[term[0]] > 0]
 
-    n_coocs = collections.defaultdict(lambda: collections.defaultdict(int))
-    sum_logdists = collections.defaultdict(lambda: collections.defaultdict(float))
-
-    # iterate over windows
-    log_ = math.log  # localize this, for performance
-    for start_ind in range(n_toks):
-        end_ind = start_ind + window_width
-        window_terms = (term for term in terms
-                        if start_ind <= term[1] <= end_ind)
-        # get all token combinations within window
-        for t1, t2 in itertools.combinations(window_terms, 2):
-            n_coocs[t1[0]][t2[0]] += 1
-            sum_logdists[t1[0]][t2[0]] += log_(window_width / max(abs(t1[1] - t2[1]), 1))
-        if end_ind > n_toks:
-            break
+    # assign integer ids to unique terms, then count their co-occurrences and
+    # sum their log-distances within a sliding window over term positions
+    term_to_id = {}
+    for term in terms:
+        term_to_id.setdefault(term[0], len(term_to_id))
+    id_to_term = sorted(term_to_id, key=term_to_id.__getitem__)
+    rows, cols, n_coocs, sum_logdists = _get_sgrank_coocs(
+        [term_to_id[term[0]] for term in terms], [term[1] for term in terms],
+        len(term_to_id), window_width, min(n_toks - window_width + 1, n_toks - 1))
+
+    weights = np.array([term_weights[term] for term in id_to_term], dtype=np.float64)
+    term_ranks = _get_sgrank_term_ranks(
+        id_to_term, weights, rows, cols, n_coocs, sum_logdists)
+
+    return sorted(term_ranks.items(), key=operator.itemgetter(1, 0), reverse=True)[:n_keyterms]
+
+
+def _get_sgrank_term_ranks(id_to_term, weights, rows, cols, n_coocs, sum_logdists,
+                           prev_term_ranks=None):
+    """
+    Rank terms by pagerank on the SGRank graph whose edges are given by term
+    co-occurrence statistics, as produced by :func:`_get_sgrank_coocs()`, and
+    whose nodes are weighted by statistical attributes ``weights``.
 
+    Args:
+        id_to_term (List[str])
+        weights (:class:`numpy.ndarray`): Weight of each term, by term id.
+        rows (:class:`numpy.ndarray`)
+        cols (:class:`numpy.ndarray`)
+        n_coocs (:class:`numpy.ndarray`)
+        sum_logdists (:class:`numpy.ndarray`)
+        prev_term_ranks (Dict[str, float]): Mapping of term to its rank in a
+            previous, similar graph, from which to warm-start pagerank.
+
+    Returns:
+        Dict[str, float]: Mapping of term to its rank, for terms with at least
+        one edge in the graph.
+    """
     # compute edge weights between co-occurring terms (nodes)
-    edge_weights = collections.defaultdict(lambda: collections.defaultdict(float))
-    for t1, t2s in sum_logdists.items():
-        for t2 in t2s:
-            edge_weights[t1][t2] = ((1.0 + sum_logdists[t1][t2]) / n_coocs[t1][t2]) * term_weights[t1] * term_weights[t2]
-    # normalize edge weights by sum of outgoing edge weights per term (node)
-    norm_edge_weights = []
-    for t1, t2s in edge_weights.items():
-        sum_edge_weights = sum(t2s.values())
-        norm_edge_weights.extend((t1, t2, {'weight': weight / sum_edge_weights})
-                                 for t2, weight in t2s.items())
+    # and normalize them by sum of outgoing edge weights per term (node)
+    edge_weights = ((1.0 + sum_logdists) / n_coocs) * weights[rows] * weights[cols]
+    sum_edge_weights = np.bincount(rows, weights=edge_weights, minlength=len(id_to_term))
+    edge_weights /= sum_edge_weights[rows]
 
     # build the weighted directed graph from edges, rank nodes by pagerank
-    graph = nx.DiGraph()
-    graph.add_edges_from(norm_edge_weights)
-    term_ranks = nx.pagerank_scipy(graph)
+    # only terms with at least one edge are nodes in the graph
+    node_ids = np.union1d(rows, cols)
+    adj_mat = sp.csr_matrix(
+        (edge_weights, (np.searchsorted(node_ids, rows), np.searchsorted(node_ids, cols))),
+        shape=(len(node_ids), len(node_ids)))
+    nstart = None
+    if prev_term_ranks:
+        nstart = np.array([prev_term_ranks.get(id_to_term[node_id], 0.0)
+                           for node_id in node_ids.tolist()], dtype=np.float64)
+        if not nstart.sum() > 0:
+            nstart = None
+    return {
+        id_to_term[node_id]: rank
+        for node_id, rank in compat.zip_(
+            node_ids.tolist(), _pagerank(adj_mat, nstart=nstart).tolist())}
+
+
+def _get_sgrank_coocs(term_ids, term_positions, n_terms, window_width,
+                      max_window_start, chunk_size=10000):
+    """
+    Count co-occurrences of terms in windows of ``window_width + 1`` tokens
+    starting at positions ``0`` through ``max_window_start``, as in SGRank, and
+    sum the log-distances between co-occurring terms.
 
-    return sorted(term_ranks.items(), key=operator.itemgetter(1, 0), reverse=True)[:n_keyterms]
+    Rather than checking every term against every window, term occurrences are
+    sorted by position and paired with all those at most ``window_width`` tokens
+    later; each pair is then weighted by the number of windows containing both.
+
+    Args:
+        term_ids (Sequence[int]): Integer id of each term occurrence, in
+            the order in which pairs of occurrences are oriented: a pair is
+            counted from the earlier occurrence's term to the later one's.
+        term_positions (Sequence[int]): Token position of each term occurrence.
+        n_terms (int): Number of unique term ids.
+        window_width (int)
+        max_window_start (int): Position of the last window's first token.
+        chunk_size (int): Number of occurrences whose pairs are generated and
+            summed at once, which bounds memory usage on long documents.
+
+    Returns:
+        :class:`numpy.ndarray`: Row (from) term id of each co-occurring term pair.
+
+        :class:`numpy.ndarray`: Column (to) term id of each co-occurring term pair.
+
+        :class:`numpy.ndarray`: Number of co-occurrences of each term pair.
+
+        :class:`numpy.ndarray`: Summed log-distances of each term pair.
+    """
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    term_positions = np.asarray(term_positions, dtype=np.int64)
+    order = np.argsort(term_positions, kind='mergesort')
+    sorted_positions = term_positions[order]
+
+    keys = np.array([], dtype=np.int64)
+    n_coocs = np.array([], dtype=np.int64)
+    sum_logdists = np.array([], dtype=np.float64)
+    for firsts, seconds in _iter_sgrank_pairs(
+            sorted_positions, np.arange(len(order)), window_width, chunk_size=chunk_size):
+        lo_positions = sorted_positions[firsts]
+        hi_positions = sorted_positions[seconds]
+        counts = (np.minimum(lo_positions, max_window_start) -
+                  np.maximum(hi_positions - window_width, 0) + 1)
+        mask = counts > 0
+        counts = counts[mask]
+        dists = np.maximum(hi_positions[mask] - lo_positions[mask], 1)
+        firsts = order[firsts[mask]]
+        seconds = order[seconds[mask]]
+        rows = term_ids[np.minimum(firsts, seconds)]
+        cols = term_ids[np.maximum(firsts, seconds)]
+        # accumulate this chunk's pairs into the running totals
+        chunk_keys = np.concatenate((keys, rows * n_terms + cols))
+        keys, inverse = np.unique(chunk_keys, return_inverse=True)
+        n_coocs = np.bincount(
+            inverse, weights=np.concatenate((n_coocs, counts)),
+            minlength=len(keys)).astype(np.int64)
+        sum_logdists = np.bincount(
+            inverse, weights=np.concatenate((sum_logdists, counts * np.log(window_width / dists))),
+            minlength=len(keys))
+
+    return keys // n_terms, keys % n_terms, n_coocs, sum_logdists
+
+
+def _iter_sgrank_pairs(sorted_positions, first_idxs, window_width, chunk_size=10000):
+    """
+    Iterate over pairs of term occurrences at most ``window_width`` tokens
+    apart, in chunks of ``chunk_size`` first occurrences.
+
+    Args:
+        sorted_positions (:class:`numpy.ndarray`): Token position of each term
+            occurrence, sorted in ascending order.
+        first_idxs (:class:`numpy.ndarray`): Sorted indexes into ``sorted_positions``
+            of the occurrences to pair with all those that come after them.
+        window_width (int)
+        chunk_size (int)
+
+    Yields:
+        :class:`numpy.ndarray`: Index of the first occurrence in each pair.
+
+        :class:`numpy.ndarray`: Index of the second occurrence in each pair.
+    """
+    # index just past the last occurrence within reach of each first occurrence
+    reaches = np.searchsorted(
+        sorted_positions, sorted_positions[first_idxs] + window_width, side='right')
+    for chunk_start in range(0, len(first_idxs), chunk_size):
+        inds = first_idxs[chunk_start: chunk_start + chunk_size]
+        n_pairs = reaches[chunk_start: chunk_start + chunk_size] - inds - 1
+        firsts = np.repeat(inds, n_pairs)
+        seconds = (firsts + 1 + np.arange(n_pairs.sum()) -
+                   np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs))
+        yield firsts, seconds
+
+
+class IncrementalSGRank(object):
+    """
+    Extract key terms from a document that grows over time, e.g. a live
+    transcript, using the [SGRank]_ algorithm, without re-processing the full
+    document for every refresh. For example::
+
+        >>> extractor = IncrementalSGRank(ngrams=(1, 2, 3), idf=idf)
+        >>> for doc in growing_docs:
+        ...     extractor.update(doc)
+        ...     print(extractor.get_keyterms(n_keyterms=5))
+
+    Candidate term counts, first positions, and co-occurrence statistics are
+    kept between updates, so :meth:`update()` only processes tokens appended
+    since the previous update, and :meth:`get_keyterms()` ranks terms from
+    this state, warm-starting pagerank from the previously computed ranks.
+    Results are the same as those of :func:`sgrank()` on the full document,
+    up to the convergence tolerance of pagerank.
+
+    Args:
+        ngrams (int or Set[int]): n of which n-grams to include; see :func:`sgrank()`
+        normalize (str or callable): see :func:`sgrank()`
+        window_width (int): see :func:`sgrank()`
+        idf (dict): see :func:`sgrank()`
+
+    Attributes:
+        n_toks (int): Number of tokens in the document processed so far.
+
+    Raises:
+        ValueError: If ``window_width`` < 2.
+
+    Note:
+        Tokens that were already processed aren't read again, so they must not
+        change between updates, e.g. by re-tagging the full, grown text.
+    """
+
+    def __init__(self, ngrams=(1, 2, 3, 4, 5, 6), normalize='lemma',
+                 window_width=1500, idf=None):
+        if window_width < 2:
+            raise ValueError('`window_width` must be >= 2')
+        if isinstance(ngrams, int):
+            ngrams = (ngrams,)
+        self.ngrams = tuple(ngrams)
+        self.normalize = normalize
+        self.window_width = window_width
+        self.idf = idf
+        self.n_toks = 0
+        # candidate term occurrences are grouped by "key", i.e. their unique
+        # combination of normalized term and (lowercased text, n) "surface",
+        # since terms are counted by the former but filtered by the latter
+        self._term_to_id = {}
+        self._id_to_term = []
+        self._surface_to_id = {}
+        self._surface_counts = []
+        self._key_to_id = {}
+        self._key_term_ids = []
+        self._key_surface_ids = []
+        self._key_ngram_idxs = []
+        self._key_counts = []
+        self._key_first_positions = []
+        # key, position, and index in ngrams of all occurrences, sorted by position
+        self._occ_keys = np.array([], dtype=np.int64)
+        self._occ_positions = np.array([], dtype=np.int64)
+        self._occ_ngram_idxs = np.array([], dtype=np.int64)
+        # co-occurrence stats of key pairs, see :meth:`_add_coocs()`, with
+        # recently added stats buffered until there are as many as already summed
+        self._cooc_mats = [sp.csr_matrix((0, 0), dtype=np.float64) for _ in range(4)]
+        self._cooc_buffer = []
+        self._n_buffered_coocs = 0
+        self._term_ranks = {}
+
+    def update(self, doc):
+        """
+        Add candidate terms and their co-occurrences from tokens in ``doc``
+        past the first :attr:`n_toks`, i.e. those appended since the previous update.
+
+        Args:
+            doc (``textacy.Doc`` or ``spacy.Doc``): Full document, whose first
+                :attr:`n_toks` tokens are the ones processed by previous updates.
+
+        Raises:
+            ValueError: If ``doc`` has fewer than :attr:`n_toks` tokens.
+        """
+        prev_n_toks = self.n_toks
+        n_toks = len(doc)
+        if n_toks < prev_n_toks:
+            raise ValueError(
+                '`doc` has {} tokens, but {} tokens were already processed'.format(
+                    n_toks, prev_n_toks))
+        if n_toks == prev_n_toks:
+            return
+
+        # new candidate terms are those ending in the new tokens,
+        # so they may start up to ``n - 1`` tokens before them
+        span_start = max(prev_n_toks - max(self.ngrams) + 1, 0)
+        span = doc[span_start:]
+        include_pos = {'NOUN', 'PROPN', 'ADJ', 'VERB'} if self.idf else {'NOUN', 'PROPN', 'ADJ'}
+        occ_keys = []
+        occ_positions = []
+        occ_ngram_idxs = []
+        for ngram_idx, n in enumerate(self.ngrams):
+            spans = [
+                term for term in extract.ngrams(
+                    span, n, filter_stops=True, filter_punct=True, filter_nums=False,
+                    include_pos=include_pos)
+                if term.end > prev_n_toks]
+            terms = _normalize_sgrank_candidates(spans, normalize=self.normalize)
+            for term_span, term in compat.zip_(spans, terms):
+                key_id = self._get_key_id(term[0], term_span.lower_, n, ngram_idx, term[1])
+                self._key_counts[key_id] += 1
+                self._surface_counts[self._key_surface_ids[key_id]] += 1
+                occ_keys.append(key_id)
+                occ_positions.append(term[1])
+                occ_ngram_idxs.append(ngram_idx)
+
+        # merge new occurrences into those sorted by position; only the previous
+        # occurrences that start within the span can come after new ones
+        n_prev_occs = len(self._occ_keys)
+        keys = np.concatenate((self._occ_keys, np.array(occ_keys, dtype=np.int64)))
+        positions = np.concatenate(
+            (self._occ_positions, np.array(occ_positions, dtype=np.int64)))
+        ngram_idxs = np.concatenate(
+            (self._occ_ngram_idxs, np.array(occ_ngram_idxs, dtype=np.int64)))
+        tail_idx = np.searchsorted(self._occ_positions, span_start, side='left')
+        order = np.concatenate((
+            np.arange(tail_idx),
+            tail_idx + np.argsort(positions[tail_idx:], kind='mergesort')))
+        is_new = order >= n_prev_occs
+        self._occ_keys = keys = keys[order]
+        self._occ_positions = positions = positions[order]
+        self._occ_ngram_idxs = ngram_idxs = ngram_idxs[order]
+        self.n_toks = n_toks
+
+        prev_max_window_start = self._get_max_window_start(prev_n_toks)
+        max_window_start = self._get_max_window_start(n_toks)
+        # add pairs of occurrences involving at least one new occurrence
+        if occ_keys:
+            first_new_position = positions[is_new][0]
+            first_idxs = np.arange(
+                np.searchsorted(positions, first_new_position - self.window_width, side='left'),
+                len(positions))
+            for firsts, seconds in _iter_sgrank_pairs(positions, first_idxs, self.window_width):
+                mask = is_new[firsts] | is_new[seconds]
+                self._add_coocs(
+                    keys, positions, ngram_idxs, firsts[mask], seconds[mask], max_window_start)
+        # finalize previous pairs whose first occurrence is now in all possible windows
+        first_idxs = np.arange(
+            np.searchsorted(positions, prev_max_window_start, side='right'),
+            np.searchsorted(positions, max_window_start, side='right'))
+        for firsts, seconds in _iter_sgrank_pairs(positions, first_idxs, self.window_width):
+            mask = ~(is_new[firsts] | is_new[seconds])
+            self._add_coocs(
+                keys, positions, ngram_idxs, firsts[mask], seconds[mask], max_window_start,
+                is_finalizing=True)
+
+    def _get_key_id(self, term, lower, n, ngram_idx, position):
+        term_id = self._term_to_id.setdefault(term, len(self._term_to_id))
+        if term_id == len(self._id_to_term):
+            self._id_to_term.append(term)
+        surface_id = self._surface_to_id.setdefault((lower, n), len(self._surface_to_id))
+        if surface_id == len(self._surface_counts):
+            self._surface_counts.append(0)
+        key_id = self._key_to_id.setdefault((term_id, surface_id), len(self._key_to_id))
+        # occurrences are added in order of position, so the first one sticks
+        if key_id == len(self._key_counts):
+            self._key_term_ids.append(term_id)
+            self._key_surface_ids.append(surface_id)
+            self._key_ngram_idxs.append(ngram_idx)
+            self._key_counts.append(0)
+            self._key_first_positions.append(position)
+        return key_id
+
+    def _get_max_window_start(self, n_toks):
+        return min(n_toks - min(n_toks, self.window_width) + 1, n_toks - 1)
+
+    def _add_coocs(self, keys, positions, ngram_idxs, firsts, seconds, max_window_start,
+                   is_finalizing=False):
+        """
+        Add co-occurrence stats of pairs of occurrences ``firsts`` and ``seconds``
+        to the running totals of their keys' pairs.
+
+        A pair whose first occurrence is at position ``lo`` and second at ``hi``
+        co-occurs in ``min(lo, max_window_start) - excess + 1`` windows, where
+        ``excess = max(hi - window_width, 0)`` is fixed, but ``max_window_start``
+        grows with the document while ``lo`` exceeds it. So, the pair's count is
+        split into parts independent of ``max_window_start`` and those to be
+        multiplied by ``max_window_start + 1``, the latter only while pending;
+        the same goes for counts times log-distance.
+
+        Args:
+            is_finalizing (bool): If True, pairs were previously added while
+                pending, and are moved from the pending to the fixed parts.
+        """
+        lo_positions = positions[firsts]
+        hi_positions = positions[seconds]
+        log_dists = np.log(np.maximum(hi_positions - lo_positions, 1))
+        if is_finalizing is True:
+            fixed_counts = lo_positions + 1
+            pending_counts = np.full(len(firsts), -1, dtype=np.int64)
+        else:
+            excesses = np.maximum(hi_positions - self.window_width, 0)
+            is_fixed = lo_positions <= max_window_start
+            fixed_counts = np.where(is_fixed, lo_positions - excesses + 1, -excesses)
+            pending_counts = (~is_fixed).astype(np.int64)
+        # orient pairs by order of occurrence in the full list of candidate terms,
+        # i.e. by index in ngrams, then position
+        is_flipped = ngram_idxs[seconds] < ngram_idxs[firsts]
+        rows = keys[np.where(is_flipped, seconds, firsts)]
+        cols = keys[np.where(is_flipped, firsts, seconds)]
+        self._cooc_buffer.append((rows, cols, np.vstack(
+            (fixed_counts, pending_counts, fixed_counts * log_dists, pending_counts * log_dists))))
+        self._n_buffered_coocs += len(rows)
+        if self._n_buffered_coocs >= max(self._cooc_mats[0].nnz, 100000):
+            self._flush_coocs()
+
+    def _flush_coocs(self):
+        """Sum buffered co-occurrence stats into the running totals."""
+        if not self._cooc_buffer:
+            return
+        n_keys = len(self._key_counts)
+        rows = np.concatenate([item[0] for item in self._cooc_buffer])
+        cols = np.concatenate([item[1] for item in self._cooc_buffer])
+        values = np.concatenate([item[2] for item in self._cooc_buffer], axis=1)
+        self._cooc_mats = [
+            _resize_csr_matrix(mat, (n_keys, n_keys)) +
+            sp.csr_matrix((mat_values, (rows, cols)), shape=(n_keys, n_keys))
+            for mat, mat_values in compat.zip_(self._cooc_mats, values)]
+        self._cooc_buffer = []
+        self._n_buffered_coocs = 0
+
+    def _get_term_coocs(self, key_term_ids, n_terms):
+        """
+        Sum co-occurrence stats of key pairs by their terms' pairs, for keys
+        with a term id in ``key_term_ids`` other than -1.
+
+        Returns:
+            :class:`numpy.ndarray`: Row (from) term id of each term pair.
+
+            :class:`numpy.ndarray`: Column (to) term id of each term pair.
+
+            :class:`numpy.ndarray`: 2D array of summed stats of each term pair,
+            one row per type of stat.
+        """
+        key_ids = np.flatnonzero(key_term_ids >= 0)
+        n_keys = len(key_term_ids)
+        codes = []
+        stat_idxs = []
+        values = []
+        # only the rows and columns of selected keys are read from the totals
+        for stat_idx, mat in enumerate(self._cooc_mats):
+            mat = _resize_csr_matrix(mat, (n_keys, n_keys))[key_ids][:, key_ids].tocoo()
+            codes.append(key_term_ids[key_ids[mat.row]] * n_terms +
+                         key_term_ids[key_ids[mat.col]])
+            stat_idxs.append(np.full(mat.nnz, stat_idx, dtype=np.int64))
+            values.append(mat.data)
+        for rows, cols, buffered_values in self._cooc_buffer:
+            mask = (key_term_ids[rows] >= 0) & (key_term_ids[cols] >= 0)
+            for stat_idx, stat_values in enumerate(buffered_values):
+                codes.append(key_term_ids[rows[mask]] * n_terms + key_term_ids[cols[mask]])
+                stat_idxs.append(np.full(mask.sum(), stat_idx, dtype=np.int64))
+                values.append(stat_values[mask])
+        codes, inverse = np.unique(np.concatenate(codes), return_inverse=True)
+        stat_idxs = np.concatenate(stat_idxs)
+        values = np.concatenate(values)
+        stats = np.vstack([
+            np.bincount(inverse[stat_idxs == stat_idx],
+                        weights=values[stat_idxs == stat_idx], minlength=len(codes))
+            for stat_idx in range(len(self._cooc_mats))])
+        return codes // n_terms, codes % n_terms, stats
+
+    def get_keyterms(self, n_keyterms=10):
+        """
+        Rank candidate key terms in the document processed so far.
+
+        Args:
+            n_keyterms (int or float): see :func:`sgrank()`
+
+        Returns:
+            List[Tuple[str, float]]: sorted list of top ``n_keyterms`` key terms
+            and their corresponding SGRank scores
+
+        Raises:
+            ValueError: If ``n_keyterms`` is a float but not in (0.0, 1.0].
+        """
+        n_toks = self.n_toks
+        if isinstance(n_keyterms, float):
+            if not 0.0 < n_keyterms <= 1.0:
+                raise ValueError('`n_keyterms` must be an int, or a float between 0.0 and 1.0')
+            n_keyterms = int(round(n_toks * n_keyterms))
+        if n_toks == 0:
+            return []
+        window_width = min(n_toks, self.window_width)
+        n_terms = len(self._id_to_term)
+        key_term_ids = np.array(self._key_term_ids, dtype=np.int64)
+        key_counts = np.array(self._key_counts, dtype=np.int64)
+        # filter out keys whose surface forms are too infrequent
+        min_term_freq = min(n_toks // 1000, 4)
+        is_valid_key = (np.array(self._surface_counts, dtype=np.int64)[
+            np.array(self._key_surface_ids, dtype=np.int64)] >= min_term_freq)
+        term_counts = np.bincount(
+            key_term_ids[is_valid_key], weights=key_counts[is_valid_key],
+            minlength=n_terms).astype(np.int64)
+        # position of each term's first occurrence in the full list of candidates
+        key_orders = (np.array(self._key_ngram_idxs, dtype=np.int64) * (n_toks + 1) +
+                      np.array(self._key_first_positions, dtype=np.int64))
+        term_orders = np.full(n_terms, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(term_orders, key_term_ids[is_valid_key], key_orders[is_valid_key])
+
+        # pre-filter terms to the top N ranked by TF or modified TF*IDF
+        n_prefilter_kts = max(3 * n_keyterms, 100)
+        term_ids = np.flatnonzero(term_counts)
+        if self.idf:
+            scores = np.array(
+                [count * self.idf.get(term, 1) if ' ' not in term else count
+                 for term, count in compat.zip_(
+                     (self._id_to_term[term_id] for term_id in term_ids.tolist()),
+                     term_counts[term_ids].tolist())],
+                dtype=np.float64)
+        else:
+            scores = term_counts[term_ids]
+        term_ids = term_ids[
+            np.lexsort((term_orders[term_ids], -scores))[:n_prefilter_kts]]
+        term_ids = term_ids[np.argsort(term_orders[term_ids], kind='mergesort')]
+
+        # compute term weights from statistical attributes:
+        # not subsumed frequency, position of first occurrence, and num words
+        terms_set = {self._id_to_term[term_id] for term_id in term_ids.tolist()}
+        superstrings = text_utils.get_superstrings(terms_set)
+        weights = np.zeros(n_terms, dtype=np.float64)
+        n_toks_plus_1 = n_toks + 1
+        for term_id in term_ids.tolist():
+            term = self._id_to_term[term_id]
+            ngram_idx, position = divmod(int(term_orders[term_id]), n_toks_plus_1)
+            n = self.ngrams[ngram_idx]
+            pos_first_occ_factor = math.log(n_toks_plus_1 / (position + 1))
+            term_len = math.sqrt(n)
+            subsum_count = sum(
+                int(term_counts[self._term_to_id[t2]]) for t2 in superstrings[term])
+            term_freq_factor = int(term_counts[term_id]) - subsum_count
+            if self.idf and n == 1:
+                term_freq_factor *= self.idf.get(term, 1)
+            weights[term_id] = term_freq_factor * pos_first_occ_factor * term_len
+
+        # filter terms to only those with positive weights, then sum
+        # their keys' co-occurrence stats by pairs of terms
+        term_ids = term_ids[weights[term_ids] > 0]
+        id_to_term = [self._id_to_term[term_id] for term_id in term_ids.tolist()]
+        new_term_ids = np.full(n_terms, -1, dtype=np.int64)
+        new_term_ids[term_ids] = np.arange(len(term_ids))
+        rows, cols, stats = self._get_term_coocs(
+            np.where(is_valid_key, new_term_ids[key_term_ids], -1), len(id_to_term))
+        coeff = self._get_max_window_start(n_toks) + 1
+        n_coocs = np.rint(stats[0] + coeff * stats[1])
+        is_cooc = n_coocs > 0
+        rows = rows[is_cooc]
+        cols = cols[is_cooc]
+        n_coocs = n_coocs[is_cooc]
+        sum_logdists = (math.log(window_width) * n_coocs -
+                        (stats[2] + coeff * stats[3])[is_cooc])
+
+        self._term_ranks = _get_sgrank_term_ranks(
+            id_to_term, weights[term_ids], rows, cols, n_coocs, sum_logdists,
+            prev_term_ranks=self._term_ranks)
+        return sorted(
+            self._term_ranks.items(), key=operator.itemgetter(1, 0), reverse=True)[:n_keyterms]
+
+
+def _resize_csr_matrix(mat, shape):
+    """
+    Enlarge sparse matrix ``mat`` to ``shape``, padding it with empty rows
+    and columns.
+    """
+    indptr = np.concatenate(
+        (mat.indptr, np.full(shape[0] - mat.shape[0], mat.indptr[-1], dtype=mat.indptr.dtype)))
+    return sp.csr_matrix((mat.data, mat.indices, indptr), shape=shape)
+
+
+_TEXTRANK_PARAMS = {
+    'window_width': 2, 'edge_weighting': 'binary',
+    'ranking_algo': 'pagerank', 'join_key_words': False}
+_SINGLERANK_PARAMS = {
+    'window_width': 10, 'edge_weighting': 'cooc_freq',
+    'ranking_algo': 'pagerank', 'join_key_words': True}
 
 
 def textrank(doc, normalize='lemma', n_keyterms=10):
@@ -195,8 +735,7 @@ def textrank(doc, normalize='lemma', n_keyterms=10):
            order into texts. Association for Computational Linguistics.
     """
     return key_terms_from_semantic_network(
-        doc, normalize=normalize, window_width=2, edge_weighting='binary',
-        ranking_algo='pagerank', join_key_words=False, n_keyterms=n_keyterms)
+        doc, normalize=normalize, n_keyterms=n_keyterms, **_TEXTRANK_PARAMS)
 
 
 def singlerank(doc, normalize='lemma', n_keyterms=10):
@@ -224,8 +763,7 @@ def singlerank(doc, normalize='lemma', n_keyterms=10):
            Posters (pp. 365-373). Association for Computational Linguistics.
     """
     return key_terms_from_semantic_network(
-        doc, normalize=normalize, window_width=10, edge_weighting='cooc_freq',
-        ranking_algo='pagerank', join_key_words=True, n_keyterms=n_keyterms)
+        doc, normalize=normalize, n_keyterms=n_keyterms, **_SINGLERANK_PARAMS)
 
 
 def key_terms_from_semantic_network(doc, normalize='lemma',
@@ -272,7 +810,23 @@ def key_terms_from_semantic_network(doc, normalize='lemma',
         if not 0.0 < n_keyterms <= 1.0:
             raise ValueError('`n_keyterms` must be an int, or a float between 0.0 and 1.0')
         n_keyterms = int(round(len(doc) * n_keyterms))
+    word_list, good_word_list = _get_semantic_network_candidates(doc, normalize=normalize)
+    return _rank_semantic_network_candidates(
+        word_list, good_word_list, window_width=window_width,
+        edge_weighting=edge_weighting, ranking_algo=ranking_algo,
+        join_key_words=join_key_words, n_keyterms=n_keyterms, **kwargs)
+
+
+def _get_semantic_network_candidates(doc, normalize='lemma'):
+    """
+    Extract and normalize all words in ``doc`` plus the subset of "good" words
+    that are candidate key words for :func:`key_terms_from_semantic_network`.
+
+    Returns:
+        List[str]: all words in ``doc``
 
+        List[str]: candidate key words in ``doc``
+    """
     include_pos = {'NOUN', 'PROPN', 'ADJ'}
     if normalize == 'lemma':
         word_list = [word.lemma_ for word in doc]
@@ -295,18 +849,31 @@ def key_terms_from_semantic_network(doc, normalize='lemma',
     # and may well happen with ``normalize`` as a callable
     # an empty string should never be considered a keyterm
     good_word_list = [word for word in good_word_list if word]
-    graph = network.terms_to_semantic_network(
-        good_word_list, window_width=window_width, edge_weighting=edge_weighting)
 
+    return word_list, good_word_list
+
+
+def _rank_semantic_network_candidates(word_list, good_word_list,
+                                      window_width=2, edge_weighting='binary',
+                                      ranking_algo='pagerank', join_key_words=False,
+                                      n_keyterms=10, **kwargs):
+    """
+    Rank candidate key words, as produced by :func:`_get_semantic_network_candidates()`,
+    via :func:`key_terms_from_semantic_network`.
+    """
     # rank nodes by algorithm, and sort in descending order
+    cooc_mat, id_to_word = network.terms_to_cooc_matrix(
+        good_word_list, window_width=window_width, edge_weighting=edge_weighting)
     if ranking_algo == 'pagerank':
-        word_ranks = nx.pagerank_scipy(graph, weight='weight')
+        word_id_ranks = rank_nodes_by_pagerank(cooc_mat)
     elif ranking_algo == 'divrank':
-        word_ranks = rank_nodes_by_divrank(
-            graph, r=None, lambda_=kwargs.get('lambda_', 0.5), alpha=kwargs.get('alpha', 0.5))
+        word_id_ranks = rank_nodes_by_divrank(
+            cooc_mat, r=None, lambda_=kwargs.get('lambda_', 0.5), alpha=kwargs.get('alpha', 0.5))
     elif ranking_algo == 'bestcoverage':
-        word_ranks = rank_nodes_by_bestcoverage(
-            graph, k=n_keyterms, c=kwargs.get('c', 1), alpha=kwargs.get('alpha', 1.0))
+        word_id_ranks = rank_nodes_by_bestcoverage(
+            cooc_mat, k=n_keyterms, c=kwargs.get('c', 1), alpha=kwargs.get('alpha', 1.0))
+    word_ranks = {
+        id_to_word[word_id]: rank for word_id, rank in word_id_ranks.items()}
 
     # bail out here if all we wanted was key *words* and not *terms*
     if join_key_words is False:
@@ -332,8 +899,172 @@ def key_terms_from_semantic_network(doc, normalize='lemma',
     return sorted(joined_key_terms, key=operator.itemgetter(1, 0), reverse=True)[:n_keyterms]
 
 
+_SEMANTIC_NETWORK_KWARGS = {
+    'window_width', 'edge_weighting', 'ranking_algo', 'join_key_words',
+    'lambda_', 'alpha', 'c'}
+_BATCH_KWARGS = {
+    'sgrank': {'window_width', 'ngrams'},
+    'textrank': _SEMANTIC_NETWORK_KWARGS,
+    'singlerank': _SEMANTIC_NETWORK_KWARGS}
+
+
+def batch(docs, algorithms='sgrank', normalize='lemma', n_keyterms=10,
+          idf=None, n_jobs=1, chunk_size=10):
+    """
+    Extract key terms from each of many documents using one or more algorithms,
+    optionally in parallel. Candidate terms are extracted and normalized just
+    once per document and shared by all algorithms that use the same candidates,
+    and inverse document frequencies are computed just once for all documents.
+
+    Extract the top 5 key terms from each doc in a corpus via SGRank and SingleRank,
+    using 4 processes::
+
+        >>> for doc_keyterms in keyterms.batch(
+        ...         corpus, algorithms=('sgrank', 'singlerank'), n_keyterms=5, n_jobs=4):
+        ...     print(doc_keyterms['sgrank'])
+
+    Args:
+        docs (:class:`Corpus <textacy.corpus.Corpus>` or Iterable[:class:`Doc <textacy.doc.Doc>`] or Iterable[``spacy.Doc``]):
+            Documents from which to extract key terms.
+        algorithms (str or Sequence[str] or Dict[str, dict]): Name(s) of the
+            algorithm(s) with which to extract key terms, any of "sgrank",
+            "textrank", or "singlerank". If a dict, keys are algorithm names and
+            values are dicts of keyword arguments passed into them, overriding
+            their defaults, e.g. ``{'sgrank': {'window_width': 500}}``. Valid
+            arguments for "sgrank" are "window_width" and "ngrams", as in
+            :func:`sgrank`; for "textrank" and "singlerank", any of those
+            accepted by :func:`key_terms_from_semantic_network`.
+        normalize (str or callable): If 'lemma', lemmatize terms; if 'lower',
+            lowercase terms; if None, use the form of terms as they appeared in
+            ``doc``; if a callable, must accept a ``spacy.Span`` or ``spacy.Token``
+            and return a str.
+        n_keyterms (int or float): Number of top-ranked terms to return as
+            keyterms per doc. If a float, must be in the interval (0.0, 1.0],
+            and is converted to an integer by ``int(round(len(doc) * n_keyterms))``.
+        idf (dict): Mapping of ``normalize(term)`` to inverse document frequency,
+            used by SGRank. If None and ``docs`` is a ``Corpus``, it's computed
+            from the corpus via :meth:`Corpus.word_doc_freqs() <textacy.corpus.Corpus.word_doc_freqs>`,
+            which only supports ``normalize`` values 'lemma', 'lower', and None;
+            to use no idfs at all, pass an empty dict.
+        n_jobs (int): Number of worker processes among which key term extraction
+            is split. If 1, everything runs in the current process; if -1, all
+            available CPUs are used.
+        chunk_size (int): Number of docs sent to a worker process at a time.
+
+    Returns:
+        Iterator[Dict[str, List[Tuple[str, float]]]]: Mapping of algorithm name
+        to the sorted list of top key terms and their scores, for each doc
+        in ``docs`` in order.
+
+    Raises:
+        ValueError: If any of ``algorithms`` or their keyword arguments is invalid,
+            if ``n_keyterms`` is a float outside of (0.0, 1.0], or if ``normalize``
+            is a callable while ``idf`` is None and ``docs`` is a ``Corpus``.
+            Arguments are validated on calling this function, rather than on
+            iterating over its results.
+    """
+    if isinstance(algorithms, compat.string_types):
+        algorithms = {algorithms: {}}
+    elif not isinstance(algorithms, dict):
+        algorithms = {algorithm: {} for algorithm in algorithms}
+    invalid_algorithms = set(algorithms).difference({'sgrank', 'textrank', 'singlerank'})
+    if invalid_algorithms:
+        raise ValueError(
+            'invalid `algorithms` {}; valid values are "sgrank", "textrank", '
+            'and "singlerank"'.format(sorted(invalid_algorithms)))
+    for algorithm, algorithm_kwargs in algorithms.items():
+        invalid_kwargs = set(algorithm_kwargs or {}).difference(_BATCH_KWARGS[algorithm])
+        if invalid_kwargs:
+            raise ValueError(
+                'invalid keyword arguments {} for "{}"; valid arguments are {}'.format(
+                    sorted(invalid_kwargs), algorithm, sorted(_BATCH_KWARGS[algorithm])))
+    if (algorithms.get('sgrank') or {}).get('window_width', 1500) < 2:
+        raise ValueError('`window_width` must be >= 2')
+    if isinstance(n_keyterms, float) and not 0.0 < n_keyterms <= 1.0:
+        raise ValueError('`n_keyterms` must be an int, or a float between 0.0 and 1.0')
+
+    compute_idf = idf is None and 'sgrank' in algorithms and hasattr(docs, 'word_doc_freqs')
+    if compute_idf is True and callable(normalize):
+        raise ValueError(
+            'idfs can\'t be computed from a Corpus for a callable `normalize`, '
+            'since its keys wouldn\'t match normalized terms; pass in `idf` '
+            'computed with the same normalization, or an empty dict to use none')
+    # the generator is separate, so that arguments are validated on calling batch()
+    return _batch(
+        docs, algorithms, normalize, n_keyterms, idf, compute_idf, n_jobs, chunk_size)
+
+
+def _batch(docs, algorithms, normalize, n_keyterms, idf, compute_idf, n_jobs, chunk_size):
+    """
+    Extract key terms from each of ``docs``, given arguments validated by
+    :func:`batch`, computing idfs from ``docs`` first if ``compute_idf`` is True.
+    """
+    if compute_idf is True:
+        idf = docs.word_doc_freqs(
+            normalize=normalize, weighting='idf', smooth_idf=True, as_strings=True)
+    spacy_docs = utils.to_spacy_docs(docs)
+
+    n_jobs = utils.get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for spacy_doc in spacy_docs:
+            yield _get_doc_keyterms(
+                spacy_doc, algorithms=algorithms, normalize=normalize,
+                n_keyterms=n_keyterms, idf=idf)
+    else:
+        get_doc_keyterms = functools.partial(
+            _get_doc_keyterms_in_worker, algorithms=algorithms,
+            normalize=normalize, n_keyterms=n_keyterms)
+        # idfs may be large, so they're sent to each worker only once, up front
+        for doc_keyterms in utils.imap_in_pool(
+                get_doc_keyterms, spacy_docs, n_jobs, chunk_size=chunk_size,
+                initializer=_init_keyterms_worker, initargs=(idf,)):
+            yield doc_keyterms
+
+
+def _get_doc_keyterms(doc, algorithms, normalize, n_keyterms, idf):
+    """
+    Extract key terms from ``doc`` for each of ``algorithms``, sharing candidate
+    terms among them, given arguments validated by :func:`batch`.
+    """
+    if isinstance(n_keyterms, float):
+        n_keyterms = int(round(len(doc) * n_keyterms))
+    doc_keyterms = {}
+    if 'sgrank' in algorithms:
+        sgrank_kwargs = algorithms['sgrank'] or {}
+        window_width = sgrank_kwargs.get('window_width', 1500)
+        terms = _get_sgrank_candidates(
+            doc, ngrams=sgrank_kwargs.get('ngrams', (1, 2, 3, 4, 5, 6)),
+            normalize=normalize, idf=idf)
+        doc_keyterms['sgrank'] = _rank_sgrank_candidates(
+            terms, len(doc), window_width=window_width, n_keyterms=n_keyterms, idf=idf)
+    if 'textrank' in algorithms or 'singlerank' in algorithms:
+        word_list, good_word_list = _get_semantic_network_candidates(doc, normalize=normalize)
+        for algorithm, params in (('textrank', _TEXTRANK_PARAMS),
+                                  ('singlerank', _SINGLERANK_PARAMS)):
+            if algorithm in algorithms:
+                params = dict(params, **(algorithms[algorithm] or {}))
+                doc_keyterms[algorithm] = _rank_semantic_network_candidates(
+                    word_list, good_word_list, n_keyterms=n_keyterms, **params)
+    return doc_keyterms
+
+
+_worker_idf = None
+
+
+def _init_keyterms_worker(idf):
+    global _worker_idf
+    _worker_idf = idf
+
+
+def _get_doc_keyterms_in_worker(doc, algorithms, normalize, n_keyterms):
+    return _get_doc_keyterms(
+        doc, algorithms=algorithms, normalize=normalize,
+        n_keyterms=n_keyterms, idf=_worker_idf)
+
+
 def most_discriminating_terms(terms_lists, bool_array_grp1,
-                              max_n_terms=1000, top_n_terms=25):
+                              max_n_terms=1000, top_n_terms=25,
+                              doc_term_matrix=None, id_to_term=None):
     """
     Given a collection of documents assigned to 1 of 2 exclusive groups, get the
     `top_n_terms` most discriminating terms for group1-and-not-group2 and
@@ -341,21 +1072,35 @@ def most_discriminating_terms(terms_lists, bool_array_grp1,
 
     Args:
         terms_lists (Iterable[Iterable[str]]): a sequence of documents, each as a
-            sequence of (str) terms; used as input to :func:`doc_term_matrix()`
+            sequence of (str) terms; used as input to :func:`doc_term_matrix()`;
+            ignored if ``doc_term_matrix`` is specified
         bool_array_grp1 (Iterable[bool]): an ordered sequence of True/False values,
             where True corresponds to documents falling into "group 1" and False
             corresponds to those in "group 2"
         max_n_terms (int): only consider terms whose document frequency is within
-            the top `max_n_terms` out of all distinct terms; must be > 0
+            the top `max_n_terms` out of all distinct terms; must be > 0;
+            ignored if ``doc_term_matrix`` is specified
         top_n_terms (int or float): if int (must be > 0), the total number of most
             discriminating terms to return for each group; if float (must be in
             the interval (0, 1)), the fraction of `max_n_terms` to return for each group
+        doc_term_matrix (``scipy.sparse.csr_matrix``): pre-built document-term
+            matrix, with rows aligned with ``bool_array_grp1``; only the presence
+            or absence of terms in documents is used. When comparing many group
+            splits of the same documents, passing this in avoids re-vectorizing
+            them each time. If None, a matrix is built from ``terms_lists``.
+        id_to_term (Dict[int, str] or Sequence[str]): mapping of column
+            index in ``doc_term_matrix`` to term string, e.g.
+            :attr:`Vectorizer.id_to_term <textacy.vsm.Vectorizer.id_to_term>`;
+            required if ``doc_term_matrix`` is specified
 
     Returns:
         List[str]: top `top_n_terms` most discriminating terms for grp1-not-grp2
 
         List[str]: top `top_n_terms` most discriminating terms for grp2-not-grp1
 
+    Raises:
+        ValueError: if ``doc_term_matrix`` is specified without ``id_to_term``
+
     References:
         King, Gary, Patrick Lam, and Margaret Roberts. "Computer-Assisted Keyword
         and Document Set Discovery from Unstructured Text." (2014).
@@ -364,26 +1109,30 @@ def most_discriminating_terms(terms_lists, bool_array_grp1,
     alpha_grp1 = 1
     alpha_grp2 = 1
     if isinstance(top_n_terms, float):
-        top_n_terms = top_n_terms * max_n_terms
-    bool_array_grp1 = np.array(bool_array_grp1)
+        top_n_terms = int(round(top_n_terms * max_n_terms))
+    bool_array_grp1 = np.array(bool_array_grp1, dtype=bool)
     bool_array_grp2 = np.invert(bool_array_grp1)
 
-    vectorizer = vsm.Vectorizer(
-        weighting='tf', normalize=False,
-        sublinear_tf=False, smooth_idf=True,
-        min_df=3, max_df=0.95, min_ic=0.0, max_n_terms=max_n_terms)
-    dtm = vectorizer.fit_transform(terms_lists)
-    id2term = vectorizer.id_to_term
-
-    # get doc freqs for all terms in grp1 documents
-    dtm_grp1 = dtm[bool_array_grp1, :]
-    n_docs_grp1 = dtm_grp1.shape[0]
-    doc_freqs_grp1 = vsm.get_doc_freqs(dtm_grp1, normalized=False)
-
-    # get doc freqs for all terms in grp2 documents
-    dtm_grp2 = dtm[bool_array_grp2, :]
-    n_docs_grp2 = dtm_grp2.shape[0]
-    doc_freqs_grp2 = vsm.get_doc_freqs(dtm_grp2, normalized=False)
+    if doc_term_matrix is None:
+        vectorizer = vsm.Vectorizer(
+            weighting='tf', normalize=False,
+            sublinear_tf=False, smooth_idf=True,
+            min_df=3, max_df=0.95, min_ic=0.0, max_n_terms=max_n_terms)
+        doc_term_matrix = vectorizer.fit_transform(terms_lists)
+        id_to_term = vectorizer.id_to_term
+    elif id_to_term is None:
+        raise ValueError('`id_to_term` must be specified with `doc_term_matrix`')
+
+    # binarize the matrix, then get doc freqs for all terms in grp1 and grp2
+    # documents as products with each group's mask, rather than slicing rows
+    dtm = sp.csr_matrix(doc_term_matrix, copy=True)
+    dtm.eliminate_zeros()
+    dtm.data = np.ones_like(dtm.data, dtype=np.int64)
+    dtm_T = dtm.T.tocsr()
+    n_docs_grp1 = int(bool_array_grp1.sum())
+    n_docs_grp2 = int(bool_array_grp2.sum())
+    doc_freqs_grp1 = dtm_T.dot(bool_array_grp1.astype(np.int64))
+    doc_freqs_grp2 = dtm_T.dot(bool_array_grp2.astype(np.int64))
 
     # get terms that occur in a larger fraction of grp1 docs than grp2 docs
     term_ids_grp1 = np.where(doc_freqs_grp1 / n_docs_grp1 > doc_freqs_grp2 / n_docs_grp2)[0]
@@ -391,45 +1140,57 @@ def most_discriminating_terms(terms_lists, bool_array_grp1,
     # get terms that occur in a larger fraction of grp2 docs than grp1 docs
     term_ids_grp2 = np.where(doc_freqs_grp1 / n_docs_grp1 < doc_freqs_grp2 / n_docs_grp2)[0]
 
-    # get grp1 terms doc freqs in and not-in grp1 and grp2 docs, plus marginal totals
-    grp1_terms_grp1_df = doc_freqs_grp1[term_ids_grp1]
-    grp1_terms_grp2_df = doc_freqs_grp2[term_ids_grp1]
-    # grp1_terms_grp1_not_df = n_docs_grp1 - grp1_terms_grp1_df
-    # grp1_terms_grp2_not_df = n_docs_grp2 - grp1_terms_grp2_df
-    # grp1_terms_total_df = grp1_terms_grp1_df + grp1_terms_grp2_df
-    # grp1_terms_total_not_df = grp1_terms_grp1_not_df + grp1_terms_grp2_not_df
-
-    # get grp2 terms doc freqs in and not-in grp2 and grp1 docs, plus marginal totals
-    grp2_terms_grp2_df = doc_freqs_grp2[term_ids_grp2]
-    grp2_terms_grp1_df = doc_freqs_grp1[term_ids_grp2]
-    # grp2_terms_grp2_not_df = n_docs_grp2 - grp2_terms_grp2_df
-    # grp2_terms_grp1_not_df = n_docs_grp1 - grp2_terms_grp1_df
-    # grp2_terms_total_df = grp2_terms_grp2_df + grp2_terms_grp1_df
-    # grp2_terms_total_not_df = grp2_terms_grp2_not_df + grp2_terms_grp1_not_df
-
-    # get grp1 terms likelihoods, then sort for most discriminating grp1-not-grp2 terms
-    grp1_terms_likelihoods = {}
-    for idx, term_id in enumerate(term_ids_grp1):
-        term1 = Decimal(math.factorial(grp1_terms_grp1_df[idx] + alpha_grp1 - 1)) * Decimal(math.factorial(grp1_terms_grp2_df[idx] + alpha_grp2 - 1)) / Decimal(math.factorial(grp1_terms_grp1_df[idx] + grp1_terms_grp2_df[idx] + alpha_grp1 + alpha_grp2 - 1))
-        term2 = Decimal(math.factorial(n_docs_grp1 - grp1_terms_grp1_df[idx] + alpha_grp1 - 1)) * Decimal(math.factorial(n_docs_grp2 - grp1_terms_grp2_df[idx] + alpha_grp2 - 1)) / Decimal((math.factorial(n_docs_grp1 + n_docs_grp2 - grp1_terms_grp1_df[idx] - grp1_terms_grp2_df[idx] + alpha_grp1 + alpha_grp2 - 1)))
-        grp1_terms_likelihoods[id2term[term_id]] = term1 * term2
-    top_grp1_terms = [term for term, likelihood
-                      in sorted(grp1_terms_likelihoods.items(),
-                                key=operator.itemgetter(1), reverse=True)[:top_n_terms]]
-
-    # get grp2 terms likelihoods, then sort for most discriminating grp2-not-grp1 terms
-    grp2_terms_likelihoods = {}
-    for idx, term_id in enumerate(term_ids_grp2):
-        term1 = Decimal(math.factorial(grp2_terms_grp2_df[idx] + alpha_grp2 - 1)) * Decimal(math.factorial(grp2_terms_grp1_df[idx] + alpha_grp1 - 1)) / Decimal(math.factorial(grp2_terms_grp2_df[idx] + grp2_terms_grp1_df[idx] + alpha_grp2 + alpha_grp1 - 1))
-        term2 = Decimal(math.factorial(n_docs_grp2 - grp2_terms_grp2_df[idx] + alpha_grp2 - 1)) * Decimal(math.factorial(n_docs_grp1 - grp2_terms_grp1_df[idx] + alpha_grp1 - 1)) / Decimal((math.factorial(n_docs_grp2 + n_docs_grp1 - grp2_terms_grp2_df[idx] - grp2_terms_grp1_df[idx] + alpha_grp2 + alpha_grp1 - 1)))
-        grp2_terms_likelihoods[id2term[term_id]] = term1 * term2
-    top_grp2_terms = [term for term, likelihood
-                      in sorted(grp2_terms_likelihoods.items(),
-                                key=operator.itemgetter(1), reverse=True)[:top_n_terms]]
+    # get grp1 terms log-likelihoods, then sort for most discriminating grp1-not-grp2 terms
+    grp1_terms_log_likelihoods = _get_log_likelihoods(
+        doc_freqs_grp1[term_ids_grp1], doc_freqs_grp2[term_ids_grp1],
+        n_docs_grp1, n_docs_grp2, alpha_grp1, alpha_grp2)
+    top_grp1_terms = [
+        id_to_term[term_id] for term_id
+        in term_ids_grp1[_get_top_n_idxs(grp1_terms_log_likelihoods, top_n_terms)]]
+
+    # get grp2 terms log-likelihoods, then sort for most discriminating grp2-not-grp1 terms
+    grp2_terms_log_likelihoods = _get_log_likelihoods(
+        doc_freqs_grp2[term_ids_grp2], doc_freqs_grp1[term_ids_grp2],
+        n_docs_grp2, n_docs_grp1, alpha_grp2, alpha_grp1)
+    top_grp2_terms = [
+        id_to_term[term_id] for term_id
+        in term_ids_grp2[_get_top_n_idxs(grp2_terms_log_likelihoods, top_n_terms)]]
 
     return (top_grp1_terms, top_grp2_terms)
 
 
+def _get_log_likelihoods(dfs_a, dfs_b, n_docs_a, n_docs_b, alpha_a, alpha_b):
+    """
+    Compute log-likelihoods of terms with doc freqs ``dfs_a`` and ``dfs_b`` in
+    groups of ``n_docs_a`` and ``n_docs_b`` docs, respectively, under a
+    Dirichlet-multinomial model, using ``log(x!) = gammaln(x + 1)``.
+    """
+    dfs_a = np.asarray(dfs_a, dtype=np.float64)
+    dfs_b = np.asarray(dfs_b, dtype=np.float64)
+    term1 = (gammaln(dfs_a + alpha_a) + gammaln(dfs_b + alpha_b) -
+             gammaln(dfs_a + dfs_b + alpha_a + alpha_b))
+    term2 = (gammaln(n_docs_a - dfs_a + alpha_a) + gammaln(n_docs_b - dfs_b + alpha_b) -
+             gammaln(n_docs_a + n_docs_b - dfs_a - dfs_b + alpha_a + alpha_b))
+    return term1 + term2
+
+
+def _get_top_n_idxs(values, top_n):
+    """
+    Get the indexes of the ``top_n`` largest ``values``, in descending order
+    of value, with ties broken by index, as a stable sort would.
+    """
+    if top_n <= 0 or len(values) == 0:
+        return np.array([], dtype=np.int64)
+    if top_n < len(values):
+        # keep everything tied with the n-th largest value, then sort just those
+        threshold = np.partition(values, len(values) - top_n)[len(values) - top_n]
+        idxs = np.flatnonzero(values >= threshold)
+    else:
+        idxs = np.arange(len(values))
+    idxs = idxs[np.lexsort((idxs, -values[idxs]))]
+    return idxs[:top_n]
+
+
 def aggregate_term_variants(terms,
                             acro_defs=None,
                             fuzzy_dedupe=True):
@@ -457,7 +1218,22 @@ def aggregate_term_variants(terms,
     """
     agg_terms = []
     seen_terms = set()
-    for term in sorted(terms, key=len, reverse=True):
+    sorted_terms = sorted(terms, key=len, reverse=True)
+
+    # map lowercased acronyms to their definitions and vice versa, keeping only
+    # the first matching (acronym, definition) pair, with acronyms matched first
+    if acro_defs:
+        acro_to_def = {}
+        def_to_acro = {}
+        for idx, (acro, def_) in enumerate(acro_defs.items()):
+            acro_to_def.setdefault(acro.lower(), (idx, def_.lower()))
+            def_to_acro.setdefault(def_.lower(), (idx, acro.lower()))
+
+    # block terms for fuzzy de-duping by their character trigrams
+    if fuzzy_dedupe is True:
+        fuzzy_index = _FuzzyTermIndex(term for term in sorted_terms if len(term) >= 13)
+
+    for term in sorted_terms:
 
         if term in seen_terms:
             continue
@@ -468,12 +1244,12 @@ def aggregate_term_variants(terms,
         # symbolic variations
         if '-' in term:
             variant = term.replace('-', ' ').strip()
-            if variant in terms.difference(seen_terms):
+            if variant in terms and variant not in seen_terms:
                 variants.add(variant)
                 seen_terms.add(variant)
         if '/' in term:
             variant = term.replace('/', ' ').strip()
-            if variant in terms.difference(seen_terms):
+            if variant in terms and variant not in seen_terms:
                 variants.add(variant)
                 seen_terms.add(variant)
 
@@ -488,75 +1264,253 @@ def aggregate_term_variants(terms,
         # # if at least we have a new term... add it
         # if last_word_lemmatized != last_word:
         #     term_lemmatized = ' '.join(term_words[:-1] + [last_word_lemmatized])
-        #     if term_lemmatized in terms.difference(seen_terms):
+        #     if term_lemmatized in terms and term_lemmatized not in seen_terms:
         #         variants.add(term_lemmatized)
         #         seen_terms.add(term_lemmatized)
 
         # if term is an acronym, add its definition
         # if term is a definition, add its acronym
         if acro_defs:
-            for acro, def_ in acro_defs.items():
-                if acro.lower() == term.lower():
-                    variants.add(def_.lower())
-                    seen_terms.add(def_.lower())
-                    break
-                elif def_.lower() == term.lower():
-                    variants.add(acro.lower())
-                    seen_terms.add(acro.lower())
-                    break
+            acro_match = acro_to_def.get(term.lower())
+            def_match = def_to_acro.get(term.lower())
+            if acro_match and (not def_match or acro_match[0] <= def_match[0]):
+                variants.add(acro_match[1])
+                seen_terms.add(acro_match[1])
+            elif def_match:
+                variants.add(def_match[1])
+                seen_terms.add(def_match[1])
 
         # if 3+ -word term differs by one word at the start or the end
         # of a longer phrase, aggregate
         if len(term_words) > 2:
             term_minus_first_word = ' '.join(term_words[1:])
             term_minus_last_word = ' '.join(term_words[:-1])
-            if term_minus_first_word in terms.difference(seen_terms):
+            if term_minus_first_word in terms and term_minus_first_word not in seen_terms:
                 variants.add(term_minus_first_word)
                 seen_terms.add(term_minus_first_word)
-            if term_minus_last_word in terms.difference(seen_terms):
+            if term_minus_last_word in terms and term_minus_last_word not in seen_terms:
                 variants.add(term_minus_last_word)
                 seen_terms.add(term_minus_last_word)
             # check for "X of Y" <=> "Y X" term variants
             if ' of ' in term:
                 split_term = term.split(' of ')
                 variant = split_term[1] + ' ' + split_term[0]
-                if variant in terms.difference(seen_terms):
+                if variant in terms and variant not in seen_terms:
                     variants.add(variant)
                     seen_terms.add(variant)
 
         # intense de-duping for sufficiently long terms
         if fuzzy_dedupe is True and len(term) >= 13:
-            for other_term in sorted(terms.difference(seen_terms), key=len, reverse=True):
-                if len(other_term) < 13:
-                    break
-                tsr = similarity.token_sort_ratio(term, other_term)
-                if tsr > 0.93:
-                    variants.add(other_term)
-                    seen_terms.add(other_term)
-                    break
+            other_term = fuzzy_index.get_first_match(term, seen_terms)
+            if other_term is not None:
+                variants.add(other_term)
+                seen_terms.add(other_term)
 
         agg_terms.append(variants)
 
     return agg_terms
 
 
-def rank_nodes_by_bestcoverage(graph, k, c=1, alpha=1.0):
+class _FuzzyTermIndex(object):
+    """
+    Index of terms for finding fuzzy string matches, i.e. those whose
+    :func:`token_sort_ratio() <textacy.similarity.token_sort_ratio>` with a given
+    term exceeds 0.93, without comparing the term to every other term.
+
+    A term's processed form can only be within the required edit distance ``d``
+    of another's if it's of similar length, and if it shares all but at most
+    ``3 * d`` of its distinct character trigrams with it, since each insertion
+    or deletion destroys at most 3 of them. Only candidate terms that pass these
+    lossless checks are actually compared.
+
+    Args:
+        terms (Iterable[str]): Terms to index, in the order in which they're
+            checked for matches.
+    """
+
+    threshold = 0.93
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.term_to_idx = {term: idx for idx, term in enumerate(self.terms)}
+        procs = [similarity._process_and_sort(similarity._force_unicode(term))
+                 for term in self.terms]
+        self.proc_lens = [len(proc) for proc in procs]
+        self.trigrams = [
+            set(proc[i: i + 3] for i in range(len(proc) - 2)) for proc in procs]
+        # postings of terms containing each trigram, sorted by processed length,
+        # so that only terms of similar length can be looked up quickly
+        trigram_to_idxs = collections.defaultdict(list)
+        for idx, trigrams in enumerate(self.trigrams):
+            for trigram in trigrams:
+                trigram_to_idxs[trigram].append(idx)
+        self.trigram_postings = {}
+        for trigram, idxs in trigram_to_idxs.items():
+            idxs = sorted(idxs, key=self.proc_lens.__getitem__)
+            self.trigram_postings[trigram] = ([self.proc_lens[idx] for idx in idxs], idxs)
+
+    def get_first_match(self, term, seen_terms):
+        """
+        Get the first indexed term not in ``seen_terms`` that fuzzy-matches
+        ``term``, or None if there is no such term.
+        """
+        idx = self.term_to_idx[term]
+        len1 = self.proc_lens[idx]
+        trigrams1 = self.trigrams[idx]
+        # max relative edit distance, with a little slack for floating point error
+        max_dist_frac = 1.0 - self.threshold + 1e-9
+        min_len2 = len1 * (1.0 - max_dist_frac) / (1.0 + max_dist_frac)
+        max_len2 = len1 * (1.0 + max_dist_frac) / (1.0 - max_dist_frac)
+        min_shared = len(trigrams1) - 3 * max_dist_frac * (len1 + max_len2)
+        if min_shared <= 0:
+            # matches aren't guaranteed to share a trigram, so check everything
+            candidate_idxs = range(len(self.terms))
+        else:
+            # any term sharing at least ``min_shared`` trigrams must share one of
+            # any ``n_trigrams - min_shared + 1`` of them, so only the rarest are
+            # probed, and only for terms of similar length
+            postings = []
+            for trigram in trigrams1:
+                lens, idxs = self.trigram_postings[trigram]
+                postings.append(idxs[bisect.bisect_left(lens, min_len2): bisect.bisect_right(lens, max_len2)])
+            n_probes = len(trigrams1) - int(math.ceil(min_shared)) + 1
+            candidate_idxs = sorted(set(itertoolz.concat(
+                sorted(postings, key=len)[:n_probes])))
+
+        for idx2 in candidate_idxs:
+            other_term = self.terms[idx2]
+            if other_term in seen_terms:
+                continue
+            len2 = self.proc_lens[idx2]
+            max_dist = max_dist_frac * (len1 + len2)
+            if abs(len1 - len2) > max_dist:
+                continue
+            trigrams2 = self.trigrams[idx2]
+            n_shared = len(trigrams1 & trigrams2)
+            if n_shared < len(trigrams1) - 3 * max_dist or n_shared < len(trigrams2) - 3 * max_dist:
+                continue
+            if similarity.token_sort_ratio(term, other_term) > self.threshold:
+                return other_term
+        return None
+
+
+def rank_nodes_by_pagerank(graph, alpha=0.85, max_iter=100, tol=1e-06,
+                           nstart=None, weight='weight'):
+    """
+    Rank nodes in a network using the PageRank algorithm, computed by power
+    iteration over the network's sparse adjacency matrix. Results are the same
+    as those of :func:`networkx.pagerank_scipy()`, but networkx graphs are
+    optional: a sparse matrix can be passed instead, which avoids the overhead
+    of building and converting graph objects.
+
+    Args:
+        graph (:class:`networkx.Graph <networkx.Graph>` or ``scipy.sparse.spmatrix``):
+            Network whose nodes are to be ranked, or its square adjacency matrix
+            whose entry (i, j) is the weight of the edge from node i to node j,
+            e.g. as produced by :func:`textacy.network.terms_to_cooc_matrix()`
+        alpha (float): Damping factor, in [0.0, 1.0].
+        max_iter (int): Maximum number of power iterations.
+        tol (float): Error tolerance used to check convergence, which occurs
+            when the summed absolute change in ranks is less than ``n_nodes * tol``.
+        nstart (dict or :class:`numpy.ndarray`): Starting ranks for the power
+            iteration, e.g. results from ranking a slightly different network;
+            if a dict, keys are nodes, and missing nodes start at 0; if an array,
+            entries are aligned with the adjacency matrix's rows. By default,
+            all nodes start with equal ranks.
+        weight (str): Edge attribute in ``graph`` to use as edge weight;
+            only applicable if ``graph`` is a ``networkx.Graph``.
+
+    Returns:
+        dict: Keys are node identifiers (or integer row indexes, if ``graph`` is
+        a matrix), values are corresponding PageRank scores, summing up to 1.
+    """
+    adj_mat, nodes = _to_adjacency(graph, weight=weight)
+    if not nodes:
+        LOGGER.warning('``graph`` is empty!')
+        return {}
+    if isinstance(nstart, dict):
+        nstart = np.array([nstart.get(node, 0) for node in nodes], dtype=np.float64)
+    ranks = _pagerank(
+        adj_mat, alpha=alpha, max_iter=max_iter, tol=tol, nstart=nstart)
+    return dict(compat.zip_(nodes, ranks.tolist()))
+
+
+def _to_adjacency(graph, weight='weight'):
+    """
+    Get the sparse adjacency matrix of ``graph`` along with the list of nodes
+    corresponding to its rows/columns. If ``graph`` is already a sparse matrix,
+    it's passed through as-is, and its nodes are just its integer row indexes.
+    """
+    if sp.issparse(graph):
+        return graph.tocsr(), list(range(graph.shape[0]))
+    nodes = list(graph)
+    if not nodes:
+        return sp.csr_matrix((0, 0)), nodes
+    adj_mat = nx.to_scipy_sparse_matrix(graph, nodelist=nodes, weight=weight, format='csr')
+    return adj_mat, nodes
+
+
+def _pagerank(adj_mat, alpha=0.85, max_iter=100, tol=1e-06, nstart=None):
+    """
+    Compute PageRank scores of the nodes in the network with adjacency matrix
+    ``adj_mat``, with uniform personalization and dangling node redistribution,
+    exactly as in :func:`networkx.pagerank_scipy()`. If the power iteration
+    fails to converge, a warning is logged, and the last scores are returned.
+
+    Returns:
+        :class:`numpy.ndarray`: PageRank score of each node, summing up to 1.
+    """
+    adj_mat = sp.csr_matrix(adj_mat, dtype=np.float64)
+    n_nodes = adj_mat.shape[0]
+    if n_nodes == 0:
+        return np.array([], dtype=np.float64)
+    # transpose of the row-normalized transition matrix, so that x * M => M.T.dot(x)
+    out_weights = np.asarray(adj_mat.sum(axis=1)).ravel()
+    is_dangling = out_weights == 0
+    inv_out_weights = np.zeros(n_nodes, dtype=np.float64)
+    inv_out_weights[~is_dangling] = 1.0 / out_weights[~is_dangling]
+    trans_mat = sp.diags(inv_out_weights).dot(adj_mat).T.tocsr()
+
+    uniform = np.full(n_nodes, 1.0 / n_nodes)
+    if nstart is None:
+        ranks = uniform
+    else:
+        ranks = np.asarray(nstart, dtype=np.float64)
+        ranks = ranks / ranks.sum()
+    for _ in range(max_iter):
+        last_ranks = ranks
+        ranks = (alpha * (trans_mat.dot(ranks) + last_ranks[is_dangling].sum() * uniform) +
+                 (1 - alpha) * uniform)
+        if np.abs(ranks - last_ranks).sum() < n_nodes * tol:
+            return ranks
+    LOGGER.warning(
+        'pagerank power iteration failed to converge in %s iterations', max_iter)
+    return ranks
+
+
+def rank_nodes_by_bestcoverage(graph, k, c=1, alpha=1.0, weight='weight'):
     """
     Rank nodes in a network using the [BestCoverage]_ algorithm that attempts to
     balance between node centrality and diversity.
 
     Args:
-        graph (:class:`networkx.Graph <networkx.Graph>`)
+        graph (:class:`networkx.Graph <networkx.Graph>` or ``scipy.sparse.spmatrix``):
+            Network whose nodes are to be ranked, or its square adjacency matrix
+            whose entry (i, j) is the weight of the edge from node i to node j,
+            e.g. as produced by :func:`textacy.network.terms_to_cooc_matrix()`
         k (int): number of results to return for top-k search
         c (int): *l* parameter for *l*-step expansion; best if 1 or 2
         alpha (float): float in [0.0, 1.0] specifying how much of
             central vertex's score to remove from its *l*-step neighbors;
             smaller value puts more emphasis on centrality, larger value puts
             more emphasis on diversity
+        weight (str): edge attribute in ``graph`` to use as edge weight;
+            only applicable if ``graph`` is a ``networkx.Graph``
 
     Returns:
         dict: top ``k`` nodes as ranked by bestcoverage algorithm; keys as node
-        identifiers, values as corresponding ranking scores
+        identifiers (or integer row indexes, if ``graph`` is a matrix), values
+        as corresponding ranking scores
 
     References:
         .. [BestCoverage] Küçüktunç, O., Saule, E., Kaya, K., & Çatalyürek, Ü. V.
@@ -567,99 +1521,77 @@ def rank_nodes_by_bestcoverage(graph, k, c=1, alpha=1.0):
     """
     alpha = float(alpha)
 
-    nodes_list = list(dict(graph.nodes()))
+    adj_mat, nodes_list = _to_adjacency(graph, weight=weight)
+    if not nodes_list:
+        LOGGER.warning('``graph`` is empty!')
+        return {}
+    n_nodes = len(nodes_list)
 
     # ranks: array of PageRank values, summing up to 1
-    ranks = nx.pagerank_scipy(graph, alpha=0.85, max_iter=100, tol=1e-08, weight='weight')
-    sorted_ranks = sorted(ranks.items(), key=operator.itemgetter(1), reverse=True)
-
-    avg_degree = sum(deg for _, deg in graph.degree()) / len(nodes_list)
-    # relaxation parameter, k' in the paper
-    k_prime = int(k * avg_degree * c)
-
-    top_k_sorted_ranks = sorted_ranks[:k_prime]
+    ranks = _pagerank(adj_mat, alpha=0.85, max_iter=100, tol=1e-08)
+
+    # l-step expanded sets of all vertices, as a boolean reachability matrix
+    # whose row i flags the vertices reachable from vertex i in at most c steps
+    step_mat = sp.csr_matrix(adj_mat, copy=True)
+    step_mat.eliminate_zeros()
+    step_mat = (sp.csr_matrix(step_mat, dtype=bool) +
+                sp.identity(n_nodes, dtype=bool, format='csr')).astype(np.int32)
+    expansion_mat = sp.identity(n_nodes, dtype=np.int32, format='csr')
+    for _ in range(c):
+        expansion_mat = expansion_mat.dot(step_mat).tocsr()
+        expansion_mat.data[:] = 1
+
+    # compute initial exprel contribution,
+    # i.e. sum of l-step expanded neighbors' ranks
+    contrib = expansion_mat.dot(ranks)
+    taken = np.zeros(n_nodes, dtype=bool)
 
-    def get_l_step_expanded_set(vertices, l):
-        """
-        Args:
-            vertices (iterable[str]): vertices to be expanded
-            l (int): how many steps to expand vertices set
-
-        Returns:
-            set: the l-step expanded set of vertices
-        """
-        # add vertices to s
-        s = set(vertices)
-        # s.update(vertices)
-        # for each step
-        for _ in range(l):
-            # for each node
-            next_vertices = []
-            for vertex in vertices:
-                # add its neighbors to the next list
-                neighbors = graph.neighbors(vertex)
-                next_vertices.extend(neighbors)
-                s.update(neighbors)
-            vertices = set(next_vertices)
-        return s
-
-    top_k_exp_vertices = get_l_step_expanded_set([item[0] for item in top_k_sorted_ranks], c)
-
-    # compute initial exprel contribution
-    taken = collections.defaultdict(bool)
-    contrib = {}
-    for vertex in nodes_list:
-        # get l-step expanded set
-        s = get_l_step_expanded_set([vertex], c)
-        # sum up neighbors ranks, i.e. l-step expanded relevance
-        contrib[vertex] = sum(ranks[v] for v in s)
-
-    sum_contrib = 0.0
     results = {}
     # greedily select to maximize exprel metric
     for _ in range(k):
-        if not contrib:  # TODO: check that .items(): not needed
-            break
-        # find word with highest l-step expanded relevance score
-        max_word_score = sorted(contrib.items(), key=operator.itemgetter(1), reverse=True)[0]
-        sum_contrib += max_word_score[1]  # contrib[max_word[0]]
-        results[max_word_score[0]] = max_word_score[1]
-        # find its l-step expanded set
-        l_step_expanded_set = get_l_step_expanded_set([max_word_score[0]], c)
-        # for each vertex found
-        for vertex in l_step_expanded_set:
-            # already removed its contribution from neighbors
-            if taken[vertex] is True:
-                continue
-            # remove the contribution of vertex (or some fraction) from its l-step neighbors
-            s1 = get_l_step_expanded_set([vertex], c)
-            for w in s1:
-                try:
-                    contrib[w] -= alpha * ranks[vertex]
-                except KeyError:
-                    LOGGER.error(
-                        'Word %s not in contrib dict! We\'re approximating...', w)
-            taken[vertex] = True
-        contrib[max_word_score[0]] = 0
+        # find vertex with highest l-step expanded relevance score
+        best_idx = int(np.argmax(contrib))
+        results[nodes_list[best_idx]] = float(contrib[best_idx])
+        # remove the contribution of (some fraction of) each not-yet-taken vertex
+        # in its l-step expanded set from that vertex's own l-step neighbors
+        expanded_idxs = expansion_mat.indices[
+            expansion_mat.indptr[best_idx]: expansion_mat.indptr[best_idx + 1]]
+        expanded_idxs = expanded_idxs[~taken[expanded_idxs]]
+        if len(expanded_idxs) > 0:
+            contrib -= alpha * expansion_mat[expanded_idxs].T.dot(ranks[expanded_idxs])
+            taken[expanded_idxs] = True
+        contrib[best_idx] = 0
 
     return results
 
 
-def rank_nodes_by_divrank(graph, r=None, lambda_=0.5, alpha=0.5):
+def rank_nodes_by_divrank(graph, r=None, lambda_=0.5, alpha=0.5,
+                          max_iter=1000, tol=1e-03, weight='weight'):
     """
     Rank nodes in a network using the [DivRank]_ algorithm that attempts to
     balance between node centrality and diversity.
 
     Args:
-        graph (:class:`networkx.Graph <networkx.Graph>`):
+        graph (:class:`networkx.Graph <networkx.Graph>` or ``scipy.sparse.spmatrix``):
+            Network whose nodes are to be ranked, or its square adjacency matrix
+            whose entry (i, j) is the weight of the edge from node i to node j,
+            e.g. as produced by :func:`textacy.network.terms_to_cooc_matrix()`
         r (:class:`numpy.array`,): the "personalization vector";
             by default, ``r = ones(1, n)/n``
         lambda_ (float): must be in [0.0, 1.0]
         alpha (float): controls the strength of self-links;
             must be in [0.0, 1.0]
+        max_iter (int): maximum number of iterations
+        tol (float): error tolerance used to check convergence, which occurs
+            when the summed absolute change in scores, relative to their sum,
+            is no greater than ``tol``
+        weight (str): edge attribute in ``graph`` to use as edge weight;
+            only applicable if ``graph`` is a ``networkx.Graph``
 
     Returns:
-        List[Tuple[str, float]]: list of (node, score) tuples ordered by desc. divrank score
+        dict: keys as node identifiers (or integer row indexes, if ``graph`` is
+        a matrix), values as corresponding divrank scores, in descending order
+        of score
 
     References:
         .. [DivRank] Mei, Q., Guo, J., & Radev, D. (2010, July). Divrank: the interplay
@@ -668,53 +1600,60 @@ def rank_nodes_by_divrank(graph, r=None, lambda_=0.5, alpha=0.5):
            mining (pp. 1009-1018). ACM. http://clair.si.umich.edu/~radev/papers/SIGKDD2010.pdf
     """
     # check function arguments
-    if len(graph) == 0:
+    W, nodes_list = _to_adjacency(graph, weight=weight)
+    if not nodes_list:
         LOGGER.warning('``graph`` is empty!')
         return {}
-
-    # create adjacency matrix, i.e.
-    # n x n matrix where entry W_ij is the weight of the edge from V_i to V_j
-    W = nx.to_numpy_matrix(graph, weight='weight').A
     n = W.shape[1]
 
     # create flat prior personalization vector if none given
     if r is None:
-        r = np.array([n * [1 / float(n)]])
-
-    # Specify some constants
-    max_iter = 1000
-    diff = 1e+10
-    tol = 1e-3
+        r = np.full(n, 1 / float(n))
+    else:
+        r = np.asarray(r, dtype=np.float64).ravel()
 
-    pr = np.array([n * [1 / float(n)]])
+    pr = np.full(n, 1 / float(n))
 
-    # Get p0(v -> u), i.e. transition probability prior to reinforcement
-    tmp = np.reshape(np.sum(W, axis=1), (n, 1))
-    idx_nan = np.flatnonzero(tmp == 0)
-    W0 = W / np.tile(tmp, (1, n))
-    W0[idx_nan, :] = 0
+    # Get p0(v -> u), i.e. transition probability prior to reinforcement,
+    # where rows of nodes without out-links are left as all zeros
+    tmp = np.asarray(W.sum(axis=1), dtype=np.float64).ravel()
+    inv_tmp = np.zeros(n, dtype=np.float64)
+    inv_tmp[tmp != 0] = 1.0 / tmp[tmp != 0]
+    W0 = sp.diags(inv_tmp).dot(sp.csr_matrix(W, dtype=np.float64)).tocsr()
+    W0T = W0.T.tocsr()
+    # as in the original, dense formulation, the "self-link" removed from each
+    # node's reinforced transitions is that of its link to the *first* node
+    c0 = W0[:, 0].toarray().ravel()
 
     del W
 
-    # DivRank algorithm
+    # DivRank algorithm, with the reinforced transition matrix
+    #   W1 = alpha * W0 * pr - diag(alpha * W0[:, 0] * pr[0]) + (1 - alpha) * diag(pr)
+    # never materialized; instead, its row sums and pr-weighted column sums
+    # are computed directly from the (sparse) prior transition matrix W0
     i = 0
+    diff = 1e+10
     while i < max_iter and diff > tol:
-        W1 = alpha * W0 * np.tile(pr, (n, 1))
-        W1 = W1 - np.diag(W1[:, 0]) + (1 - alpha) * np.diag(pr[0, :])
-        tmp1 = np.reshape(np.sum(W1, axis=1), (n, 1))
-        P = W1 / np.tile(tmp1, (1, n))
-        P = ((1 - lambda_) * P) + (lambda_ * np.tile(r, (n, 1)))
-        pr_new = np.dot(pr, P)
+        self_links = (1 - alpha) * pr - alpha * c0 * pr[0]
+        row_sums = alpha * W0.dot(pr) + self_links
+        v = pr / row_sums
+        pr_new = (((1 - lambda_) * (alpha * W0T.dot(v) * pr + v * self_links)) +
+                  (lambda_ * r * np.sum(pr)))
         i += 1
         diff = np.sum(np.abs(pr_new - pr)) / np.sum(pr)
         pr = pr_new
+    if diff > tol:
+        LOGGER.warning(
+            'divrank failed to converge in %s iterations (error = %s > %s)',
+            max_iter, diff, tol)
+    else:
+        LOGGER.debug('divrank converged in %s iterations', i)
 
     # sort nodes by divrank score
-    results = sorted(((i, score) for i, score in enumerate(pr.flatten().tolist())),
+    results = sorted(((i, score) for i, score in enumerate(pr.tolist())),
                      key=operator.itemgetter(1), reverse=True)
 
     # replace node number by node value
-    nodes_list = list(dict(graph.nodes()))
     divranks = {nodes_list[result[0]]: result[1] for result in results}
 
     return divranks
@@ -7,6 +7,8 @@ import itertools
 import logging
 
 import networkx as nx
+import numpy as np
+import scipy.sparse as sp
 from cytoolz import itertoolz
 from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from spacy.tokens.span import Span as SpacySpan
@@ -105,6 +107,110 @@ def terms_to_semantic_network(terms,
     return graph
 
 
+def terms_to_cooc_matrix(terms,
+                         normalize='lemma',
+                         window_width=10,
+                         edge_weighting='cooc_freq'):
+    """
+    Convert an ordered list of non-overlapping terms into the sparse, symmetric
+    adjacency matrix of a semantic network, where each term is represented by
+    a row/column with non-zero entries for other terms that co-occur within
+    ``window_width`` terms of itself. This is equivalent to (but much faster
+    than) :func:`terms_to_semantic_network`, and is suitable for ranking
+    algorithms that operate on matrices rather than ``networkx`` graphs.
+
+    Args:
+        terms (List[str] or List[``spacy.Token``])
+        normalize (str or callable): if 'lemma', lemmatize terms; if 'lower',
+            lowercase terms; if false-y, use the form of terms as they appear
+            in doc; if a callable, must accept a ``spacy.Token`` and return a
+            str, e.g. :func:`textacy.spacy_utils.normalized_str()`;
+            only applicable if ``terms`` is a List[``spacy.Token``]
+        window_width (int, optional): size of sliding window over `terms` that
+            determines which are said to co-occur; if = 2, only adjacent terms
+            will have edges in network
+        edge_weighting (str {'cooc_freq', 'binary'}, optional): if 'binary',
+            all co-occurring terms will have network edges with weight = 1;
+            if 'cooc_freq', edges will have a weight equal to the number of times
+            that the connected nodes co-occur in a sliding window
+
+    Returns:
+        ``scipy.sparse.csr_matrix``: Square matrix whose entry (i, j) is the
+        weight of the edge between terms i and j. As in an undirected ``networkx``
+        graph, a term that co-occurs with itself has a single self-loop entry
+        on the diagonal.
+
+        List[str]: Unique terms, in order of first appearance in ``terms``,
+        where the i-th term corresponds to the i-th row and column of the matrix.
+
+    See Also:
+        :func:`terms_to_semantic_network`
+    """
+    if window_width < 2:
+        raise ValueError('Window width must be >= 2')
+    if not terms:
+        raise ValueError('`terms` list is empty; it must contain 1 or more terms')
+
+    if len(terms) < window_width:
+        LOGGER.warning(
+            'input terms list is smaller than window width (%s < %s)',
+            len(terms), window_width)
+        window_width = len(terms)
+
+    if isinstance(terms[0], compat.unicode_):
+        pass
+    elif isinstance(terms[0], SpacyToken):
+        if normalize == 'lemma':
+            terms = [tok.lemma_ for tok in terms]
+        elif normalize == 'lower':
+            terms = [tok.lower_ for tok in terms]
+        elif not normalize:
+            terms = [tok.text for tok in terms]
+        else:
+            terms = [normalize(tok) for tok in terms]
+    else:
+        msg = 'Input terms must be strings or spacy Tokens, not {}.'.format(type(terms[0]))
+        raise TypeError(msg)
+
+    term_to_id = {}
+    term_ids = np.array(
+        [term_to_id.setdefault(term, len(term_to_id)) for term in terms],
+        dtype=np.int64)
+    id_to_term = sorted(term_to_id, key=term_to_id.__getitem__)
+    n_terms = len(terms)
+    n_unique_terms = len(id_to_term)
+
+    # pair every term with each of the terms that follow it within a window,
+    # counting the number of sliding windows that contain both
+    rows = []
+    cols = []
+    counts = []
+    for offset in range(1, window_width):
+        inds = np.arange(n_terms - offset)
+        rows.append(term_ids[inds])
+        cols.append(term_ids[inds + offset])
+        counts.append(np.minimum(inds, n_terms - window_width) -
+                      np.maximum(inds + offset - window_width + 1, 0) + 1)
+    if rows:
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        counts = np.concatenate(counts)
+    else:
+        rows = cols = counts = np.array([], dtype=np.int64)
+
+    cooc_mat = sp.coo_matrix(
+        (counts, (rows, cols)), shape=(n_unique_terms, n_unique_terms)).tocsr()
+    # symmetrize co-occurrences, without double-counting self-loops
+    self_loops = sp.diags(cooc_mat.diagonal(), dtype=cooc_mat.dtype)
+    cooc_mat = (cooc_mat + cooc_mat.T - self_loops).tocsr()
+    cooc_mat.eliminate_zeros()
+    if edge_weighting == 'binary':
+        cooc_mat.data[:] = 1
+    cooc_mat.sort_indices()
+
+    return cooc_mat, id_to_term
+
+
 def sents_to_semantic_network(sents,
                               normalize='lemma',
                               edge_weighting='cosine'):
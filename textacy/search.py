@@ -0,0 +1,355 @@
+"""
+Search
+------
+
+Rank documents by their relevance to ad-hoc term queries via an inverted index,
+built from the term counts of a doc-term matrix as output by a fitted
+:class:`textacy.vsm.Vectorizer <textacy.vsm.Vectorizer>`.
+
+Each term's postings list of (doc id, score) pairs is stored as a column of a
+sparse CSC matrix, whose values are pre-computed term scores ("impacts") under
+BM25 or tf-idf weighting. Queries are evaluated term-at-a-time with MaxScore
+pruning, so that documents that can no longer make it into the top results
+aren't scored in full.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+
+import numpy as np
+import scipy.sparse as sp
+
+from . import compat
+from .vsm import Vocabulary, _get_inverse_doc_freqs
+
+
+class InvertedIndex(object):
+    """
+    Inverted index of documents' terms, for fast top-n retrieval of the
+    documents that best match a query by their BM25 or tf-idf scores.
+
+    Count terms in a corpus' documents, and index them::
+
+        >>> tokenized_docs = (
+        ...     doc.to_terms_list(ngrams=1, named_entities=True, as_strings=True)
+        ...     for doc in corpus)
+        >>> vectorizer = textacy.Vectorizer(weighting='tf', min_df=2)
+        >>> doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+        >>> index = InvertedIndex(doc_term_matrix, vectorizer.vocabulary_terms)
+        >>> index
+        InvertedIndex(n_docs=1000, n_terms=7531, scoring=bm25)
+
+    Search for the documents that best match a query of terms::
+
+        >>> index.search(['health', 'care', 'reform'], top_n=3)
+        [(652, 10.72164534851), (94, 10.36590391218), (503, 9.86401930284)]
+
+    Save the index to disk, then load it back, with its vocabulary memory-mapped::
+
+        >>> index.save('index.npz')
+        >>> index = InvertedIndex.load('index.npz')
+
+    Args:
+        doc_term_matrix (:class:`scipy.sparse.csr_matrix`): Sparse matrix of
+            shape (# docs, # unique terms), where value (i, j) is the *count*
+            of term j in doc i, e.g. as output by a vectorizer with
+            ``weighting='tf'`` and without normalization or sublinear tf.
+        vocabulary_terms (Dict[str, int] or :class:`textacy.vsm.Vocabulary`):
+            Mapping of unique term string to unique term id, e.g. as learned
+            by a fit vectorizer. Terms hashed via a vectorizer's ``n_features``
+            have no such mapping, and can't be indexed. Unless it's a frozen
+            :class:`textacy.vsm.Vocabulary`, a frozen copy is stored, so terms
+            later added to a vectorizer's vocabulary aren't added to the index's.
+        scoring ({'bm25', 'tfidf'}): Method by which query terms' matches in
+            each document are scored:
+
+            - 'bm25': Okapi BM25, in which term counts saturate as they increase,
+              and are normalized by document length relative to the average
+            - 'tfidf': term counts times their (smoothed) inverse document frequency
+
+        k1 (float): BM25 parameter controlling term count saturation; larger
+            values saturate more slowly.
+        b (float): BM25 parameter in [0.0, 1.0] controlling how much term counts
+            are normalized by document length.
+        smooth_idf (bool): If True and ``scoring`` is 'tfidf', add 1 to all
+            document frequencies when computing inverse document frequencies,
+            as in :class:`textacy.vsm.Vectorizer`.
+
+    Raises:
+        ValueError: if ``scoring`` is invalid, BM25 parameters are out of range,
+            ``vocabulary_terms`` isn't a mapping, or ``doc_term_matrix`` contains
+            negative counts or doesn't match ``vocabulary_terms``
+    """
+
+    def __init__(self, doc_term_matrix, vocabulary_terms,
+                 scoring='bm25', k1=1.2, b=0.75, smooth_idf=True):
+        if scoring not in ('bm25', 'tfidf'):
+            raise ValueError(
+                'scoring="{}" is invalid; valid values are {}'.format(
+                    scoring, ['bm25', 'tfidf']))
+        if k1 < 0.0:
+            raise ValueError('`k1` must be a non-negative float')
+        if b < 0.0 or b > 1.0:
+            raise ValueError('`b` must be a float in the interval [0.0, 1.0]')
+        if not isinstance(vocabulary_terms, collections.Mapping):
+            raise ValueError(
+                '`vocabulary_terms` must be a mapping of term to term id, not "{}"; '
+                'note that hashed terms can\'t be indexed'.format(type(vocabulary_terms)))
+        doc_term_matrix = sp.csr_matrix(doc_term_matrix)
+        if doc_term_matrix.nnz and doc_term_matrix.data.min() < 0:
+            raise ValueError('`doc_term_matrix` must contain only non-negative counts')
+        if doc_term_matrix.shape[1] != len(vocabulary_terms):
+            raise ValueError(
+                '`doc_term_matrix` has {} columns, but `vocabulary_terms` has {} terms'.format(
+                    doc_term_matrix.shape[1], len(vocabulary_terms)))
+        if not isinstance(vocabulary_terms, Vocabulary):
+            vocabulary_terms = Vocabulary(vocabulary_terms).freeze()
+        elif vocabulary_terms.is_frozen is False:
+            vocabulary_terms = Vocabulary(
+                vocabulary_terms.terms[:doc_term_matrix.shape[1]]).freeze()
+        self.vocabulary_terms = vocabulary_terms
+        self.scoring = scoring
+        self.k1 = k1
+        self.b = b
+        self.smooth_idf = smooth_idf
+        self._set_impacts(self._get_impacts(doc_term_matrix))
+
+    def __repr__(self):
+        return 'InvertedIndex(n_docs={}, n_terms={}, scoring={})'.format(
+            self.n_docs, self.n_terms, self.scoring)
+
+    @property
+    def n_docs(self):
+        """int: Number of documents in the index."""
+        return self._impacts.shape[0]
+
+    @property
+    def n_terms(self):
+        """int: Number of unique terms in the index."""
+        return self._impacts.shape[1]
+
+    def _get_impacts(self, doc_term_matrix):
+        """
+        Compute the score of each term in each doc, as a sparse CSC matrix
+        whose columns are the terms' postings lists, in order of doc id.
+        """
+        n_docs, n_terms = doc_term_matrix.shape
+        counts = doc_term_matrix.data.astype(np.float64)
+        dfs = np.bincount(doc_term_matrix.indices, minlength=n_terms)
+        if self.scoring == 'bm25':
+            idfs = np.log1p((n_docs - dfs + 0.5) / (dfs + 0.5))
+            doc_lens = np.asarray(doc_term_matrix.sum(axis=1), dtype=np.float64).ravel()
+            avg_doc_len = doc_lens.mean() if n_docs else 0.0
+            if avg_doc_len > 0.0:
+                doc_lens /= avg_doc_len
+            doc_norms = self.k1 * (1.0 - self.b + self.b * doc_lens)
+            doc_norms = np.repeat(doc_norms, np.diff(doc_term_matrix.indptr))
+            impacts = counts * (self.k1 + 1.0) / (counts + doc_norms)
+        else:
+            idfs = _get_inverse_doc_freqs(dfs, n_docs, smooth_idf=self.smooth_idf)
+            impacts = counts
+        impacts *= idfs[doc_term_matrix.indices]
+        impacts = sp.csr_matrix(
+            (impacts, doc_term_matrix.indices, doc_term_matrix.indptr),
+            shape=doc_term_matrix.shape).tocsc()
+        impacts.eliminate_zeros()
+        impacts.sort_indices()
+        return impacts
+
+    def _set_impacts(self, impacts):
+        """
+        Store the doc-term ``impacts`` matrix, along with each term's maximum
+        impact, used as an upper bound on its contribution to any doc's score.
+        """
+        self._impacts = impacts
+        max_impacts = np.zeros(impacts.shape[1], dtype=np.float64)
+        has_postings = np.diff(impacts.indptr) > 0
+        if has_postings.any():
+            max_impacts[has_postings] = np.maximum.reduceat(
+                impacts.data, impacts.indptr[:-1][has_postings])
+        self._max_impacts = max_impacts
+
+    def search(self, query, top_n=10):
+        """
+        Get the ``top_n`` documents that best match ``query``, by the sum of
+        query terms' scores in each document.
+
+        Args:
+            query (Iterable[str] or Dict[str, float]): Terms for which to search,
+                where terms that appear multiple times are weighted by their counts;
+                or a mapping of terms to their (non-negative) weights. Terms not
+                in the index's vocabulary are ignored.
+            top_n (int): Maximum number of documents to return.
+
+        Returns:
+            List[Tuple[int, float]]: Pairs of matching doc id and score,
+            sorted by score in descending order, then by doc id. Documents
+            that match none of the query's terms are not included.
+
+        Raises:
+            ValueError: if any query term's weight is negative
+        """
+        if top_n < 1:
+            return []
+        term_ids, weights = self._get_query_terms(query)
+        if len(term_ids) == 0:
+            return []
+        doc_ids, scores = self._get_top_candidates(term_ids, weights, top_n)
+        if len(doc_ids) > top_n:
+            # keep all docs tied with the n-th best score, so ties are broken by doc id
+            is_top = scores >= -np.partition(-scores, top_n - 1)[top_n - 1]
+            doc_ids = doc_ids[is_top]
+            scores = scores[is_top]
+        order = np.lexsort((doc_ids, -scores))[:top_n]
+        return [(doc_id, score) for doc_id, score
+                in compat.zip_(doc_ids[order].tolist(), scores[order].tolist())]
+
+    def _get_query_terms(self, query):
+        """
+        Get the ids and weights of query terms that are in the index, in
+        descending order of their maximum possible contribution to any doc's score.
+        """
+        if not isinstance(query, collections.Mapping):
+            query = collections.Counter(query)
+        term_weights = collections.defaultdict(float)
+        for term, weight in query.items():
+            if weight < 0:
+                raise ValueError('query term weights must be non-negative')
+            term_id = self.vocabulary_terms.get(term)
+            if term_id is not None and weight > 0:
+                term_weights[term_id] += weight
+        term_ids = np.fromiter(term_weights.keys(), dtype=np.int64, count=len(term_weights))
+        weights = np.fromiter(term_weights.values(), dtype=np.float64, count=len(term_weights))
+        upper_bounds = self._max_impacts[term_ids] * weights
+        order = np.argsort(-upper_bounds, kind='mergesort')
+        return term_ids[order], weights[order]
+
+    def _get_top_candidates(self, term_ids, weights, top_n):
+        """
+        Accumulate docs' scores term-at-a-time, starting with the term that can
+        contribute the most to a doc's score. Once the sum of the remaining terms'
+        max scores falls below the current ``top_n``-th best score, docs not yet
+        matched can no longer make the cut, so only candidate docs are scored;
+        and candidates whose score plus those max scores falls below it are dropped.
+
+        Returns:
+            :class:`numpy.ndarray`, :class:`numpy.ndarray`: Ids of candidate docs,
+            a superset of the top ``top_n``, and their scores.
+        """
+        impacts = self._impacts
+        upper_bounds = self._max_impacts[term_ids] * weights
+        # remaining_bounds[i] is the max score that terms i, i+1, ... can add,
+        # padded slightly so that rounding in sums can't drop docs tied at the cutoff
+        remaining_bounds = np.append(np.cumsum(upper_bounds[::-1])[::-1], 0.0)
+        remaining_bounds *= 1.0 + 1e-9
+        doc_ids = np.empty(0, dtype=impacts.indices.dtype)
+        scores = np.empty(0, dtype=np.float64)
+        threshold = -np.inf
+        for i, (term_id, weight) in enumerate(compat.zip_(term_ids, weights)):
+            start, end = impacts.indptr[term_id], impacts.indptr[term_id + 1]
+            if start == end:
+                continue
+            posting_doc_ids = impacts.indices[start: end]
+            posting_scores = impacts.data[start: end] * weight
+            if len(doc_ids) >= top_n and remaining_bounds[i] < threshold:
+                # only candidate docs may still be in the top n
+                is_matched, match_idxs = _match_sorted(posting_doc_ids, doc_ids)
+                scores[is_matched] += posting_scores[match_idxs]
+            else:
+                # merge candidate docs into postings, both sorted by doc id
+                is_matched, match_idxs = _match_sorted(posting_doc_ids, doc_ids)
+                posting_scores[match_idxs] += scores[is_matched]
+                doc_ids = np.concatenate((doc_ids[~is_matched], posting_doc_ids))
+                scores = np.concatenate((scores[~is_matched], posting_scores))
+                order = np.argsort(doc_ids, kind='mergesort')
+                doc_ids = doc_ids[order]
+                scores = scores[order]
+            if len(doc_ids) >= top_n:
+                kth = len(scores) - top_n
+                threshold = np.partition(scores, kth)[kth]
+                is_kept = scores + remaining_bounds[i + 1] >= threshold
+                if not is_kept.all():
+                    doc_ids = doc_ids[is_kept]
+                    scores = scores[is_kept]
+        return doc_ids, scores
+
+    def save(self, filepath, compressed=False):
+        """
+        Save the index to disk as a single ``.npz`` file at ``filepath``,
+        including its scoring parameters, plus its vocabulary, as saved by
+        :meth:`Vocabulary.save() <textacy.vsm.Vocabulary.save>`, alongside it
+        in a ``.vocab`` file of the same name.
+
+        Args:
+            filepath (str): Path to file on disk to which the index will be written.
+                If ``filepath`` does not end in ``.npz``, that extension is
+                automatically appended to the name.
+            compressed (bool): If True, save arrays in compressed numpy binary format,
+                at the cost of slower saving and loading.
+        """
+        self.vocabulary_terms.save(_get_vocabulary_filepath(filepath))
+        savez = np.savez_compressed if compressed is True else np.savez
+        savez(
+            filepath,
+            data=self._impacts.data,
+            indices=self._impacts.indices,
+            indptr=self._impacts.indptr,
+            shape=self._impacts.shape,
+            scoring=np.array(self.scoring),
+            params=np.array([self.k1, self.b, float(self.smooth_idf)]))
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Load an index saved to disk by :meth:`InvertedIndex.save()`. Its vocabulary
+        is memory-mapped, so that it's loaded in constant time, however many
+        terms it has.
+
+        Args:
+            filepath (str): Path to ``.npz`` file on disk from which the index
+                will be read.
+
+        Returns:
+            :class:`InvertedIndex`
+        """
+        with np.load(filepath) as arrays:
+            impacts = sp.csc_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=tuple(arrays['shape']))
+            k1, b, smooth_idf = arrays['params'].tolist()
+            index = cls.__new__(cls)
+            index.scoring = arrays['scoring'].item()
+            index.k1 = k1
+            index.b = b
+            index.smooth_idf = bool(smooth_idf)
+        index.vocabulary_terms = Vocabulary.load(
+            _get_vocabulary_filepath(filepath), mmap=True)
+        index._set_impacts(impacts)
+        return index
+
+
+def _get_vocabulary_filepath(filepath):
+    """
+    Get the path of the file in which the vocabulary of an index saved
+    at ``filepath`` is saved.
+    """
+    if filepath.endswith('.npz'):
+        filepath = filepath[:-len('.npz')]
+    return filepath + '.vocab'
+
+
+def _match_sorted(sorted_ids, ids):
+    """
+    Find which of ``ids`` are also in ``sorted_ids``, and the positions in
+    ``sorted_ids`` at which they occur.
+
+    Returns:
+        :class:`numpy.ndarray`, :class:`numpy.ndarray`: Boolean mask of ``ids``
+        that occur in ``sorted_ids``, and their indexes into ``sorted_ids``.
+    """
+    if len(sorted_ids) == 0 or len(ids) == 0:
+        return np.zeros(len(ids), dtype=bool), np.empty(0, dtype=np.intp)
+    idxs = np.searchsorted(sorted_ids, ids)
+    idxs[idxs == len(sorted_ids)] = 0
+    is_matched = sorted_ids[idxs] == ids
+    return is_matched, idxs[is_matched]
@@ -3,6 +3,7 @@ Set of small utility functions that take text strings as input.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import collections
 import logging
 import re
 
@@ -173,3 +174,82 @@ def clean_terms(terms):
     for term in terms:
         if re.search(r'\w', term):
             yield term
+
+
+def get_superstrings(strings):
+    """
+    Find, for each string in ``strings``, all *other* strings in ``strings`` that
+    contain it as a substring, i.e. all ``s2`` for which ``s1 in s2 and s1 != s2``.
+
+    Rather than testing every pair of strings, which is quadratic in their number,
+    an Aho-Corasick automaton is built over all strings, and each string is
+    scanned through it once, so that runtime scales with their total length
+    plus the number of containments found.
+
+    Args:
+        strings (Iterable[str]): sequence of strings, such as candidate key terms;
+            duplicates are ignored
+
+    Returns:
+        Dict[str, Set[str]]: mapping of each unique string in ``strings`` to
+        the set of other strings in which it's contained
+
+    Example::
+
+        >>> get_superstrings(['york', 'new york', 'new york city', 'city'])
+        {'york': {'new york', 'new york city'}, 'new york': {'new york city'},
+         'new york city': set(), 'city': {'new york city'}}
+    """
+    strings = list(collections.OrderedDict.fromkeys(strings))
+    superstrings = {string: set() for string in strings}
+
+    # build a trie of all strings, marking the node at which each one ends
+    # the empty string is contained by everything, so it's handled separately
+    gotos = [{}]
+    ends = [[]]
+    for idx, string in enumerate(strings):
+        if not string:
+            superstrings[string].update(s for s in strings if s)
+            continue
+        node = 0
+        for char in string:
+            next_node = gotos[node].get(char)
+            if next_node is None:
+                next_node = len(gotos)
+                gotos[node][char] = next_node
+                gotos.append({})
+                ends.append([])
+            node = next_node
+        ends[node].append(idx)
+
+    # link each node to that of its longest proper suffix in the trie (fails)
+    # and to that of its longest proper suffix which is itself a string (outs)
+    fails = [0] * len(gotos)
+    outs = [0] * len(gotos)
+    queue = collections.deque(gotos[0].values())
+    while queue:
+        node = queue.popleft()
+        for char, child in gotos[node].items():
+            queue.append(child)
+            fail = fails[node]
+            while fail and char not in gotos[fail]:
+                fail = fails[fail]
+            fail = gotos[fail].get(char, 0) if node else 0
+            fails[child] = fail
+            outs[child] = fail if ends[fail] else outs[fail]
+
+    # scan each string through the automaton, collecting strings found within it
+    for string in strings:
+        node = 0
+        for char in string:
+            while node and char not in gotos[node]:
+                node = fails[node]
+            node = gotos[node].get(char, 0)
+            out = node if ends[node] else outs[node]
+            while out:
+                for idx in ends[out]:
+                    if strings[idx] != string:
+                        superstrings[strings[idx]].add(string)
+                out = outs[out]
+
+    return superstrings
@@ -1,5 +1,6 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import multiprocessing
 import sys
 import warnings
 
@@ -58,3 +59,70 @@ def print_markdown(items):
                               compat.unicode_(v).replace('\n', ' '))
         for k, v in items)
     print('{}'.format('\n'.join(md_items)))
+
+
+def get_n_jobs(n_jobs):
+    """
+    Get the number of worker processes to use for a parallelized operation,
+    following the usual convention for negative values.
+
+    Args:
+        n_jobs (int): Number of worker processes. If -1, use all available CPUs;
+            if -2, use all but one; and so on. Must not be 0.
+
+    Returns:
+        int: Positive number of worker processes.
+
+    Raises:
+        ValueError: if ``n_jobs`` is 0
+    """
+    if n_jobs == 0:
+        raise ValueError('`n_jobs` must be a positive or negative integer, not 0')
+    if n_jobs < 0:
+        n_jobs = max(multiprocessing.cpu_count() + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def to_spacy_docs(docs):
+    """
+    Get the bare ``spacy.Doc`` underlying each of ``docs``, e.g. to ship to
+    worker processes, since a textacy ``Doc`` drags its entire parent
+    ``Corpus`` along with it when pickled.
+
+    Args:
+        docs (Iterable[:class:`textacy.Doc` or ``spacy.Doc``])
+
+    Yields:
+        ``spacy.Doc``
+    """
+    for doc in docs:
+        yield doc.spacy_doc if hasattr(doc, 'spacy_doc') else doc
+
+
+def imap_in_pool(func, iterable, n_jobs, chunk_size=1, initializer=None, initargs=()):
+    """
+    Lazily apply ``func`` to each item in ``iterable`` across a pool of
+    worker processes, yielding results in order, and make sure that the pool
+    is shut down once results are exhausted or no longer wanted.
+
+    Args:
+        func (callable): Function applied to each item; must be picklable,
+            i.e. defined at the top level of a module.
+        iterable (Iterable)
+        n_jobs (int): Number of worker processes, as returned by :func:`get_n_jobs`.
+        chunk_size (int): Number of items sent to a worker process at a time.
+        initializer (callable): If not None, called as ``initializer(*initargs)``
+            once in each worker process when it starts, e.g. to set up large,
+            read-only state that shouldn't be shipped along with every item.
+        initargs (tuple)
+
+    Yields:
+        Result of ``func(item)`` for each item in ``iterable``.
+    """
+    pool = multiprocessing.Pool(
+        processes=n_jobs, initializer=initializer, initargs=initargs)
+    try:
+        for result in pool.imap(func, iterable, chunksize=chunk_size):
+            yield result
+    finally:
+        pool.terminate()
@@ -7,14 +7,21 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import collections
 import itertools
-import operator
+import mmap as mmap_
+import multiprocessing
+import numbers
+import struct
 from array import array
 
 import numpy as np
 import scipy.sparse as sp
+from cytoolz import itertoolz
 from sklearn.preprocessing import normalize as normalize_mat
+from sklearn.utils import murmurhash3_32
 
 from . import compat
+from . import io
+from . import utils
 
 
 class Vectorizer(object):
@@ -60,6 +67,16 @@ class Vectorizer(object):
         >>> vectorizer.terms_list[:5]  # NOTE: that empty string shouldn't be there :/
         ['speaker', '', 'republican', 'house', 'american']
 
+    Or, fit a vectorizer incrementally on batches of a growing corpus; the
+    columns of doc-term matrices stay aligned across batches, with filtered-out
+    terms' values zeroed::
+
+        >>> vectorizer = Vectorizer(weighting='tfidf', normalize=True, min_df=3)
+        >>> for i in range(0, 1000, 100):
+        ...     vectorizer.partial_fit(
+        ...         doc.to_terms_list(ngrams=1, named_entities=True, as_strings=True)
+        ...         for doc in corpus[i: i + 100])
+
     If known in advance, limit the terms included in vectorized outputs
     to a particular set of values::
 
@@ -77,6 +94,16 @@ class Vectorizer(object):
         >>> vectorizer.terms_list
         ['american', 'bill', 'distinguished', 'president', 'unanimous']
 
+    Or, vectorize docs' terms as arrays of their integer ids, which are counted
+    without any per-term string or dict operations; term strings are only
+    looked up for the vocabulary, once terms have been filtered::
+
+        >>> tokenized_docs = (
+        ...     np.fromiter(doc.to_terms_list(ngrams=1, as_strings=False), dtype=np.uint64)
+        ...     for doc in corpus)
+        >>> vectorizer = Vectorizer(min_df=3, term_strings=corpus.spacy_vocab.strings)
+        >>> doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+
     Args:
         weighting ({'tf', 'tfidf', 'binary'}): Weighting to assign to terms in
             the doc-term matrix. If 'tf', matrix values (i, j) correspond to the
@@ -89,10 +116,10 @@ class Vectorizer(object):
             i.e. tf => 1 + log(tf).
         smooth_idf (bool): If True, add 1 to all document frequencies, equivalent
             to adding a single document to the corpus containing every unique term.
-        vocabulary_terms (Dict[str, int] or Iterable[str]): Mapping of unique term
-            string to unique term id, or an iterable of term strings that gets
-            converted into a suitable mapping. Note that, if specified, vectorized
-            outputs will include *only* these terms as columns.
+        vocabulary_terms (:class:`Vocabulary` or Dict[str, int] or Iterable[str]):
+            Mapping of unique term string to unique term id, or an iterable of
+            term strings that gets converted into a suitable mapping. Note that,
+            if specified, vectorized outputs will include *only* these terms as columns.
         min_df (float or int): If float, value is the fractional proportion of
             the total number of documents, which must be in [0.0, 1.0]. If int,
             value is the absolute number. Filter terms whose document frequency
@@ -105,10 +132,37 @@ class Vectorizer(object):
             ``min_ic``; value must be in [0.0, 1.0].
         max_n_terms (int): Only include terms whose document frequency is within
             the top ``max_n_terms``.
+        n_features (int): If specified, terms aren't assigned ids from a
+            vocabulary, but are instead hashed into this many columns, such that
+            vectorization is stateless and outputs for separate batches of docs
+            can simply be stacked. Filtering terms by doc freq or info content
+            isn't supported in this mode.
+        alternate_sign (bool): If True and ``n_features`` is specified, the sign
+            of each term's values is determined by its hash, so that collisions
+            of terms in a column tend to cancel out rather than accumulate.
+        max_reverse_terms (int): If ``n_features`` is specified, max number of
+            terms, as first seen, for which to keep a mapping of column id
+            to term, available via ``id_to_term``.
+        dtype (:class:`numpy.dtype`): If specified, values of vectorized outputs
+            have this floating-point dtype, e.g. ``np.float32`` to halve their
+            memory use; otherwise, they're 64-bit floats if re-weighted and
+            integer counts if not.
+        index_dtype (:class:`numpy.dtype`): If None, sparse matrices' indices
+            and index pointers are 32-bit ints, unless they have too many values,
+            in which case they're 64-bit ints. Otherwise, force this dtype, which
+            must be ``np.int32`` or ``np.int64``. Note that subsequent operations
+            on outputs may downcast 64-bit indices, as scipy sees fit.
+        term_strings (Mapping[int, str]): If specified, terms counted as integer
+            ids, i.e. in docs given as integer :class:`numpy.ndarray` s, are
+            resolved via this mapping into the term strings of
+            :attr:`Vectorizer.vocabulary_terms`, e.g. a spaCy ``StringStore``;
+            otherwise, terms are the integer ids themselves. To count such docs
+            against a vocabulary of strings, it must also map strings to ids,
+            as a ``StringStore`` does, or else a ValueError is raised.
 
     Attributes:
-        vocabulary_terms (Dict[str, int]): Mapping of unique term string to unique
-            term id, either provided on instantiation or generated by calling
+        vocabulary_terms (:class:`Vocabulary`): Mapping of unique term string to
+            unique term id, either provided on instantiation or generated by calling
             :meth:`Vectorizer.fit()` on a collection of tokenized documents.
         id_to_term (Dict[int, str]): Mapping of unique term id to unique term
             string, i.e. the inverse of :attr:`Vectorizer.vocabulary_terms`.
@@ -120,7 +174,9 @@ class Vectorizer(object):
     def __init__(self,
                  weighting='tf', normalize=False, sublinear_tf=False, smooth_idf=True,
                  min_df=1, max_df=1.0, min_ic=0.0, max_n_terms=None,
-                 vocabulary_terms=None):
+                 vocabulary_terms=None,
+                 n_features=None, alternate_sign=True, max_reverse_terms=0,
+                 dtype=None, index_dtype=None, term_strings=None):
         # sanity check numeric arguments
         if min_df < 0 or max_df < 0:
             raise ValueError('`min_df` and `max_df` must be positive numbers or None')
@@ -128,6 +184,21 @@ class Vectorizer(object):
             raise ValueError('`min_ic` must be a float in the interval [0.0, 1.0]')
         if max_n_terms and max_n_terms < 0:
             raise ValueError('`max_n_terms` must be a positive integer or None')
+        if n_features is not None:
+            if n_features < 1:
+                raise ValueError('`n_features` must be a positive integer or None')
+            if vocabulary_terms is not None:
+                raise ValueError('`vocabulary_terms` may not be specified with `n_features`')
+            if min_df != 1 or max_df != 1.0 or min_ic != 0.0 or max_n_terms is not None:
+                raise ValueError('terms may not be filtered when hashed via `n_features`')
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+            if dtype.kind != 'f':
+                raise ValueError('`dtype` must be a floating-point dtype or None')
+        if index_dtype is not None:
+            index_dtype = np.dtype(index_dtype)
+            if index_dtype not in (np.int32, np.int64):
+                raise ValueError('`index_dtype` must be np.int32, np.int64, or None')
         self.weighting = weighting
         self.normalize = normalize
         self.sublinear_tf = sublinear_tf
@@ -136,17 +207,48 @@ class Vectorizer(object):
         self.max_df = max_df
         self.min_ic = min_ic
         self.max_n_terms = max_n_terms
-        self.vocabulary_terms, self._fixed_terms = self._validate_vocabulary(vocabulary_terms)
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.dtype = dtype
+        self.index_dtype = index_dtype
+        self.term_strings = term_strings
+        if n_features is None:
+            self.vocabulary_terms, self._fixed_terms = self._validate_vocabulary(vocabulary_terms)
+        else:
+            # a hasher stands in for a vocabulary that's fixed from the start
+            self.vocabulary_terms = _TermHasher(
+                n_features, alternate_sign=alternate_sign, max_reverse_terms=max_reverse_terms)
+            self._fixed_terms = True
         self.id_to_term_ = {}
+        self._id_to_term_vocab = None
+        # term stats accumulated over all fit docs, from which a mask of terms
+        # to filter and idf values are (re-)computed whenever they change
+        self._doc_freqs = None
+        self._term_freqs = None
+        self._n_docs = 0
+        self._is_stale = False
+        self._term_mask = None
+        self._idf_diag = None
+        # terms filtered out by fitting, along with their stats, which are added
+        # back in if the vectorizer is subsequently partially fit
+        self._filtered_terms = None
+        # sorted array of integer term ids and corresponding vocabulary ids,
+        # along with the vocabulary (and its size) from which they were built
+        self._term_keys = None
 
     def _validate_vocabulary(self, vocabulary):
         """
         Validate an input vocabulary. If it's a mapping, ensure that term ids
         are unique and compact (i.e. without any gaps between 0 and the number
-        of terms in ``vocabulary``. If it's a sequence, sort terms then assign
-        integer ids in ascending order.
+        of terms in ``vocabulary``), as checked by :class:`Vocabulary`. If it's
+        a sequence, sort terms then assign integer ids in ascending order. Either way, it's converted into a frozen
+        :class:`Vocabulary`; if it's already a :class:`Vocabulary`, it's used as-is.
         """
-        if vocabulary is not None:
+        if isinstance(vocabulary, Vocabulary):
+            if not vocabulary:
+                raise ValueError('`vocabulary` must not be empty.')
+            is_fixed = True
+        elif vocabulary is not None:
             if not isinstance(vocabulary, collections.Mapping):
                 vocab = {}
                 for i, term in enumerate(sorted(vocabulary)):
@@ -155,24 +257,9 @@ class Vectorizer(object):
                             'Terms in `vocabulary` must be unique, but "{}" '
                             'was found more than once.'.format(term))
                 vocabulary = vocab
-            else:
-                ids = set(vocabulary.values())
-                if len(ids) != len(vocabulary):
-                    counts = collections.Counter(vocabulary.values())
-                    n_dupe_term_ids = sum(
-                        1 for term_id, term_id_count in counts.items()
-                        if term_id_count > 1)
-                    raise ValueError(
-                        'Term ids in `vocabulary` must be unique, but {} ids'
-                        'were assigned to more than one term.'.format(n_dupe_term_ids))
-                for i in range(len(vocabulary)):
-                    if i not in ids:
-                        raise ValueError(
-                            'Term ids in `vocabulary` must be compact, i.e. '
-                            'not have any gaps, but term id {} is missing from '
-                            'a vocabulary of {} terms'.format(i, len(vocabulary)))
             if not vocabulary:
                 raise ValueError('`vocabulary` must not be empty.')
+            vocabulary = Vocabulary(vocabulary).freeze()
             is_fixed = True
         else:
             is_fixed = False
@@ -183,7 +270,7 @@ class Vectorizer(object):
         Check that instance has a valid vocabulary mapping;
         if not, raise a ValueError.
         """
-        if not isinstance(self.vocabulary_terms, collections.Mapping):
+        if not isinstance(self.vocabulary_terms, (collections.Mapping, _TermHasher)):
             raise ValueError(
                 'vocabulary hasn\'t been built; call `Vectorizer.fit()`')
         if len(self.vocabulary_terms) == 0:
@@ -195,11 +282,16 @@ class Vectorizer(object):
         dict: Mapping of unique term id (int) to unique term string (str), i.e.
             the inverse of :attr:`Vectorizer.vocabulary`. This attribute is only
             generated if needed, and it is automatically kept in sync with the
-            corresponding vocabulary.
+            corresponding vocabulary. If terms are hashed, only those for which
+            a reverse mapping was kept are included.
         """
-        if len(self.id_to_term_) != self.vocabulary_terms:
-            self.id_to_term_ = {
-                term_id: term_str for term_str, term_id in self.vocabulary_terms.items()}
+        if isinstance(self.vocabulary_terms, _TermHasher):
+            return {term_id: term_str for term_str, term_id
+                    in self.vocabulary_terms.reverse_terms.items()}
+        if (self._id_to_term_vocab is not self.vocabulary_terms or
+                len(self.id_to_term_) != len(self.vocabulary_terms)):
+            self.id_to_term_ = dict(enumerate(self.vocabulary_terms.terms))
+            self._id_to_term_vocab = self.vocabulary_terms
         return self.id_to_term_
 
     # TODO: Do we *want* to allow setting to this property?
@@ -214,20 +306,24 @@ class Vectorizer(object):
         """
         List of term strings in column order of vectorized outputs. For example,
         ``terms_list[0]`` gives the term assigned to the first column in an
-        output doc-term-matrix, ``doc_term_matrix[:, 0]``.
+        output doc-term-matrix, ``doc_term_matrix[:, 0]``. If terms are hashed,
+        columns without a reverse mapping to a term get None.
         """
         self._check_vocabulary()
-        return [term_str for term_str, _
-                in sorted(self.vocabulary_terms.items(), key=operator.itemgetter(1))]
+        if isinstance(self.vocabulary_terms, _TermHasher):
+            id_to_term = self.id_to_term
+            return [id_to_term.get(term_id) for term_id in range(self.n_features)]
+        return list(self.vocabulary_terms.terms)
 
-    def fit(self, tokenized_docs):
+    def fit(self, tokenized_docs, n_jobs=1, chunk_size=1000):
         """
         Count terms and build up a vocabulary based on the terms found in the
         input ``tokenized_docs``.
 
         Args:
-            tokenized_docs (Iterable[Iterable[str]]): A sequence of tokenized
-                documents, where each is a sequence of (str) terms. For example::
+            tokenized_docs (Iterable[Iterable[str]] or Iterable[:class:`numpy.ndarray`]):
+                A sequence of tokenized documents, where each is a sequence of
+                (str) terms, or an array of integer term ids. For example::
 
                     >>> ([tok.lemma_ for tok in spacy_doc]
                     ...  for spacy_doc in spacy_docs)
@@ -235,14 +331,22 @@ class Vectorizer(object):
                     ...  for doc in corpus)
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
+                    >>> (np.fromiter(doc.to_terms_list(as_strings=False), dtype=np.uint64)
+                    ...  for doc in docs)
+
+            n_jobs (int): Number of worker processes across which to split
+                counting terms in chunks of ``tokenized_docs``. If 1, count
+                terms in the current process; if -1, use all available CPUs.
+                Outputs are the same regardless of the number of processes.
+            chunk_size (int): Number of docs sent to a worker process at a time.
 
         Returns:
             :class:`Vectorizer`: The instance that has just been fit.
         """
-        _ = self.fit_transform(tokenized_docs)
+        _ = self.fit_transform(tokenized_docs, n_jobs=n_jobs, chunk_size=chunk_size)
         return self
 
-    def fit_transform(self, tokenized_docs):
+    def fit_transform(self, tokenized_docs, n_jobs=1, chunk_size=1000):
         """
         Count terms and build up a vocabulary based on the terms found in the
         input ``tokenized_docs``, then transform ``tokenized_docs`` into a
@@ -250,8 +354,9 @@ class Vectorizer(object):
         specified in :class:`Vectorizer` initialization.
 
         Args:
-            tokenized_docs (Iterable[Iterable[str]]): A sequence of tokenized
-                documents, where each is a sequence of (str) terms. For example::
+            tokenized_docs (Iterable[Iterable[str]] or Iterable[:class:`numpy.ndarray`]):
+                A sequence of tokenized documents, where each is a sequence of
+                (str) terms, or an array of integer term ids. For example::
 
                     >>> ([tok.lemma_ for tok in spacy_doc]
                     ...  for spacy_doc in spacy_docs)
@@ -259,6 +364,14 @@ class Vectorizer(object):
                     ...  for doc in corpus)
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
+                    >>> (np.fromiter(doc.to_terms_list(as_strings=False), dtype=np.uint64)
+                    ...  for doc in docs)
+
+            n_jobs (int): Number of worker processes across which to split
+                counting terms in chunks of ``tokenized_docs``. If 1, count
+                terms in the current process; if -1, use all available CPUs.
+                Outputs are the same regardless of the number of processes.
+            chunk_size (int): Number of docs sent to a worker process at a time.
 
         Returns:
             :class:`scipy.sparse.csr_matrix`: The transformed document-term matrix.
@@ -266,14 +379,72 @@ class Vectorizer(object):
         """
         # count terms and build up a vocabulary
         doc_term_matrix, self.vocabulary_terms = self._count_terms(
-            tokenized_docs, self._fixed_terms)
-        # filter terms by doc freq or info content, as specified in init
+            tokenized_docs, self._fixed_terms, n_jobs=n_jobs, chunk_size=chunk_size,
+            resolve_terms=False)
+        # store stats and idf values of terms, for use in later transforms,
+        # then filter terms by doc freq or info content, as specified in init
+        self._set_fit_stats(doc_term_matrix)
+        self._filtered_terms = self._get_filtered_terms(self.vocabulary_terms)
         doc_term_matrix, self.vocabulary_terms = self._filter_terms(
             doc_term_matrix, self.vocabulary_terms)
+        # only terms that made it through filtering need their strings looked up
+        self.vocabulary_terms = self._resolve_terms(self.vocabulary_terms)
         # re-weight values in doc-term matrix, as specified in init
         doc_term_matrix = self._reweight_values(doc_term_matrix)
         return doc_term_matrix
 
+    def partial_fit(self, tokenized_docs):
+        """
+        Count terms in ``tokenized_docs`` and add any new ones to the vocabulary,
+        in addition to terms and counts from previous calls to this method or to
+        :meth:`Vectorizer.fit()`. Existing terms keep their ids, and new terms are
+        assigned the next available ids, so that the columns of doc-term matrices
+        output by :meth:`Vectorizer.transform()` line up across batches.
+
+        Filtering by doc freq or info content, as specified in initialization,
+        is applied lazily to all terms on the next transform, by zeroing out
+        the columns of filtered terms instead of removing them. Terms that were
+        filtered out by :meth:`Vectorizer.fit()` are added back in, after all
+        others, so that they may pass filtering once their stats are updated.
+        New terms are added to :attr:`Vectorizer.vocabulary_terms` in-place,
+        unless it's frozen.
+
+        Args:
+            tokenized_docs (Iterable[Iterable[str]] or Iterable[:class:`numpy.ndarray`]):
+                A sequence of tokenized documents, where each is a sequence of
+                (str) terms, or an array of integer term ids. For example::
+
+                    >>> ([tok.lemma_ for tok in spacy_doc]
+                    ...  for spacy_doc in spacy_docs)
+                    >>> ((ne.text for ne in extract.named_entities(doc))
+                    ...  for doc in corpus)
+                    >>> (doc.to_terms_list(as_strings=True)
+                    ...  for doc in docs)
+                    >>> (np.fromiter(doc.to_terms_list(as_strings=False), dtype=np.uint64)
+                    ...  for doc in docs)
+
+        Returns:
+            :class:`Vectorizer`: The instance that has just been partially fit.
+        """
+        _ = self._partial_fit(tokenized_docs)
+        return self
+
+    def _partial_fit(self, tokenized_docs):
+        """
+        Partially fit the vectorizer on ``tokenized_docs``, as in
+        :meth:`Vectorizer.partial_fit()`, and return their tf-weighted
+        doc-term matrix, with one column per term in the updated vocabulary.
+
+        Returns:
+            :class:`scipy.sparse.csr_matrix`
+        """
+        if self._filtered_terms is not None:
+            self._restore_filtered_terms()
+        doc_term_matrix, self.vocabulary_terms = self._count_terms(
+            tokenized_docs, self._fixed_terms, extend_vocab=True)
+        self._add_fit_stats(doc_term_matrix)
+        return doc_term_matrix
+
     def transform(self, tokenized_docs):
         """
         Transform ``tokenized_docs`` into a document-term matrix, with columns
@@ -282,8 +453,9 @@ class Vectorizer(object):
         according to the parameters specified in class initialization.
 
         Args:
-            tokenized_docs (Iterable[Iterable[str]]): A sequence of tokenized
-                documents, where each is a sequence of (str) terms. For example::
+            tokenized_docs (Iterable[Iterable[str]] or Iterable[:class:`numpy.ndarray`]):
+                A sequence of tokenized documents, where each is a sequence of
+                (str) terms, or an array of integer term ids. For example::
 
                     >>> ([tok.lemma_ for tok in spacy_doc]
                     ...  for spacy_doc in spacy_docs)
@@ -291,6 +463,8 @@ class Vectorizer(object):
                     ...  for doc in corpus)
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
+                    >>> (np.fromiter(doc.to_terms_list(as_strings=False), dtype=np.uint64)
+                    ...  for doc in docs)
 
         Returns:
             :class:`scipy.sparse.csr_matrix`: The transformed document-term matrix.
@@ -308,16 +482,128 @@ class Vectorizer(object):
         self._check_vocabulary()
         doc_term_matrix, _ = self._count_terms(
             tokenized_docs, True)
+        doc_term_matrix = self._mask_terms(doc_term_matrix)
         return self._reweight_values(doc_term_matrix)
 
-    def _count_terms(self, tokenized_docs, fixed_vocab):
+    def transform_to_disk(self, tokenized_docs, dirname, chunk_size=10000,
+                          mode='w', make_dirs=False):
+        """
+        Transform ``tokenized_docs`` into a document-term matrix, as in
+        :meth:`Vectorizer.transform()`, but write it to disk at ``dirname``
+        in blocks of ``chunk_size`` rows as they're produced, such that the full
+        matrix never has to fit in memory.
+
+        Args:
+            tokenized_docs (Iterable[Iterable[str]]): A sequence of tokenized
+                documents, where each is a sequence of (str) terms.
+            dirname (str): Path to directory on disk to which the doc-term matrix
+                will be written, as uncompressed ``.npy`` files.
+            chunk_size (int): Number of docs transformed and written at a time.
+            mode ({'w', 'a'}): If 'w', overwrite any matrix already in ``dirname``;
+                if 'a', append rows to it.
+            make_dirs (bool): If True, automatically create (sub)directories if
+                not already present in order to write ``dirname``.
+
+        Returns:
+            Tuple[int, int]: Shape of the full doc-term matrix written to ``dirname``,
+            which may be read back, memory-mapped, via
+            ``textacy.io.read_sparse_matrix(dirname, kind='csr', mmap=True)``.
+
+        Note:
+            Values are the same as if all docs were transformed at once only if
+            idf weights were stored by fitting the vectorizer, since otherwise,
+            they're computed per block of docs.
+
+        See Also:
+            :func:`textacy.io.write_sparse_matrix_chunks()`
+        """
+        self._check_vocabulary()
+        doc_term_matrices = (
+            self.transform(chunk)
+            for chunk in itertoolz.partition_all(chunk_size, tokenized_docs))
+        return io.write_sparse_matrix_chunks(
+            doc_term_matrices, dirname, mode=mode, make_dirs=make_dirs)
+
+    def transform_doc(self, terms):
+        """
+        Transform a single tokenized document into a document-term matrix with
+        one row, as in :meth:`Vectorizer.transform()`, but with much less
+        overhead per call, e.g. for online scoring of individual documents.
+
+        Args:
+            terms (Iterable[str] or :class:`numpy.ndarray`): A tokenized document,
+                i.e. a sequence of (str) terms, or an array of integer term ids.
+
+        Returns:
+            :class:`scipy.sparse.csr_matrix`: The transformed document-term matrix,
+            of shape (1, # unique terms).
+        """
+        self._check_vocabulary()
+        if self._is_stale is True:
+            self._update_fit_stats()
+        vocabulary = self.vocabulary_terms
+        if _is_term_id_array(terms):
+            term_keys, key_term_ids = self._get_term_keys(vocabulary)
+            data, indices, _, _ = _count_term_ids_chunk([terms], term_keys, key_term_ids)
+            n_terms = len(indices)
+        else:
+            term_counter = collections.defaultdict(int)
+            for term in terms:
+                try:
+                    term_counter[vocabulary[term]] += 1
+                except KeyError:
+                    continue
+            if self.n_features is not None and self.alternate_sign is True:
+                term_counter = _sum_signed_term_counts(term_counter)
+            n_terms = len(term_counter)
+            indices = np.fromiter(term_counter.keys(), dtype=np.intc, count=n_terms)
+            data = np.fromiter(term_counter.values(), dtype=np.intc, count=n_terms)
+        if self._term_mask is not None:
+            is_kept = self._term_mask[indices]
+            indices = indices[is_kept]
+            data = data[is_kept]
+            n_terms = len(indices)
+        sorted_idxs = np.argsort(indices)
+        indices = indices[sorted_idxs]
+        data = data[sorted_idxs].astype(
+            _get_count_dtype(np.abs(data).max() if n_terms > 0 else 0, self.index_dtype),
+            copy=False)
+
+        # re-weight values, exactly as in _reweight_values()
+        if self.dtype is not None:
+            data = data.astype(self.dtype)
+        if self.weighting == 'binary':
+            data = np.sign(data)
+        else:
+            if self.sublinear_tf is True:
+                data = np.sign(data) * (np.log(np.abs(data)) + 1)
+            # idf values of a single-doc batch are all 1, so nothing to apply
+            # if idf values weren't stored by fitting
+            if self.weighting == 'tfidf' and self._idf_diag is not None:
+                # values along the main diagonal
+                idfs = self._idf_diag.data[0].astype(data.dtype, copy=False)
+                data = data * idfs[indices]
+        if self.normalize is True:
+            if data.dtype.kind != 'f':
+                data = data.astype(np.float64)
+            norm = np.sqrt(np.dot(data, data))
+            if norm > 0.0:
+                data /= norm
+
+        return sp.csr_matrix(
+            (data, indices, np.array([0, n_terms], dtype=np.intc)),
+            shape=(1, len(vocabulary)))
+
+    def _count_terms(self, tokenized_docs, fixed_vocab, extend_vocab=False,
+                     n_jobs=1, chunk_size=1000, resolve_terms=True):
         """
         Count terms and build up a vocabulary based on the terms found in
         ``tokenized_docs``.
 
         Args:
-            tokenized_docs (Iterable[Iterable[str]]): A sequence of tokenized
-                documents, where each is a sequence of (str) terms. For example::
+            tokenized_docs (Iterable[Iterable[str]] or Iterable[:class:`numpy.ndarray`]):
+                A sequence of tokenized documents, where each is a sequence of
+                (str) terms, or an array of integer term ids. For example::
 
                     >>> ([tok.lemma_ for tok in spacy_doc]
                     ...  for spacy_doc in spacy_docs)
@@ -325,81 +611,386 @@ class Vectorizer(object):
                     ...  for doc in corpus)
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
+                    >>> (np.fromiter(doc.to_terms_list(as_strings=False), dtype=np.uint64)
+                    ...  for doc in docs)
 
             fixed_vocab (bool): If False, a new vocabulary is built from terms
                 in ``tokenized_docs``; if True, only terms already found in
                 :attr:`Vectorizer.vocabulary_terms` are counted.
+            extend_vocab (bool): If True and ``fixed_vocab`` is False, the new
+                vocabulary starts from :attr:`Vectorizer.vocabulary_terms`, if any,
+                rather than from scratch.
+            n_jobs (int): Number of worker processes across which to split
+                counting terms in chunks of ``tokenized_docs``. Integer term ids
+                are always counted in the current process.
+            chunk_size (int): Number of docs sent to a worker process at a time,
+                or whose integer term ids are counted at once.
+            resolve_terms (bool): If True, new terms counted as integer ids are
+                added to the vocabulary as strings, via :attr:`Vectorizer.term_strings`;
+                otherwise, they're added as-is, to be resolved later by
+                :meth:`Vectorizer._resolve_terms()`.
 
         Returns:
-            :class:`scipy.sparse.csr_matrix`, Dict[str, int]
+            :class:`scipy.sparse.csr_matrix`, :class:`Vocabulary` or :class:`_TermHasher`
         """
-        if fixed_vocab is False:
-            # add a new value when a new term is seen
-            vocabulary = collections.defaultdict()
-            vocabulary.default_factory = vocabulary.__len__
+        try:
+            first_terms, tokenized_docs = itertoolz.peek(tokenized_docs)
+        except StopIteration:
+            first_terms = None
+        if _is_term_id_array(first_terms):
+            if self.n_features is not None:
+                raise ValueError('integer term ids may not be hashed via `n_features`')
+            data, indices, row_lengths, vocabulary = self._count_term_ids(
+                tokenized_docs, fixed_vocab, extend_vocab, chunk_size, resolve_terms)
         else:
-            vocabulary = self.vocabulary_terms
-
-        data = array(str('i'))
-        indices = array(str('i'))
-        indptr = array(str('i'), [0])
-        for terms in tokenized_docs:
-            term_counter = collections.defaultdict(int)
-            for term in terms:
-                try:
-                    term_idx = vocabulary[term]
-                    term_counter[term_idx] += 1
-                except KeyError:
-                    # ignore out-of-vocabulary terms when _fixed_terms=True
-                    continue
-
-            data.extend(term_counter.values())
-            indices.extend(term_counter.keys())
-            indptr.append(len(indices))
+            if fixed_vocab is True:
+                vocabulary = term_to_id = self.vocabulary_terms
+            elif extend_vocab is True and self.vocabulary_terms:
+                # add new terms to the existing vocabulary in-place, rather than
+                # copying it, which would cost time proportional to its size
+                vocabulary = self._get_extendable_vocabulary()
+                term_to_id = vocabulary._get_term_adder()
+            else:
+                # add a new value when a new term is seen
+                vocabulary = None
+                term_to_id = collections.defaultdict()
+                term_to_id.default_factory = term_to_id.__len__
+
+            n_jobs = utils.get_n_jobs(n_jobs)
+            if n_jobs == 1:
+                data, indices, row_lengths = _count_terms_chunk(tokenized_docs, term_to_id)
+            else:
+                data, indices, row_lengths = _count_terms_in_parallel(
+                    tokenized_docs, term_to_id, fixed_vocab, n_jobs, chunk_size)
 
-        if fixed_vocab is False:
-            # we no longer want defaultdict behaviour
-            vocabulary = dict(vocabulary)
+            if vocabulary is None:
+                # we no longer want defaultdict behaviour
+                vocabulary = Vocabulary(term_to_id)
+        indptr = _get_indptr(row_lengths, self.index_dtype)
+        # indices and index pointer must share a dtype
+        indices = indices.astype(indptr.dtype, copy=False)
 
-        data = np.frombuffer(data, dtype=np.intc)
-        indices = np.frombuffer(indices, dtype=np.intc)
-        indptr = np.frombuffer(indptr, dtype=np.intc)
+        if self.n_features is not None and self.alternate_sign is True:
+            indices, data = _unsign_term_ids(indices, data)
+        count_dtype = _get_count_dtype(
+            np.abs(data).max() if len(data) > 0 else 0, self.index_dtype)
 
         doc_term_matrix = sp.csr_matrix(
-            (data, indices, indptr),
+            (data.astype(count_dtype, copy=False), indices, indptr),
             shape=(len(indptr) - 1, len(vocabulary)),
-            dtype=np.int32)
-        doc_term_matrix.sort_indices()
+            dtype=count_dtype)
+        if self.n_features is not None and self.alternate_sign is True:
+            # oppositely-signed terms hashed into the same column are summed
+            doc_term_matrix.sum_duplicates()
+            doc_term_matrix.eliminate_zeros()
+        else:
+            doc_term_matrix.sort_indices()
 
-        return doc_term_matrix, vocabulary
+        return _set_index_dtype(doc_term_matrix, self.index_dtype), vocabulary
+
+    def _count_term_ids(self, tokenized_docs, fixed_vocab, extend_vocab,
+                        chunk_size, resolve_terms):
+        """
+        Count terms in ``tokenized_docs`` given as arrays of integer term ids,
+        chunk by chunk, by looking up their vocabulary ids in a sorted array of
+        known term ids, to which new ones are added, as in :meth:`Vectorizer._count_terms()`.
+
+        Returns:
+            :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`,
+            :class:`Vocabulary`
+        """
+        if fixed_vocab is True or (extend_vocab is True and self.vocabulary_terms):
+            term_keys, key_term_ids = self._get_term_keys(self.vocabulary_terms)
+            n_known_terms = len(self.vocabulary_terms)
+        else:
+            term_keys = np.empty(0, dtype=np.uint64)
+            key_term_ids = np.empty(0, dtype=np.intc)
+            n_known_terms = 0
+        n_terms = None if fixed_vocab is True else n_known_terms
+        data = []
+        indices = []
+        row_lengths = []
+        new_keys = []
+        for chunk in itertoolz.partition_all(chunk_size, tokenized_docs):
+            chunk_data, chunk_indices, chunk_row_lengths, chunk_new_keys = _count_term_ids_chunk(
+                chunk, term_keys, key_term_ids, n_terms=n_terms)
+            data.append(chunk_data)
+            indices.append(chunk_indices)
+            row_lengths.append(chunk_row_lengths)
+            if len(chunk_new_keys) > 0:
+                # merge new term ids into the sorted array of known ones,
+                # without re-sorting the latter
+                order = np.argsort(chunk_new_keys)
+                idxs = np.searchsorted(term_keys, chunk_new_keys[order])
+                term_keys = np.insert(term_keys, idxs, chunk_new_keys[order])
+                key_term_ids = np.insert(
+                    key_term_ids, idxs, (n_terms + order).astype(np.intc))
+                n_terms += len(chunk_new_keys)
+                new_keys.append(chunk_new_keys)
+
+        if fixed_vocab is True:
+            vocabulary = self.vocabulary_terms
+        else:
+            new_terms = np.concatenate(new_keys).tolist() if new_keys else []
+            if resolve_terms is True and self.term_strings is not None:
+                new_terms = [self.term_strings[term] for term in new_terms]
+            if n_known_terms > 0:
+                # add new terms to the existing vocabulary in-place, as for strings
+                vocabulary = self._get_extendable_vocabulary()
+                for term in new_terms:
+                    vocabulary.add(term)
+                if len(vocabulary) != n_terms:
+                    raise ValueError('Terms in `vocabulary` must be unique.')
+            else:
+                vocabulary = Vocabulary(new_terms)
+            self._term_keys = (vocabulary, len(vocabulary), term_keys, key_term_ids)
+        if not data:
+            return tuple(np.array([], dtype=np.intc) for _ in range(3)) + (vocabulary,)
+        return (np.concatenate(data), np.concatenate(indices), np.concatenate(row_lengths),
+                vocabulary)
+
+    def _get_extendable_vocabulary(self):
+        """
+        Get the vocabulary to which new terms are added when extending it,
+        i.e. :attr:`Vectorizer.vocabulary_terms` itself, unless it's frozen,
+        in which case it's copied first.
+
+        Returns:
+            :class:`Vocabulary`
+        """
+        if self.vocabulary_terms.is_frozen is True:
+            return Vocabulary(self.vocabulary_terms.terms)
+        return self.vocabulary_terms
+
+    def _get_term_keys(self, vocabulary):
+        """
+        Get a sorted array of the integer ids of terms in ``vocabulary``, along
+        with the terms' corresponding vocabulary ids, building it only if
+        it's not already cached. Terms that are strings are converted into
+        integer ids via :attr:`Vectorizer.term_strings`, if possible.
+
+        Returns:
+            :class:`numpy.ndarray`, :class:`numpy.ndarray`
+
+        Raises:
+            ValueError: if none of the terms in a non-empty ``vocabulary`` could
+                be converted into integer ids, e.g. because ``term_strings``
+                only maps ids to strings, in which case no term would be counted
+        """
+        if (self._term_keys is not None and self._term_keys[0] is vocabulary and
+                self._term_keys[1] == len(vocabulary)):
+            return self._term_keys[2], self._term_keys[3]
+        term_keys = []
+        key_term_ids = []
+        for term_id, term in enumerate(vocabulary.terms):
+            if isinstance(term, numbers.Integral):
+                term_key = term
+            elif self.term_strings is not None:
+                try:
+                    term_key = self.term_strings[term]
+                except KeyError:
+                    continue
+            else:
+                continue
+            term_keys.append(term_key)
+            key_term_ids.append(term_id)
+        if not term_keys and len(vocabulary) > 0:
+            raise ValueError(
+                'none of the terms in the vocabulary could be mapped to integer ids; '
+                'to count docs of integer ids against a vocabulary of strings, '
+                '`term_strings` must map strings to ids as well as ids to strings, '
+                'as a spaCy StringStore does')
+        term_keys = np.array(term_keys, dtype=np.uint64)
+        key_term_ids = np.array(key_term_ids, dtype=np.intc)
+        order = np.argsort(term_keys, kind='mergesort')
+        self._term_keys = (vocabulary, len(vocabulary), term_keys[order], key_term_ids[order])
+        return self._term_keys[2], self._term_keys[3]
+
+    def _resolve_terms(self, vocabulary):
+        """
+        Resolve terms in ``vocabulary`` that were counted as integer ids into
+        strings via :attr:`Vectorizer.term_strings`, if specified, carrying over
+        the corresponding sorted array of term ids.
+
+        Returns:
+            :class:`Vocabulary`
+        """
+        if (self.term_strings is None or self._term_keys is None or
+                self._term_keys[0] is not vocabulary):
+            return vocabulary
+        resolved_vocabulary = Vocabulary(
+            self.term_strings[term] if isinstance(term, numbers.Integral) else term
+            for term in vocabulary.terms)
+        self._term_keys = (resolved_vocabulary,) + self._term_keys[1:]
+        return resolved_vocabulary
 
     def _filter_terms(self, doc_term_matrix, vocabulary):
         """
         Filter terms in ``vocabulary`` by their document frequency or information
-        content, as specified in :class:`Vectorizer` initialization.
+        content, as specified in :class:`Vectorizer` initialization, according to
+        the mask of terms computed from stats stored by
+        :meth:`Vectorizer._set_fit_stats()`. Filtered terms' values are dropped
+        from ``doc_term_matrix`` in-place, rather than by copying kept columns,
+        and the stored stats are filtered to match.
 
         Args:
             doc_term_matrix (:class:`sp.sparse.csr_matrix`): Sparse matrix of
                 shape (# docs, # unique terms), where value (i, j) is the weight
                 of term j in doc i.
-            vocabulary (Dict[str, int]): Mapping of term strings to their unique
-                integer ids, e.g. ``{"hello": 0, "world": 1}``.
+            vocabulary (:class:`Vocabulary`): Mapping of term strings to their
+                unique integer ids, e.g. ``{"hello": 0, "world": 1}``.
 
         Returns:
-            :class:`scipy.sparse.csr_matrix`, Dict[str, int]
+            :class:`scipy.sparse.csr_matrix`, :class:`Vocabulary`
+
+        Raises:
+            ValueError: if no terms remain after filtering
         """
-        if self._fixed_terms:
+        mask = self._term_mask
+        if mask is None:
             return doc_term_matrix, vocabulary
+        if not mask.any():
+            raise ValueError(
+                'After filtering, no terms remain; '
+                'try a lower `min_df` or `min_ic`, or a higher `max_df`')
+        doc_term_matrix = _filter_columns(doc_term_matrix, mask, copy=False)
+        filtered_vocabulary = _filter_vocabulary(vocabulary, mask)
+        if self._term_keys is not None and self._term_keys[0] is vocabulary:
+            _, _, term_keys, key_term_ids = self._term_keys
+            is_kept = mask[key_term_ids]
+            new_term_ids = np.cumsum(mask, dtype=np.intc) - 1
+            self._term_keys = (filtered_vocabulary, len(filtered_vocabulary),
+                               term_keys[is_kept], new_term_ids[key_term_ids[is_kept]])
+        vocabulary = filtered_vocabulary
+        self._doc_freqs = self._doc_freqs[mask]
+        self._term_freqs = self._term_freqs[mask]
+        self._update_fit_stats(is_filtered=True)
+        return doc_term_matrix, vocabulary
+
+    def _get_filtered_terms(self, vocabulary):
+        """
+        Get terms in ``vocabulary`` that are filtered out according to the mask
+        of terms computed by :meth:`Vectorizer._set_fit_stats()`, in order of
+        their ids, along with their doc and term frequencies, or None if no terms
+        are filtered out.
+
+        Returns:
+            List[str], :class:`numpy.ndarray`, :class:`numpy.ndarray`
+        """
+        if self._term_mask is None:
+            return None
+        filtered_ids = np.flatnonzero(~self._term_mask)
+        terms = vocabulary.terms
+        return ([terms[term_id] for term_id in filtered_ids],
+                self._doc_freqs[filtered_ids], self._term_freqs[filtered_ids])
+
+    def _restore_filtered_terms(self):
+        """
+        Add terms filtered out by :meth:`Vectorizer.fit()` back into the vocabulary,
+        after all kept terms, along with their stats, such that filtering is
+        re-applied to all terms fit so far, as if they'd been partially fit.
+        """
+        terms, doc_freqs, term_freqs = self._filtered_terms
+        self._filtered_terms = None
+        vocabulary = self._get_extendable_vocabulary()
+        for term in terms:
+            if self.term_strings is not None and isinstance(term, numbers.Integral):
+                term = self.term_strings[term]
+            vocabulary.add(term)
+        self.vocabulary_terms = vocabulary
+        self._doc_freqs = np.concatenate((self._doc_freqs, doc_freqs))
+        self._term_freqs = np.concatenate((self._term_freqs, term_freqs))
+        self._is_stale = True
+
+    def _add_fit_stats(self, doc_term_matrix, remove=False):
+        """
+        Add doc and term frequencies of terms in the tf-weighted ``doc_term_matrix``
+        to those accumulated over all previously fit docs, or subtract them if
+        ``remove`` is True, then mark the values computed from them as stale.
+        """
+        n_docs, n_terms = doc_term_matrix.shape
+        if self._doc_freqs is not None:
+            n_terms = max(n_terms, len(self._doc_freqs))
+        # only stats of terms in the matrix are updated, so that this takes time
+        # proportional to its size rather than to the vocabulary's
+        term_ids, term_idxs, dfs = np.unique(
+            doc_term_matrix.indices, return_inverse=True, return_counts=True)
+        tfs = np.bincount(
+            term_idxs.ravel(), weights=doc_term_matrix.data, minlength=len(term_ids))
+        if remove is True:
+            dfs = -dfs
+            tfs = -tfs
+            n_docs = -n_docs
+        # vocabulary is only ever appended to, so pad existing stats with zeros
+        self._doc_freqs = _pad_with_zeros(self._doc_freqs, n_terms, np.int64)
+        self._term_freqs = _pad_with_zeros(self._term_freqs, n_terms, np.float64)
+        self._doc_freqs[term_ids] += dfs
+        self._term_freqs[term_ids] += tfs
+        self._n_docs += n_docs
+        self._is_stale = True
+
+    def _set_fit_stats(self, doc_term_matrix):
+        """
+        Store doc and term frequencies of all terms in the tf-weighted
+        ``doc_term_matrix``, then update the values computed from them,
+        including the mask of terms to filter.
+        """
+        n_docs, n_terms = doc_term_matrix.shape
+        self._doc_freqs = np.bincount(doc_term_matrix.indices, minlength=n_terms)
+        self._term_freqs = np.bincount(
+            doc_term_matrix.indices, weights=doc_term_matrix.data, minlength=n_terms)
+        self._n_docs = n_docs
+        self._update_fit_stats()
+
+    def _update_fit_stats(self, is_filtered=False):
+        """
+        Compute a mask of terms to keep after filtering them by doc freq or
+        info content, as specified in init, unless they've already been filtered,
+        and inverse document frequencies of terms, stored as a diagonal matrix
+        by which all subsequently transformed doc-term matrices are multiplied
+        when weighting is 'tfidf'.
+        """
+        self._term_mask = None if is_filtered is True else self._get_term_mask()
+        if self._n_docs == 0:
+            self._idf_diag = None
         else:
-            if self.max_df != 1.0 or self.min_df != 1 or self.max_n_terms is not None:
-                doc_term_matrix, vocabulary = filter_terms_by_df(
-                    doc_term_matrix, vocabulary,
-                    max_df=self.max_df, min_df=self.min_df, max_n_terms=self.max_n_terms)
-            if self.min_ic != 0.0:
-                doc_term_matrix, vocabulary = filter_terms_by_ic(
-                    doc_term_matrix, vocabulary,
-                    min_ic=self.min_ic, max_n_terms=self.max_n_terms)
-            return doc_term_matrix, vocabulary
+            idfs = _get_inverse_doc_freqs(
+                self._doc_freqs, self._n_docs, smooth_idf=self.smooth_idf)
+            self._idf_diag = sp.diags(idfs, 0)
+        self._is_stale = False
+
+    def _get_term_mask(self):
+        """
+        Get a boolean mask of terms to keep after filtering all terms by their
+        stored doc freqs or info content, as in :meth:`Vectorizer._filter_terms()`,
+        or None if all terms are kept.
+        """
+        if self._fixed_terms:
+            return None
+        mask = np.ones(len(self._doc_freqs), dtype=bool)
+        if self.max_df != 1.0 or self.min_df != 1 or self.max_n_terms is not None:
+            mask = _get_df_filter_mask(
+                self._doc_freqs, self._term_freqs, self._n_docs,
+                max_df=self.max_df, min_df=self.min_df, max_n_terms=self.max_n_terms)
+        if self.min_ic != 0.0:
+            kept_indices = np.where(mask)[0]
+            ics = _get_information_content(self._doc_freqs[kept_indices] / self._n_docs)
+            mask[kept_indices] = _get_ic_filter_mask(
+                ics, min_ic=self.min_ic, max_n_terms=self.max_n_terms)
+        return None if mask.all() else mask
+
+    def _mask_terms(self, doc_term_matrix):
+        """
+        Zero out (and remove) values in ``doc_term_matrix`` for terms that are
+        filtered out when the vectorizer has been partially fit, keeping
+        the matrix's shape as-is.
+        """
+        if self._is_stale is True:
+            self._update_fit_stats()
+        if self._term_mask is not None:
+            doc_term_matrix.data[~self._term_mask[doc_term_matrix.indices]] = 0
+            doc_term_matrix.eliminate_zeros()
+        return doc_term_matrix
 
     def _reweight_values(self, doc_term_matrix):
         """
@@ -414,23 +1005,51 @@ class Vectorizer(object):
 
         Returns:
             :class:`scipy.sparse.csr_matrix`: Re-weighted doc-term matrix.
+
+        Note:
+            Values are re-weighted in-place, converting them into floats first
+            if needed, so ``doc_term_matrix`` may itself be modified.
         """
+        # convert integer counts into floats once, up front, then re-weight in-place
+        if self.dtype is not None:
+            dtype = self.dtype
+        elif self.normalize is True or (self.weighting != 'binary' and
+                                        (self.sublinear_tf is True or
+                                         self.weighting == 'tfidf')):
+            dtype = np.float64
+        else:
+            dtype = None
+        if dtype is not None and doc_term_matrix.dtype != dtype:
+            # indices and index pointer are shared rather than copied
+            doc_term_matrix = sp.csr_matrix(
+                (doc_term_matrix.data.astype(dtype),
+                 doc_term_matrix.indices, doc_term_matrix.indptr),
+                shape=doc_term_matrix.shape, copy=False)
+        data = doc_term_matrix.data
         if self.weighting == 'binary':
-            doc_term_matrix.data.fill(1)
+            # signs of hashed terms' values are kept
+            _ = np.sign(data, data)
         else:
             if self.sublinear_tf is True:
-                doc_term_matrix = doc_term_matrix.astype(np.float64)
-                _ = np.log(doc_term_matrix.data, doc_term_matrix.data)
-                doc_term_matrix.data += 1
+                if self.n_features is not None and self.alternate_sign is True:
+                    _apply_signed_sublinear_tf(data)
+                else:
+                    _ = np.log(data, data)
+                    data += 1
             if self.weighting == 'tfidf':
-                doc_term_matrix = apply_idf_weighting(
-                    doc_term_matrix,
-                    smooth_idf=self.smooth_idf)
+                if self._idf_diag is not None:
+                    # values along the main diagonal
+                    idfs = self._idf_diag.data[0]
+                else:
+                    # no idf values were stored by fitting, so use the batch's
+                    idfs = get_inverse_doc_freqs(
+                        doc_term_matrix, smooth_idf=self.smooth_idf)
+                _apply_idfs(data, doc_term_matrix.indices, idfs)
         if self.normalize is True:
             doc_term_matrix = normalize_mat(
                 doc_term_matrix,
                 norm='l2', axis=1, copy=False)
-        return doc_term_matrix
+        return _set_index_dtype(doc_term_matrix, self.index_dtype)
 
 
 class GroupVectorizer(Vectorizer):
@@ -442,7 +1061,10 @@ class GroupVectorizer(Vectorizer):
     terms are grouped by the documents in which they co-occur. It allows for
     customized grouping, such as by a shared author or publication year, that
     may span multiple documents, without forcing users to merge those documents
-    themselves.
+    themselves. A document may belong to several groups at once, in which case
+    its terms are counted towards each of them. Counts are accumulated per group
+    as documents are streamed in, so memory use scales with the number of groups
+    rather than documents.
 
     Stream a corpus with metadata from disk::
 
@@ -520,14 +1142,14 @@ class GroupVectorizer(Vectorizer):
             i.e. tf => 1 + log(tf).
         smooth_idf (bool): If True, add 1 to all document frequencies, equivalent
             to adding a single document to the corpus containing every unique term.
-        vocabulary_terms (Dict[str, int] or Iterable[str]): Mapping of unique term
-            string to unique term id, or an iterable of term strings that gets
-            converted into a suitable mapping. Note that, if specified, vectorized
-            outputs will include *only* these terms as columns.
-        vocabulary_grps (Dict[str, int] or Iterable[str]): Mapping of unique group
-            string to unique group id, or an iterable of group strings that gets
-            converted into a suitable mapping. Note that, if specified, vectorized
-            outputs will include *only* these groups as rows.
+        vocabulary_terms (:class:`Vocabulary` or Dict[str, int] or Iterable[str]):
+            Mapping of unique term string to unique term id, or an iterable of
+            term strings that gets converted into a suitable mapping. Note that,
+            if specified, vectorized outputs will include *only* these terms as columns.
+        vocabulary_grps (:class:`Vocabulary` or Dict[str, int] or Iterable[str]):
+            Mapping of unique group string to unique group id, or an iterable of
+            group strings that gets converted into a suitable mapping. Note that,
+            if specified, vectorized outputs will include *only* these groups as rows.
         min_df (float or int): If float, value is the fractional proportion of
             the total number of documents (groups), which must be in [0.0, 1.0].
             If int, value is the absolute number. Filter terms whose document (group)
@@ -540,13 +1162,33 @@ class GroupVectorizer(Vectorizer):
             ``min_ic``; value must be in [0.0, 1.0].
         max_n_terms (int): Only include terms whose document (group) frequency
             is within the top ``max_n_terms``.
+        n_features (int): If specified, terms aren't assigned ids from a
+            vocabulary, but are instead hashed into this many columns, such that
+            vectorization is stateless and outputs for separate batches of docs
+            can simply be stacked. Filtering terms by doc freq or info content
+            isn't supported in this mode.
+        alternate_sign (bool): If True and ``n_features`` is specified, the sign
+            of each term's values is determined by its hash, so that collisions
+            of terms in a column tend to cancel out rather than accumulate.
+        max_reverse_terms (int): If ``n_features`` is specified, max number of
+            terms, as first seen, for which to keep a mapping of column id
+            to term, available via ``id_to_term``.
+        dtype (:class:`numpy.dtype`): If specified, values of vectorized outputs
+            have this floating-point dtype, e.g. ``np.float32`` to halve their
+            memory use; otherwise, they're 64-bit floats if re-weighted and
+            integer counts if not.
+        index_dtype (:class:`numpy.dtype`): If None, sparse matrices' indices
+            and index pointers are 32-bit ints, unless they have too many values,
+            in which case they're 64-bit ints. Otherwise, force this dtype, which
+            must be ``np.int32`` or ``np.int64``. Note that subsequent operations
+            on outputs may downcast 64-bit indices, as scipy sees fit.
 
     Attributes:
-        vocabulary_terms (Dict[str, int]): Mapping of unique term string to unique
-            term id, either provided on instantiation or generated by calling
+        vocabulary_terms (:class:`Vocabulary`): Mapping of unique term string to
+            unique term id, either provided on instantiation or generated by calling
             :meth:`GroupVectorizer.fit()` on a collection of tokenized documents.
-        vocabulary_grps (Dict[str, int]): Mapping of unique group string to unique
-            group id, either provided on instantiation or generated by calling
+        vocabulary_grps (:class:`Vocabulary`): Mapping of unique group string to
+            unique group id, either provided on instantiation or generated by calling
             :meth:`GroupVectorizer.fit()` on a collection of tokenized documents.
         id_to_term (Dict[int, str]): Mapping of unique term id to unique term
             string, i.e. the inverse of :attr:`GroupVectorizer.vocabulary_terms`.
@@ -566,15 +1208,20 @@ class GroupVectorizer(Vectorizer):
     def __init__(self,
                  weighting='tf', normalize=False, sublinear_tf=False, smooth_idf=True,
                  min_df=1, max_df=1.0, min_ic=0.0, max_n_terms=None,
-                 vocabulary_terms=None, vocabulary_grps=None):
+                 vocabulary_terms=None, vocabulary_grps=None,
+                 n_features=None, alternate_sign=True, max_reverse_terms=0,
+                 dtype=None, index_dtype=None):
         super(GroupVectorizer, self).__init__(
             weighting=weighting,
             normalize=normalize, sublinear_tf=sublinear_tf, smooth_idf=smooth_idf,
             min_df=min_df, max_df=max_df, min_ic=min_ic, max_n_terms=max_n_terms,
-            vocabulary_terms=vocabulary_terms)
+            vocabulary_terms=vocabulary_terms,
+            n_features=n_features, alternate_sign=alternate_sign,
+            max_reverse_terms=max_reverse_terms, dtype=dtype, index_dtype=index_dtype)
         # now do the same thing for grps as was done for terms
         self.vocabulary_grps, self._fixed_grps = self._validate_vocabulary(vocabulary_grps)
         self.id_to_grp_ = {}
+        self._id_to_grp_vocab = None
 
     @property
     def id_to_grp(self):
@@ -584,9 +1231,10 @@ class GroupVectorizer(Vectorizer):
             is only generated if needed, and it is automatically kept in sync
             with the corresponding vocabulary.
         """
-        if len(self.id_to_grp_) != self.vocabulary_grps:
-            self.id_to_grp_ = {
-                grp_id: grp_str for grp_str, grp_id in self.vocabulary_grps.items()}
+        if (self._id_to_grp_vocab is not self.vocabulary_grps or
+                len(self.id_to_grp_) != len(self.vocabulary_grps)):
+            self.id_to_grp_ = dict(enumerate(self.vocabulary_grps.terms))
+            self._id_to_grp_vocab = self.vocabulary_grps
         return self.id_to_grp_
 
     # @id_to_grp.setter
@@ -603,8 +1251,7 @@ class GroupVectorizer(Vectorizer):
         output group-term-matrix, ``grp_term_matrix[0, :]``.
         """
         self._check_vocabulary()
-        return [grp_str for grp_str, _
-                in sorted(self.vocabulary_grps.items(), key=operator.itemgetter(1))]
+        return list(self.vocabulary_grps.terms)
 
     def fit(self, tokenized_docs, grps):
         """
@@ -622,9 +1269,14 @@ class GroupVectorizer(Vectorizer):
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
 
-            grps (Iterable[str]): Sequence of group names by which the terms in
-                ``tokenized_docs`` are aggregated, where the first item in ``grps``
-                corresponds to the first item in ``tokenized_docs``, and so on.
+            grps (Iterable[str] or Iterable[List[str]]): Sequence of group
+                names by which the terms in ``tokenized_docs`` are aggregated,
+                where the first item in ``grps`` corresponds to the first item
+                in ``tokenized_docs``, and so on. A doc that belongs to multiple
+                groups may be given a list, set, or frozenset of their names,
+                in which case its terms are aggregated into each group; any
+                other value, including a tuple such as ``(year, state)``,
+                is the name of a single group.
 
         Returns:
             :class:`GroupVectorizer`: The instance that has just been fit.
@@ -632,6 +1284,20 @@ class GroupVectorizer(Vectorizer):
         _ = self.fit_transform(tokenized_docs, grps)
         return self
 
+    def partial_fit(self, tokenized_docs, grps):
+        """
+        Not supported: Doc frequencies of terms are counted over groups, and
+        whether a group's new docs add to a term's frequency depends on whether
+        any of its previous docs had the term, so all group-term counts would
+        have to be kept around to update them.
+
+        Raises:
+            ValueError
+        """
+        raise ValueError(
+            '`GroupVectorizer` can\'t be partially fit, since its term stats are '
+            'counted over groups rather than docs; use `fit()` instead')
+
     def fit_transform(self, tokenized_docs, grps):
         """
         Count terms and build up a vocabulary based on the terms found in the
@@ -651,9 +1317,14 @@ class GroupVectorizer(Vectorizer):
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
 
-            grps (Iterable[str]): Sequence of group names by which the terms in
-                ``tokenized_docs`` are aggregated, where the first item in ``grps``
-                corresponds to the first item in ``tokenized_docs``, and so on.
+            grps (Iterable[str] or Iterable[List[str]]): Sequence of group
+                names by which the terms in ``tokenized_docs`` are aggregated,
+                where the first item in ``grps`` corresponds to the first item
+                in ``tokenized_docs``, and so on. A doc that belongs to multiple
+                groups may be given a list, set, or frozenset of their names,
+                in which case its terms are aggregated into each group; any
+                other value, including a tuple such as ``(year, state)``,
+                is the name of a single group.
 
         Returns:
             :class:`scipy.sparse.csr_matrix`: The transformed group-term matrix.
@@ -662,7 +1333,9 @@ class GroupVectorizer(Vectorizer):
         # count terms and build up a vocabulary
         grp_term_matrix, self.vocabulary_terms, self.vocabulary_grps = self._count_terms(
             tokenized_docs, grps, self._fixed_terms, self._fixed_grps)
-        # filter terms by group freq or info content, as specified in init
+        # store stats and idf values of terms, for use in later transforms,
+        # then filter terms by group freq or info content, as specified in init
+        self._set_fit_stats(grp_term_matrix)
         grp_term_matrix, self.vocabulary_terms = self._filter_terms(
             grp_term_matrix, self.vocabulary_terms)
         # re-weight values in group-term matrix, as specified in init
@@ -687,9 +1360,14 @@ class GroupVectorizer(Vectorizer):
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
 
-            grps (Iterable[str]): Sequence of group names by which the terms in
-                ``tokenized_docs`` are aggregated, where the first item in ``grps``
-                corresponds to the first item in ``tokenized_docs``, and so on.
+            grps (Iterable[str] or Iterable[List[str]]): Sequence of group
+                names by which the terms in ``tokenized_docs`` are aggregated,
+                where the first item in ``grps`` corresponds to the first item
+                in ``tokenized_docs``, and so on. A doc that belongs to multiple
+                groups may be given a list, set, or frozenset of their names,
+                in which case its terms are aggregated into each group; any
+                other value, including a tuple such as ``(year, state)``,
+                is the name of a single group.
 
         Returns:
             :class:`scipy.sparse.csr_matrix`: The transformed group-term matrix.
@@ -725,9 +1403,14 @@ class GroupVectorizer(Vectorizer):
                     >>> (doc.to_terms_list(as_strings=True)
                     ...  for doc in docs)
 
-            grps (Iterable[str]): Sequence of group names by which the terms in
-                ``tokenized_docs`` are aggregated, where the first item in ``grps``
-                corresponds to the first item in ``tokenized_docs``, and so on.
+            grps (Iterable[str] or Iterable[List[str]]): Sequence of group
+                names by which the terms in ``tokenized_docs`` are aggregated,
+                where the first item in ``grps`` corresponds to the first item
+                in ``tokenized_docs``, and so on. A doc that belongs to multiple
+                groups may be given a list, set, or frozenset of their names,
+                in which case its terms are aggregated into each group; any
+                other value, including a tuple such as ``(year, state)``,
+                is the name of a single group.
             fixed_vocab_terms (bool): If False, a new vocabulary is built from terms
                 in ``tokenized_docs``; if True, only terms already found in the
                 :attr:`GroupVectorizer.vocabulary_terms` are counted.
@@ -736,7 +1419,7 @@ class GroupVectorizer(Vectorizer):
                 :attr:`GroupVectorizer.vocabulary_grps` are counted.
 
         Returns:
-            :class:`scipy.sparse.csr_matrix`, Dict[str, int], Dict[str, int]
+            :class:`scipy.sparse.csr_matrix`, :class:`Vocabulary`, :class:`Vocabulary`
         """
         if fixed_vocab_terms is False:
             # add a new value when a new term is seen
@@ -752,15 +1435,20 @@ class GroupVectorizer(Vectorizer):
         else:
             vocabulary_grps = self.vocabulary_grps
 
-        data = array(str('i'))
-        cols = array(str('i'))
-        rows = array(str('i'))
+        # term counts are merged into per-group counters as docs are streamed in,
+        # so memory scales with the number of groups rather than docs
+        grp_term_counters = []
+        total_count = 0
         for grp, terms in compat.zip_(grps, tokenized_docs):
 
-            try:
-                grp_idx = vocabulary_grps[grp]
-            except KeyError:
-                # ignore out-of-vocabulary groups when fixed_grps=True
+            grp_idxs = []
+            for grp_ in _iter_doc_grps(grp):
+                try:
+                    grp_idxs.append(vocabulary_grps[grp_])
+                except KeyError:
+                    # ignore out-of-vocabulary groups when fixed_grps=True
+                    continue
+            if not grp_idxs:
                 continue
 
             term_counter = collections.defaultdict(int)
@@ -772,29 +1460,985 @@ class GroupVectorizer(Vectorizer):
                     # ignore out-of-vocabulary terms when fixed_terms=True
                     continue
 
-            data.extend(term_counter.values())
-            cols.extend(term_counter.keys())
-            rows.extend(grp_idx for _ in range(len(term_counter)))
+            for grp_idx in grp_idxs:
+                while grp_idx >= len(grp_term_counters):
+                    grp_term_counters.append(collections.defaultdict(int))
+                grp_term_counter = grp_term_counters[grp_idx]
+                for term_idx, count in term_counter.items():
+                    grp_term_counter[term_idx] += count
+            total_count += sum(term_counter.values()) * len(grp_idxs)
 
         # do we still want defaultdict behaviour?
         if fixed_vocab_terms is False:
-            vocabulary_terms = dict(vocabulary_terms)
+            vocabulary_terms = Vocabulary(vocabulary_terms)
         if fixed_vocab_grps is False:
-            vocabulary_grps = dict(vocabulary_grps)
-
-        data = np.frombuffer(data, dtype=np.intc)
-        rows = np.frombuffer(rows, dtype=np.intc)
-        cols = np.frombuffer(cols, dtype=np.intc)
+            vocabulary_grps = Vocabulary(vocabulary_grps)
+
+        # counts are summed over all docs in a group, so they may overflow 32 bits
+        count_dtype = _get_count_dtype(total_count, self.index_dtype)
+        grp_term_counters.extend(
+            {} for _ in range(len(vocabulary_grps) - len(grp_term_counters)))
+        row_lengths = np.array(
+            [len(grp_term_counter) for grp_term_counter in grp_term_counters],
+            dtype=np.int64)
+        indptr = _get_indptr(row_lengths, self.index_dtype)
+        data = np.empty(indptr[-1], dtype=count_dtype)
+        cols = np.empty(indptr[-1], dtype=indptr.dtype)
+        for grp_idx, grp_term_counter in enumerate(grp_term_counters):
+            start = indptr[grp_idx]
+            end = indptr[grp_idx + 1]
+            data[start:end] = np.fromiter(
+                grp_term_counter.values(), dtype=count_dtype, count=end - start)
+            cols[start:end] = np.fromiter(
+                grp_term_counter.keys(), dtype=cols.dtype, count=end - start)
+            # release each group's counts as soon as they've been copied
+            grp_term_counters[grp_idx] = None
+        if self.n_features is not None and self.alternate_sign is True:
+            # oppositely-signed terms hashed into the same column are summed below
+            cols, data = _unsign_term_ids(cols, data)
 
         grp_term_matrix = sp.csr_matrix(
-            (data, (rows, cols)),
+            (data, cols, indptr),
             shape=(len(vocabulary_grps), len(vocabulary_terms)),
-            dtype=np.int32)
-        grp_term_matrix.sort_indices()
+            dtype=count_dtype)
+        if self.n_features is not None and self.alternate_sign is True:
+            grp_term_matrix.sum_duplicates()
+            grp_term_matrix.eliminate_zeros()
+        else:
+            grp_term_matrix.sort_indices()
 
+        grp_term_matrix = _set_index_dtype(grp_term_matrix, self.index_dtype)
         return grp_term_matrix, vocabulary_terms, vocabulary_grps
 
 
+class DocTermMatrix(object):
+    """
+    Doc-term matrix that's kept up-to-date as docs are added and removed,
+    rather than re-built from scratch, e.g. for a growing or changing
+    :class:`textacy.Corpus <textacy.corpus.Corpus>`.
+
+    Term counts of added docs are appended as new rows, with terms counted and
+    values weighted by a :class:`Vectorizer` that's partially fit on them, whose
+    vocabulary either grows with new terms or is fixed on instantiation. Removed
+    docs' rows are marked as removed ("tombstoned") and dropped from the stats
+    by which values are weighted, and are only physically deleted once they
+    make up too large a fraction of all rows, or on :meth:`DocTermMatrix.compact()`.
+
+    Attach one to a corpus, and it's automatically updated along with it::
+
+        >>> dtm = corpus.attach_doc_term_matrix(
+        ...     vectorizer=Vectorizer(weighting='tfidf', normalize=True, min_df=2),
+        ...     ngrams=1, named_entities=True)
+        >>> dtm.matrix
+        <1000x7531 sparse matrix of type '<class 'numpy.float64'>'
+        	    with 139071 stored elements in Compressed Sparse Row format>
+        >>> corpus.add_text('The House will be in order.')
+        >>> del corpus[:10]
+        >>> dtm.matrix
+        <991x7536 sparse matrix of type '<class 'numpy.float64'>'
+        	    with 137693 stored elements in Compressed Sparse Row format>
+
+    Or, add tokenized docs to one directly::
+
+        >>> dtm = DocTermMatrix()
+        >>> dtm.add([['lamb', 'snow'], ['lamb', 'school']])
+        >>> dtm.remove([0])
+
+    Args:
+        vectorizer (:class:`Vectorizer`): Vectorizer by which terms are counted
+            and values weighted, which is partially fit on added docs. If None,
+            a new one with default parameters is used.
+        tokenizer (callable): If specified, function that takes a doc and returns
+            its sequence of terms, e.g. ``lambda doc: doc.to_terms_list(as_strings=True)``,
+            applied to docs passed to :meth:`DocTermMatrix.add()`; otherwise,
+            docs must already be tokenized.
+        max_removed_frac (float): Max fraction of rows that may be marked as
+            removed before they're deleted automatically; must be in [0.0, 1.0].
+
+    Attributes:
+        vectorizer (:class:`Vectorizer`)
+        n_docs (int): Number of (non-removed) docs, i.e. rows in :attr:`matrix`.
+    """
+
+    def __init__(self, vectorizer=None, tokenizer=None, max_removed_frac=0.25):
+        if max_removed_frac < 0.0 or max_removed_frac > 1.0:
+            raise ValueError('`max_removed_frac` must be a float in the interval [0.0, 1.0]')
+        if isinstance(vectorizer, GroupVectorizer):
+            raise ValueError('`vectorizer` must not be a GroupVectorizer')
+        self.vectorizer = vectorizer if vectorizer is not None else Vectorizer()
+        self.tokenizer = tokenizer
+        self.max_removed_frac = max_removed_frac
+        # term counts of all rows, incl. removed ones, plus those of rows added
+        # since, as CSR components to be merged into them on demand, so that
+        # adding rows takes time proportional to their size, not the matrix's
+        self._counts = None
+        self._new_data = []
+        self._new_indices = []
+        self._new_row_lengths = []
+        # which of the merged rows are marked as removed; added rows aren't
+        self._is_removed = np.zeros(0, dtype=bool)
+        self._n_rows = 0
+        self._n_removed = 0
+        self._matrix = None
+
+    def __repr__(self):
+        return 'DocTermMatrix({} docs; {} terms)'.format(
+            self.n_docs, len(self.vectorizer.vocabulary_terms or ()))
+
+    def __len__(self):
+        return self.n_docs
+
+    @property
+    def n_docs(self):
+        return self._n_rows - self._n_removed
+
+    @property
+    def matrix(self):
+        """
+        :class:`scipy.sparse.csr_matrix`: Doc-term matrix of shape
+        (# docs, # unique terms), whose rows correspond to (non-removed) docs
+        in the order they were added, with values weighted as in
+        :meth:`Vectorizer.transform()`. It's cached until docs are added or removed.
+        """
+        if self._matrix is None:
+            counts = self._get_counts()
+            if self._n_removed > 0:
+                counts = counts[np.flatnonzero(~self._is_removed)]
+            else:
+                counts = counts.copy()
+            if self.vectorizer._doc_freqs is None:
+                self._matrix = counts
+            else:
+                # values are masked and re-weighted in-place
+                self._matrix = self.vectorizer._reweight_values(
+                    self.vectorizer._mask_terms(counts))
+        return self._matrix
+
+    def add(self, docs):
+        """
+        Add ``docs`` as new rows, after any existing ones, partially fitting
+        the vectorizer on their terms.
+
+        Args:
+            docs (Iterable): Sequence of docs, which are tokenized by
+                :attr:`DocTermMatrix.tokenizer`, if specified; otherwise,
+                sequence of tokenized docs, as in :meth:`Vectorizer.partial_fit()`.
+        """
+        if self.tokenizer is not None:
+            docs = (self.tokenizer(doc) for doc in docs)
+        counts = self.vectorizer._partial_fit(docs)
+        self._new_data.append(counts.data)
+        self._new_indices.append(counts.indices)
+        self._new_row_lengths.append(np.diff(counts.indptr))
+        self._n_rows += counts.shape[0]
+        self._matrix = None
+
+    def remove(self, indexes):
+        """
+        Remove the rows at ``indexes`` among current (non-removed) rows, by
+        marking them as removed and subtracting their terms from the vectorizer's
+        stats; if too many rows are marked, delete them via :meth:`DocTermMatrix.compact()`.
+
+        Args:
+            indexes (Iterable[int]): Positions of rows to remove, as in
+                :attr:`DocTermMatrix.matrix`, *before* any are removed.
+        """
+        indexes = np.unique(np.asarray(list(indexes), dtype=np.int64))
+        if len(indexes) == 0:
+            return
+        if indexes[0] < 0 or indexes[-1] >= self.n_docs:
+            raise IndexError('row index out of range')
+        counts = self._get_counts()
+        if self._n_removed > 0:
+            row_idxs = np.flatnonzero(~self._is_removed)[indexes]
+        else:
+            row_idxs = indexes
+        self.vectorizer._add_fit_stats(counts[row_idxs], remove=True)
+        self._is_removed[row_idxs] = True
+        self._n_removed += len(row_idxs)
+        self._matrix = None
+        if self._n_removed > self.max_removed_frac * self._n_rows:
+            self.compact()
+
+    def compact(self):
+        """Delete rows marked as removed, compacting the stored term counts."""
+        if self._n_removed == 0:
+            return
+        counts = self._get_counts()
+        self._counts = _set_index_dtype(
+            counts[np.flatnonzero(~self._is_removed)], self.vectorizer.index_dtype)
+        self._is_removed = np.zeros(self._counts.shape[0], dtype=bool)
+        self._n_rows = self._counts.shape[0]
+        self._n_removed = 0
+
+    def _get_counts(self):
+        """
+        Get term counts of all rows, including removed ones, as a CSR matrix
+        with one column per term in the vectorizer's current vocabulary,
+        merging in those of rows added since the last call.
+
+        Returns:
+            :class:`scipy.sparse.csr_matrix`
+        """
+        n_terms = len(self.vectorizer.vocabulary_terms or ())
+        if self._new_data:
+            data = self._new_data
+            indices = self._new_indices
+            row_lengths = self._new_row_lengths
+            if self._counts is not None:
+                data = [self._counts.data] + data
+                indices = [self._counts.indices] + indices
+                row_lengths = [np.diff(self._counts.indptr)] + row_lengths
+            data = np.concatenate(data)
+            indices = np.concatenate(indices)
+            row_lengths = np.concatenate(row_lengths)
+            indptr = _get_indptr(row_lengths, self.vectorizer.index_dtype)
+            self._counts = sp.csr_matrix(
+                (data, indices.astype(indptr.dtype, copy=False), indptr),
+                shape=(len(row_lengths), n_terms))
+            self._is_removed = np.concatenate(
+                (self._is_removed,
+                 np.zeros(len(row_lengths) - len(self._is_removed), dtype=bool)))
+            self._new_data = []
+            self._new_indices = []
+            self._new_row_lengths = []
+        elif self._counts is None:
+            self._counts = sp.csr_matrix(
+                (0, n_terms), dtype=_get_count_dtype(0, self.vectorizer.index_dtype))
+        elif self._counts.shape[1] < n_terms:
+            # vocabulary is only ever appended to, so new columns are empty
+            self._counts.resize((self._counts.shape[0], n_terms))
+        return self._counts
+
+
+class Vocabulary(collections.Mapping):
+    """
+    Mapping of unique term string to unique, compact term id, backed by a list
+    of terms in id order for id-to-term lookups and a dict for term-to-id lookups.
+
+    Build a vocabulary, then freeze it so that no more terms may be added::
+
+        >>> vocab = Vocabulary(['lamb', 'snow', 'school'])
+        >>> vocab['snow'], vocab.get_term(2)
+        (1, 'school')
+        >>> vocab.add('rule')
+        3
+        >>> vocab = vocab.freeze()
+
+    Save it to disk in a compact binary format, then load it back, memory-mapped,
+    such that loading is (nearly) instantaneous, even for millions of terms::
+
+        >>> vocab.save('vocab.bin')
+        >>> vocab = Vocabulary.load('vocab.bin', mmap=True)
+        >>> vocab
+        Vocabulary(4 terms)
+
+    Args:
+        terms (Dict[str, int] or Iterable[str]): Mapping of unique term string
+            to unique term id, where ids are compact, i.e. without any gaps
+            between 0 and the number of terms; or a sequence of unique term
+            strings, whose ids are assigned in order.
+
+    Raises:
+        ValueError: if ``terms`` are not unique, or if term ids in a mapping
+            are not unique and compact
+    """
+
+    def __init__(self, terms=None):
+        if terms is None:
+            terms = []
+        elif isinstance(terms, collections.Mapping):
+            terms = _get_terms_by_id(terms)
+        else:
+            terms = list(terms)
+        self._terms = terms
+        self._term_to_id = _TermToId(terms)
+        if len(self._term_to_id) != len(terms):
+            raise ValueError('Terms in `vocabulary` must be unique.')
+        self._is_frozen = False
+        # for a memory-mapped vocabulary, loaded from disk
+        self._mmap = None
+        self._offsets = None
+        self._sorted_ids = None
+
+    def __repr__(self):
+        return 'Vocabulary({} terms)'.format(len(self))
+
+    def __len__(self):
+        if self._terms is None:
+            return len(self._sorted_ids)
+        return len(self._terms)
+
+    def __iter__(self):
+        return iter(self.terms)
+
+    def __getitem__(self, term):
+        # terms would be added if looked up via [], see _TermToId
+        term_id = self._term_to_id.get(term)
+        if term_id is not None:
+            return term_id
+        if self._mmap is None:
+            raise KeyError(term)
+        term_id = self._find_term_id(term)
+        self._term_to_id[term] = term_id
+        return term_id
+
+    def __reduce__(self):
+        return (self.__class__, (self.terms,), {'_is_frozen': self._is_frozen})
+
+    def items(self):
+        return _VocabularyItemsView(self)
+
+    def values(self):
+        return range(len(self))
+
+    @property
+    def terms(self):
+        """List[str]: Unique term strings, in order of their ids."""
+        if self._terms is None:
+            self._terms = self._get_blob(0, len(self._sorted_ids)).split('\x00')[:-1]
+        return self._terms
+
+    @property
+    def is_frozen(self):
+        """bool: If True, terms may not be added to this vocabulary."""
+        return self._is_frozen
+
+    def freeze(self):
+        """
+        Freeze this vocabulary, such that no more terms may be added to it.
+
+        Returns:
+            :class:`Vocabulary`: The instance that has just been frozen.
+        """
+        self._is_frozen = True
+        return self
+
+    def add(self, term):
+        """
+        Add ``term`` to this vocabulary, if it's not already in it.
+
+        Args:
+            term (str)
+
+        Returns:
+            int: Unique id of ``term``.
+
+        Raises:
+            ValueError: if this vocabulary is frozen
+        """
+        try:
+            return self[term]
+        except KeyError:
+            if self._is_frozen is True:
+                raise ValueError(
+                    'vocabulary is frozen; "{}" may not be added'.format(term))
+        term_id = len(self._terms)
+        self._terms.append(term)
+        self._term_to_id[term] = term_id
+        return term_id
+
+    def _get_term_adder(self):
+        """
+        Get the mapping of term to id backing this vocabulary, which adds terms
+        missing from it as they're looked up, with the next available ids,
+        rather than raising a KeyError, e.g. to count terms while extending
+        the vocabulary in-place, at the speed of plain dict lookups.
+
+        Returns:
+            :class:`_TermToId`
+
+        Raises:
+            ValueError: if this vocabulary is frozen
+        """
+        if self._is_frozen is True:
+            raise ValueError('vocabulary is frozen; terms may not be added')
+        return self._term_to_id
+
+    def get_term(self, term_id):
+        """
+        Get the term string whose unique id is ``term_id``.
+
+        Args:
+            term_id (int)
+
+        Returns:
+            str
+
+        Raises:
+            IndexError: if ``term_id`` isn't in this vocabulary
+        """
+        if self._terms is not None:
+            return self._terms[term_id]
+        if not 0 <= term_id < len(self._sorted_ids):
+            raise IndexError('term id {} is out of range'.format(term_id))
+        return self._get_blob(term_id, term_id + 1)[:-1]
+
+    def save(self, filepath):
+        """
+        Save this vocabulary to disk, as a single binary file comprised of a
+        fixed-size header; int64 offsets of terms in a blob of null-terminated,
+        utf-8-encoded term strings, in order of their ids; int64 term ids, in
+        order of their encoded term strings; and the blob itself.
+
+        Args:
+            filepath (str): Full path to file on disk where vocabulary is saved.
+
+        Raises:
+            ValueError: if any term contains a null character
+
+        See Also:
+            :meth:`Vocabulary.load()`
+        """
+        encoded_terms = []
+        for term in self.terms:
+            if '\x00' in term:
+                raise ValueError(
+                    'term "{}" may not contain a null character'.format(term))
+            encoded_terms.append(compat.unicode_to_bytes(term) + b'\x00')
+        n_terms = len(encoded_terms)
+        offsets = np.zeros(n_terms + 1, dtype='<i8')
+        np.cumsum([len(term) for term in encoded_terms], out=offsets[1:])
+        sorted_ids = np.array(
+            sorted(range(n_terms), key=encoded_terms.__getitem__), dtype='<i8')
+        with open(filepath, mode='wb') as f:
+            f.write(_VOCAB_HEADER.pack(_VOCAB_MAGIC, n_terms, offsets[-1]))
+            f.write(offsets.tobytes())
+            f.write(sorted_ids.tobytes())
+            f.write(b''.join(encoded_terms))
+
+    @classmethod
+    def load(cls, filepath, mmap=True):
+        """
+        Load a vocabulary saved to disk via :meth:`Vocabulary.save()`. The result
+        is always frozen.
+
+        Args:
+            filepath (str): Full path to file on disk where vocabulary is saved.
+            mmap (bool): If True, memory-map the file rather than read it, such
+                that loading takes constant time; terms are looked up by binary
+                search through the sorted terms, and cached thereafter.
+                Otherwise, all terms are read in and hashed up front.
+
+        Returns:
+            :class:`Vocabulary`
+
+        Raises:
+            ValueError: if ``filepath`` isn't a saved vocabulary
+
+        See Also:
+            :meth:`Vocabulary.save()`
+        """
+        with open(filepath, mode='rb') as f:
+            if mmap is True:
+                data = mmap_.mmap(f.fileno(), 0, access=mmap_.ACCESS_READ)
+            else:
+                data = f.read()
+        if len(data) < _VOCAB_HEADER.size or data[:len(_VOCAB_MAGIC)] != _VOCAB_MAGIC:
+            raise ValueError('"{}" is not a saved vocabulary'.format(filepath))
+        _, n_terms, _ = _VOCAB_HEADER.unpack(data[:_VOCAB_HEADER.size])
+        offset = _VOCAB_HEADER.size
+        offsets = np.frombuffer(data, dtype='<i8', count=n_terms + 1, offset=offset)
+        offset += offsets.nbytes
+        sorted_ids = np.frombuffer(data, dtype='<i8', count=n_terms, offset=offset)
+        vocab = cls()
+        vocab._terms = None
+        vocab._mmap = data
+        vocab._offsets = offsets
+        vocab._sorted_ids = sorted_ids
+        if mmap is False:
+            vocab = cls(vocab.terms)
+        return vocab.freeze()
+
+    def _get_blob(self, start_id, end_id):
+        """
+        Get the null-terminated term strings with ids in [``start_id``, ``end_id``)
+        from a memory-mapped vocabulary, decoded.
+        """
+        base = _VOCAB_HEADER.size + self._offsets.nbytes + self._sorted_ids.nbytes
+        return compat.bytes_to_unicode(
+            self._mmap[base + self._offsets[start_id]:base + self._offsets[end_id]])
+
+    def _find_term_id(self, term):
+        """
+        Find the id of ``term`` in a memory-mapped vocabulary by binary search
+        through its sorted, encoded term strings.
+        """
+        if not isinstance(term, compat.unicode_):
+            raise KeyError(term)
+        key = compat.unicode_to_bytes(term) + b'\x00'
+        data = self._mmap
+        offsets = self._offsets
+        sorted_ids = self._sorted_ids
+        base = _VOCAB_HEADER.size + offsets.nbytes + sorted_ids.nbytes
+        lo = 0
+        hi = len(sorted_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            term_id = sorted_ids[mid]
+            if data[base + offsets[term_id]:base + offsets[term_id + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(sorted_ids):
+            term_id = sorted_ids[lo]
+            if data[base + offsets[term_id]:base + offsets[term_id + 1]] == key:
+                return int(term_id)
+        raise KeyError(term)
+
+
+def _get_terms_by_id(term_to_id):
+    """
+    Get a list of the terms in mapping ``term_to_id``, in order of their ids.
+
+    Raises:
+        ValueError: if term ids aren't unique and compact, i.e. without any
+            gaps between 0 and the number of terms
+    """
+    n_terms = len(term_to_id)
+    terms = [None] * n_terms
+    is_assigned = [False] * n_terms
+    for term, term_id in term_to_id.items():
+        is_int = isinstance(term_id, compat.int_types + (np.integer, ))
+        if not is_int or not 0 <= term_id < n_terms:
+            raise ValueError(
+                'Term ids in `vocabulary` must be compact, i.e. not have any gaps, '
+                'but term "{}" has id {} in a vocabulary of {} terms'.format(
+                    term, term_id, n_terms))
+        if is_assigned[term_id] is True:
+            raise ValueError(
+                'Term ids in `vocabulary` must be unique, but id {} was assigned '
+                'to more than one term'.format(term_id))
+        terms[term_id] = term
+        is_assigned[term_id] = True
+    return terms
+
+
+class _TermToId(dict):
+    """
+    Mapping of term to id backing a :class:`Vocabulary`, which assigns the next
+    available id to any term that's missing when looked up via ``[]``, and
+    appends it to the vocabulary's list of ``terms``; look up terms via
+    ``get()`` to leave them out.
+    """
+    __slots__ = ('terms',)
+
+    def __init__(self, terms):
+        super(_TermToId, self).__init__(compat.zip_(terms, range(len(terms))))
+        self.terms = terms
+
+    def __missing__(self, term):
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self[term] = term_id
+        return term_id
+
+
+class _VocabularyItemsView(collections.ItemsView):
+    """Items view of a :class:`Vocabulary` that iterates in order of term ids."""
+
+    def __iter__(self):
+        return compat.zip_(self._mapping.terms, itertools.count())
+
+
+_VOCAB_MAGIC = b'TXVOCAB1'
+_VOCAB_HEADER = struct.Struct(str('<8sQQ'))
+
+
+def _iter_doc_grps(grp):
+    """
+    Iterate over the distinct groups to which a doc belongs, as given by ``grp``:
+    either a single group name, or a list or (frozen)set of them; tuples are
+    single group names, e.g. ``(year, state)``. Groups in a (frozen)set are sorted,
+    so that new group ids are assigned in a deterministic order.
+    """
+    if isinstance(grp, (set, frozenset)):
+        return sorted(grp)
+    elif isinstance(grp, list):
+        return itertoolz.unique(grp)
+    else:
+        return (grp,)
+
+
+def _count_terms_chunk(tokenized_docs, vocabulary):
+    """
+    Count terms in ``tokenized_docs`` by their ids in ``vocabulary``, which may
+    be a :class:`collections.defaultdict` that assigns ids to new terms as
+    they're seen; terms missing from any other mapping are ignored.
+
+    Returns:
+        :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`:
+        Data and indices of the corresponding CSR matrix, whose column indices
+        aren't yet sorted, and the number of values in each row, from which
+        its index pointer is computed by :func:`_get_indptr()`.
+    """
+    data = array(str('i'))
+    indices = array(str('i'))
+    row_lengths = array(str('i'))
+    for terms in tokenized_docs:
+        term_counter = collections.defaultdict(int)
+        for term in terms:
+            try:
+                term_idx = vocabulary[term]
+                term_counter[term_idx] += 1
+            except KeyError:
+                # ignore out-of-vocabulary terms when _fixed_terms=True
+                continue
+
+        data.extend(term_counter.values())
+        indices.extend(term_counter.keys())
+        row_lengths.append(len(term_counter))
+
+    return (np.frombuffer(data, dtype=np.intc),
+            np.frombuffer(indices, dtype=np.intc),
+            np.frombuffer(row_lengths, dtype=np.intc))
+
+
+def _is_term_id_array(terms):
+    """Check if ``terms`` is a tokenized doc given as an array of integer term ids."""
+    return isinstance(terms, np.ndarray) and terms.dtype.kind in 'iu'
+
+
+def _count_term_ids_chunk(tokenized_docs, term_keys, key_term_ids, n_terms=None):
+    """
+    Count terms in ``tokenized_docs`` given as arrays of integer term ids, all
+    at once, by looking up their vocabulary ids in the sorted array ``term_keys``
+    via binary search, rather than term by term.
+
+    Args:
+        tokenized_docs (Sequence[:class:`numpy.ndarray`])
+        term_keys (:class:`numpy.ndarray`): Sorted integer ids of known terms.
+        key_term_ids (:class:`numpy.ndarray`): Vocabulary ids of ``term_keys``.
+        n_terms (int): If specified, unknown terms are assigned vocabulary ids
+            starting from this value, in order of first appearance, as for terms
+            counted by :func:`_count_terms_chunk()`; otherwise, they're ignored.
+
+    Returns:
+        :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`,
+        :class:`numpy.ndarray`: Data and indices of the corresponding CSR matrix,
+        the number of values in each row, and the integer ids of new terms,
+        in order of their assigned vocabulary ids.
+    """
+    doc_lengths = np.array([len(terms) for terms in tokenized_docs], dtype=np.int64)
+    empty = np.empty(0, dtype=np.intc)
+    if doc_lengths.sum() == 0:
+        return (empty, empty, np.zeros(len(doc_lengths), dtype=np.intc),
+                np.empty(0, dtype=np.uint64))
+    keys = np.concatenate(tokenized_docs).astype(np.uint64, copy=False)
+    unique_keys, first_idxs, inverse = np.unique(
+        keys, return_index=True, return_inverse=True)
+    unique_term_ids = np.full(len(unique_keys), -1, dtype=np.int64)
+    if len(term_keys) > 0:
+        idxs = np.searchsorted(term_keys, unique_keys)
+        idxs[idxs == len(term_keys)] = 0
+        is_known = term_keys[idxs] == unique_keys
+        unique_term_ids[is_known] = key_term_ids[idxs[is_known]]
+    else:
+        is_known = np.zeros(len(unique_keys), dtype=bool)
+    new_keys = np.empty(0, dtype=np.uint64)
+    if n_terms is not None and not is_known.all():
+        new_idxs = np.flatnonzero(~is_known)
+        new_idxs = new_idxs[np.argsort(first_idxs[new_idxs], kind='mergesort')]
+        unique_term_ids[new_idxs] = np.arange(n_terms, n_terms + len(new_idxs))
+        new_keys = unique_keys[new_idxs]
+
+    # count (doc, term) pairs, encoded as single ints, sorted by doc then term
+    term_ids = unique_term_ids[inverse.ravel()]
+    doc_idxs = np.repeat(np.arange(len(doc_lengths), dtype=np.int64), doc_lengths)
+    is_counted = term_ids >= 0
+    if not is_counted.any():
+        return (empty, empty, np.zeros(len(doc_lengths), dtype=np.intc), new_keys)
+    n_cols = int(unique_term_ids.max()) + 1
+    pairs, counts = np.unique(
+        doc_idxs[is_counted] * n_cols + term_ids[is_counted], return_counts=True)
+    row_lengths = np.bincount(pairs // n_cols, minlength=len(doc_lengths))
+    return (counts.astype(np.intc), (pairs % n_cols).astype(np.intc),
+            row_lengths.astype(np.intc), new_keys)
+
+
+def _count_terms_in_parallel(tokenized_docs, vocabulary, fixed_vocab, n_jobs, chunk_size):
+    """
+    Count terms in chunks of ``tokenized_docs`` across ``n_jobs`` worker
+    processes, then stitch the chunks' CSR components (and row lengths)
+    back together, in order.
+
+    If ``fixed_vocab`` is False, each worker assigns ids to terms in a local
+    vocabulary, and terms are added to ``vocabulary`` chunk by chunk, in order
+    of their first appearance, so that term ids are the same as if all terms
+    had been counted in a single process. Likewise, if ``vocabulary`` is a
+    :class:`_TermHasher`, the terms whose column ids it keeps are merged from
+    workers' copies of it, chunk by chunk.
+
+    Returns:
+        :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`
+    """
+    # lazily tokenized docs (e.g. generators) can't be pickled
+    chunks = itertoolz.partition_all(
+        chunk_size, (list(terms) for terms in tokenized_docs))
+    data = []
+    indices = []
+    row_lengths = []
+    # a fixed vocabulary may be large, so it's sent to each worker only once, up front
+    results = utils.imap_in_pool(
+        _count_terms_in_worker, chunks, n_jobs,
+        initializer=_init_count_terms_worker,
+        initargs=(vocabulary if fixed_vocab is True else None,))
+    for chunk_data, chunk_indices, chunk_row_lengths, chunk_terms in results:
+        if isinstance(vocabulary, _TermHasher):
+            vocabulary.update_reverse_terms(chunk_terms)
+        elif chunk_terms is not None:
+            # map local term ids to global ones, adding new terms as needed
+            term_ids = np.array(
+                [vocabulary[term] for term in chunk_terms], dtype=np.intc)
+            chunk_indices = term_ids[chunk_indices]
+        data.append(chunk_data)
+        indices.append(chunk_indices)
+        row_lengths.append(chunk_row_lengths)
+
+    if not data:
+        return tuple(np.array([], dtype=np.intc) for _ in range(3))
+    return np.concatenate(data), np.concatenate(indices), np.concatenate(row_lengths)
+
+
+def _get_indptr(row_lengths, index_dtype=None):
+    """
+    Get the index pointer of a CSR matrix from the number of values in each row,
+    computed in 64-bit ints then downcast to 32-bit ints, if they fit.
+
+    Args:
+        row_lengths (:class:`numpy.ndarray`)
+        index_dtype (:class:`numpy.dtype`): If specified, force this dtype
+            rather than picking the smallest one that fits.
+
+    Returns:
+        :class:`numpy.ndarray`
+
+    Raises:
+        ValueError: if ``index_dtype`` is too small for the number of values
+    """
+    indptr = np.zeros(len(row_lengths) + 1, dtype=np.int64)
+    np.cumsum(row_lengths, out=indptr[1:])
+    if index_dtype is None:
+        if indptr[-1] <= np.iinfo(np.int32).max:
+            indptr = indptr.astype(np.int32)
+    elif index_dtype != np.int64:
+        if indptr[-1] > np.iinfo(index_dtype).max:
+            raise ValueError(
+                '{} values are too many for `index_dtype` {}'.format(
+                    indptr[-1], index_dtype))
+        indptr = indptr.astype(index_dtype)
+    return indptr
+
+
+def _pad_with_zeros(values, n, dtype):
+    """
+    Pad 1-d ``values`` with zeros to length ``n``, as a view of a buffer with
+    room to spare, so that repeatedly padding them by a few values at a time
+    takes amortized constant time, rather than time proportional to their length.
+
+    Args:
+        values (:class:`numpy.ndarray`): If None, treated as an empty array.
+        n (int)
+        dtype (:class:`numpy.dtype`): Dtype of the buffer, if a new one is needed.
+
+    Returns:
+        :class:`numpy.ndarray`
+    """
+    if values is None:
+        return np.zeros(n, dtype=dtype)
+    n_values = len(values)
+    if n <= n_values:
+        return values
+    buffer = values.base
+    if (isinstance(buffer, np.ndarray) and buffer.ndim == 1 and
+            buffer.dtype == values.dtype and len(buffer) >= n and
+            buffer.strides == values.strides and
+            buffer.__array_interface__['data'][0] == values.__array_interface__['data'][0]):
+        # values are a prefix of the buffer, which has room for n values
+        values = buffer[:n]
+        values[n_values:] = 0
+        return values
+    buffer = np.zeros(max(n, 2 * n_values), dtype=values.dtype)
+    buffer[:n_values] = values
+    return buffer[:n]
+
+
+def _get_count_dtype(max_count, index_dtype=None):
+    """
+    Get the dtype of term counts whose largest (absolute) value is ``max_count``:
+    32-bit ints, unless they don't fit or 64-bit indices are forced via
+    ``index_dtype``, in which case counts are widened to 64-bit ints along with them.
+
+    Returns:
+        :class:`numpy.dtype`
+    """
+    if index_dtype == np.int64 or max_count > np.iinfo(np.int32).max:
+        return np.dtype(np.int64)
+    return np.dtype(np.int32)
+
+
+def _set_index_dtype(matrix, index_dtype):
+    """
+    Set the dtype of a sparse ``matrix``'s indices and index pointer to
+    ``index_dtype``, in-place, if specified; scipy otherwise (re-)sets them to
+    the smallest dtype that fits.
+
+    Raises:
+        ValueError: if ``index_dtype`` is too small for ``matrix``
+    """
+    if index_dtype is None or matrix.indices.dtype == index_dtype:
+        return matrix
+    if max(matrix.nnz, max(matrix.shape)) > np.iinfo(index_dtype).max:
+        raise ValueError(
+            'sparse matrix is too large for `index_dtype` {}'.format(index_dtype))
+    matrix.indices = matrix.indices.astype(index_dtype)
+    matrix.indptr = matrix.indptr.astype(index_dtype)
+    return matrix
+
+
+_worker_vocabulary = None
+
+
+def _init_count_terms_worker(vocabulary):
+    """Set the fixed vocabulary, if any, by which terms are counted in a worker."""
+    global _worker_vocabulary
+    if isinstance(vocabulary, _TermHasher):
+        # only terms whose column ids are newly kept are sent back
+        vocabulary.reverse_terms.clear()
+    _worker_vocabulary = vocabulary
+
+
+def _count_terms_in_worker(tokenized_docs):
+    """
+    Count terms in a chunk of ``tokenized_docs`` in a worker process, by the
+    fixed vocabulary set by :func:`_init_count_terms_worker()` or else a new,
+    local one, whose terms are returned in order of their ids. If the fixed
+    vocabulary is a :class:`_TermHasher`, the (term, column id) pairs it kept
+    while counting the chunk are returned instead, in order first seen, since
+    they aren't otherwise visible outside of the worker.
+    """
+    if isinstance(_worker_vocabulary, _TermHasher):
+        counts = _count_terms_chunk(tokenized_docs, _worker_vocabulary)
+        reverse_terms = list(_worker_vocabulary.reverse_terms.items())
+        # make room for the next chunk's terms, which are merged in order
+        _worker_vocabulary.reverse_terms.clear()
+        return counts + (reverse_terms,)
+    if _worker_vocabulary is not None:
+        return _count_terms_chunk(tokenized_docs, _worker_vocabulary) + (None,)
+    vocabulary = collections.defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    data, indices, row_lengths = _count_terms_chunk(tokenized_docs, vocabulary)
+    terms = sorted(vocabulary, key=vocabulary.__getitem__)
+    return data, indices, row_lengths, terms
+
+
+class _TermHasher(object):
+    """
+    Stand-in for a vocabulary that maps any term to a column id in
+    [0, ``n_features``) by its signed 32-bit murmurhash. If ``alternate_sign``
+    is True, terms whose hash is negative are mapped to the bitwise inverse of
+    their column id, i.e. a negative integer, to be decoded by
+    :func:`_unsign_term_ids()`.
+
+    Args:
+        n_features (int)
+        alternate_sign (bool)
+        max_reverse_terms (int): Max number of terms, as first seen, for which
+            to keep their column ids in :attr:`reverse_terms`.
+    """
+
+    def __init__(self, n_features, alternate_sign=True, max_reverse_terms=0):
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.max_reverse_terms = max_reverse_terms
+        # kept in order first seen, so that they may be merged across processes
+        self.reverse_terms = collections.OrderedDict()
+
+    def __len__(self):
+        return self.n_features
+
+    def __getitem__(self, term):
+        hash_ = murmurhash3_32(term, seed=0)
+        term_id = abs(hash_) % self.n_features
+        if len(self.reverse_terms) < self.max_reverse_terms:
+            self.reverse_terms.setdefault(term, term_id)
+        if hash_ < 0 and self.alternate_sign is True:
+            return ~term_id
+        return term_id
+
+    def update_reverse_terms(self, terms):
+        """
+        Keep column ids of ``terms`` as if they'd just been seen by this hasher,
+        e.g. those seen by a copy of it in another process.
+
+        Args:
+            terms (Iterable[Tuple[str, int]]): Sequence of (term, column id)
+                pairs, in order first seen.
+        """
+        for term, term_id in terms:
+            if len(self.reverse_terms) >= self.max_reverse_terms:
+                break
+            self.reverse_terms.setdefault(term, term_id)
+
+
+def _unsign_term_ids(term_ids, counts):
+    """
+    Decode signed term ids, as produced by :class:`_TermHasher`, into column ids
+    and correspondingly signed counts.
+    """
+    term_ids = np.array(term_ids)
+    counts = np.array(counts)
+    is_negative = term_ids < 0
+    term_ids[is_negative] = ~term_ids[is_negative]
+    counts[is_negative] *= -1
+    return term_ids, counts
+
+
+def _sum_signed_term_counts(term_counter):
+    """
+    Decode the signed term ids keying ``term_counter``, as produced by
+    :class:`_TermHasher`, then sum their signed counts by column id,
+    dropping any that cancel out.
+    """
+    counts = collections.defaultdict(int)
+    for term_id, count in term_counter.items():
+        if term_id < 0:
+            counts[~term_id] -= count
+        else:
+            counts[term_id] += count
+    return {term_id: count for term_id, count in counts.items() if count != 0}
+
+
+def _apply_signed_sublinear_tf(data):
+    """
+    Apply sublinear scaling, i.e. ``sign(tf) * (1 + log(abs(tf)))``, to the
+    (float) values ``data`` of a doc-term matrix whose terms were hashed with
+    alternating signs, in-place and block-by-block to limit temporary memory.
+    """
+    for start in range(0, len(data), _REWEIGHT_BLOCK_SIZE):
+        block = data[start: start + _REWEIGHT_BLOCK_SIZE]
+        signs = np.sign(block)
+        _ = np.abs(block, block)
+        _ = np.log(block, block)
+        block += 1
+        block *= signs
+
+
+def _apply_idfs(data, indices, idfs):
+    """
+    Multiply the (float) values ``data`` of a doc-term matrix by the idf values
+    of their corresponding terms, as given by column ``indices``, in-place
+    and block-by-block to limit temporary memory.
+    """
+    idfs = idfs.astype(data.dtype, copy=False)
+    for start in range(0, len(data), _REWEIGHT_BLOCK_SIZE):
+        end = start + _REWEIGHT_BLOCK_SIZE
+        data[start: end] *= idfs[indices[start: end]]
+
+
+_REWEIGHT_BLOCK_SIZE = 2 ** 20
+
+
 def apply_idf_weighting(doc_term_matrix, smooth_idf=True):
     """
     Apply inverse document frequency (idf) weighting to a term-frequency (tf)
@@ -811,13 +2455,43 @@ def apply_idf_weighting(doc_term_matrix, smooth_idf=True):
         of shape (# docs, # unique terms), where value (i, j) is the tfidf
         weight of term j in doc i
     """
+    idfs = get_inverse_doc_freqs(doc_term_matrix, smooth_idf=smooth_idf)
+    return doc_term_matrix.dot(sp.diags(idfs, 0))
+
+
+def get_inverse_doc_freqs(doc_term_matrix, smooth_idf=True):
+    """
+    Compute inverse document frequencies (idf) for all terms in a
+    document-term matrix, optionally smoothing idf values.
+
+    Args:
+        doc_term_matrix (:class:`scipy.sparse.csr_matrix <scipy.sparse.csr_matrix`):
+            M X N matrix, where M is the # of docs and N is the # of unique terms
+        smooth_idf (bool): if True, add 1 to all document frequencies, equivalent
+            to adding a single document to the corpus containing every unique term
+
+    Returns:
+        :class:`numpy.ndarray`: array of inverse document frequencies, with
+        length equal to the # of unique terms, i.e. # of columns in
+        ``doc_term_matrix``
+
+    Raises:
+        ValueError: if ``doc_term_matrix`` doesn't have any non-zero entries
+    """
     dfs = get_doc_freqs(doc_term_matrix, normalized=False)
     n_docs, _ = doc_term_matrix.shape
+    return _get_inverse_doc_freqs(dfs, n_docs, smooth_idf=smooth_idf)
+
+
+def _get_inverse_doc_freqs(dfs, n_docs, smooth_idf=True):
+    """
+    Compute inverse document frequencies for all terms from their absolute
+    document frequencies ``dfs`` in a corpus of ``n_docs`` documents.
+    """
     if smooth_idf is True:
         n_docs += 1
-        dfs += 1
-    idfs = np.log(n_docs / dfs) + 1.0
-    return doc_term_matrix.dot(sp.diags(idfs, 0))
+        dfs = dfs + 1
+    return np.log(n_docs / dfs) + 1.0
 
 
 def get_term_freqs(doc_term_matrix, normalized=True):
@@ -908,6 +2582,14 @@ def get_information_content(doc_term_matrix):
         ValueError: if ``doc_term_matrix`` doesn't have any non-zero entries
     """
     dfs = get_doc_freqs(doc_term_matrix, normalized=True)
+    return _get_information_content(dfs)
+
+
+def _get_information_content(dfs):
+    """
+    Compute information content for all terms from their normalized
+    document frequencies ``dfs``.
+    """
     ics = -dfs * np.log2(dfs) - (1 - dfs) * np.log2(1 - dfs)
     ics[np.isnan(ics)] = 0.0  # NaN values not permitted!
     return ics
@@ -952,38 +2634,20 @@ def filter_terms_by_df(doc_term_matrix, term_to_id,
     if max_df < 0 or min_df < 0 or (max_n_terms is not None and max_n_terms < 0):
         raise ValueError('max_df, min_df, and max_n_terms may not be negative')
 
-    n_docs, n_terms = doc_term_matrix.shape
-    max_doc_count = max_df if isinstance(max_df, int) else int(max_df * n_docs)
-    min_doc_count = min_df if isinstance(min_df, int) else int(min_df * n_docs)
-    if max_doc_count < min_doc_count:
-        raise ValueError('max_df corresponds to fewer documents than min_df')
+    n_docs, _ = doc_term_matrix.shape
 
     # calculate a mask based on document frequencies
-    dfs = get_doc_freqs(doc_term_matrix, normalized=False)
-    mask = np.ones(n_terms, dtype=bool)
-    if max_doc_count < n_docs:
-        mask &= dfs <= max_doc_count
-    if min_doc_count > 1:
-        mask &= dfs >= min_doc_count
-    if max_n_terms is not None and mask.sum() > max_n_terms:
-        tfs = get_term_freqs(doc_term_matrix, normalized=False)
-        top_mask_inds = (tfs[mask]).argsort()[::-1][:max_n_terms]
-        new_mask = np.zeros(n_terms, dtype=bool)
-        new_mask[np.where(mask)[0][top_mask_inds]] = True
-        mask = new_mask
-
-    # map old term indices to new ones
-    new_indices = np.cumsum(mask) - 1
-    term_to_id = {term: new_indices[old_index]
-                  for term, old_index in term_to_id.items()
-                  if mask[old_index]}
-
-    kept_indices = np.where(mask)[0]
-    if len(kept_indices) == 0:
+    mask = _get_df_filter_mask(
+        get_doc_freqs(doc_term_matrix, normalized=False),
+        get_term_freqs(doc_term_matrix, normalized=False),
+        n_docs, max_df=max_df, min_df=min_df, max_n_terms=max_n_terms)
+
+    if not mask.any():
         msg = 'After filtering, no terms remain; try a lower `min_df` or higher `max_df`'
         raise ValueError(msg)
 
-    return (doc_term_matrix[:, kept_indices], term_to_id)
+    return (_filter_columns(doc_term_matrix, mask),
+            _filter_vocabulary(term_to_id, mask))
 
 
 def filter_terms_by_ic(doc_term_matrix, term_to_id,
@@ -1021,27 +2685,295 @@ def filter_terms_by_ic(doc_term_matrix, term_to_id,
     if max_n_terms is not None and max_n_terms < 0:
         raise ValueError('max_n_terms may not be negative')
 
-    _, n_terms = doc_term_matrix.shape
-
     # calculate a mask based on document frequencies
-    ics = get_information_content(doc_term_matrix)
-    mask = np.ones(n_terms, dtype=bool)
+    mask = _get_ic_filter_mask(
+        get_information_content(doc_term_matrix),
+        min_ic=min_ic, max_n_terms=max_n_terms)
+
+    if not mask.any():
+        raise ValueError('After filtering, no terms remain; try a lower `min_ic`')
+
+    return (_filter_columns(doc_term_matrix, mask),
+            _filter_vocabulary(term_to_id, mask))
+
+
+def _get_df_filter_mask(dfs, tfs, n_docs, max_df=1.0, min_df=1, max_n_terms=None):
+    """
+    Get a boolean mask of terms to keep after filtering out those that are too
+    common and/or too rare (by document frequency), as in :func:`filter_terms_by_df()`.
+
+    Args:
+        dfs (:class:`numpy.ndarray`): Absolute document frequency of each term.
+        tfs (:class:`numpy.ndarray`): Absolute term frequency of each term.
+        n_docs (int): Total number of documents.
+        max_df (float or int)
+        min_df (float or int)
+        max_n_terms (int)
+
+    Returns:
+        :class:`numpy.ndarray`
+
+    Raises:
+        ValueError: if ``max_df`` corresponds to fewer documents than ``min_df``
+    """
+    max_doc_count = max_df if isinstance(max_df, int) else int(max_df * n_docs)
+    min_doc_count = min_df if isinstance(min_df, int) else int(min_df * n_docs)
+    if max_doc_count < min_doc_count:
+        raise ValueError('max_df corresponds to fewer documents than min_df')
+
+    mask = np.ones(len(dfs), dtype=bool)
+    if max_doc_count < n_docs:
+        mask &= dfs <= max_doc_count
+    if min_doc_count > 1:
+        mask &= dfs >= min_doc_count
+    if max_n_terms is not None and mask.sum() > max_n_terms:
+        mask = _get_top_n_mask(tfs, mask, max_n_terms)
+    return mask
+
+
+def _get_ic_filter_mask(ics, min_ic=0.0, max_n_terms=None):
+    """
+    Get a boolean mask of terms to keep after filtering out those that are too
+    common and/or too rare (by information content ``ics``), as in
+    :func:`filter_terms_by_ic()`.
+
+    Returns:
+        :class:`numpy.ndarray`
+    """
+    mask = np.ones(len(ics), dtype=bool)
     if min_ic > 0.0:
         mask &= ics >= min_ic
     if max_n_terms is not None and mask.sum() > max_n_terms:
-        top_mask_inds = (ics[mask]).argsort()[::-1][:max_n_terms]
-        new_mask = np.zeros(n_terms, dtype=bool)
-        new_mask[np.where(mask)[0][top_mask_inds]] = True
-        mask = new_mask
-
-    # map old term indices to new ones
-    new_indices = np.cumsum(mask) - 1
-    term_to_id = {term: new_indices[old_index]
-                  for term, old_index in term_to_id.items()
-                  if mask[old_index]}
-
-    kept_indices = np.where(mask)[0]
-    if len(kept_indices) == 0:
-        raise ValueError('After filtering, no terms remain; try a lower `min_ic`')
+        mask = _get_top_n_mask(ics, mask, max_n_terms)
+    return mask
+
+
+def _get_top_n_mask(values, mask, n):
+    """
+    Get a boolean mask of the ``n`` items with the largest ``values``, out of
+    those already in ``mask``, selected in linear time rather than by sorting.
+    Ties at the cutoff value are broken in favor of items with larger indices.
+    """
+    top_mask = np.zeros(len(values), dtype=bool)
+    if n <= 0:
+        return top_mask
+    mask_idxs = np.flatnonzero(mask)
+    mask_values = values[mask_idxs]
+    kth = len(mask_values) - n
+    cutoff = np.partition(mask_values, kth)[kth]
+    is_top = mask_values > cutoff
+    n_ties = n - np.count_nonzero(is_top)
+    is_top[np.flatnonzero(mask_values == cutoff)[-n_ties:]] = True
+    top_mask[mask_idxs[is_top]] = True
+    return top_mask
+
+
+def _filter_columns(matrix, mask, copy=True):
+    """
+    Filter columns of a CSR ``matrix`` to those in a boolean ``mask``, remapping
+    kept columns' indices to be compact via a vectorized lookup rather than by
+    (fancy) indexing into ``matrix``. If ``copy`` is False, filtered values are
+    dropped from ``matrix`` in-place, along with any explicitly stored zeros.
+
+    Returns:
+        :class:`scipy.sparse.csr_matrix`
+    """
+    new_indices = np.cumsum(mask, dtype=matrix.indices.dtype) - 1
+    is_kept = mask[matrix.indices]
+    n_rows = matrix.shape[0]
+    n_cols = int(new_indices[-1]) + 1 if len(mask) else 0
+    if copy is True:
+        kept_counts = np.zeros(matrix.nnz + 1, dtype=matrix.indptr.dtype)
+        np.cumsum(is_kept, out=kept_counts[1:])
+        return sp.csr_matrix(
+            (matrix.data[is_kept],
+             new_indices[matrix.indices[is_kept]],
+             kept_counts[matrix.indptr]),
+            shape=(n_rows, n_cols))
+    else:
+        matrix.data[~is_kept] = 0
+        del is_kept
+        matrix.eliminate_zeros()
+        indices = matrix.indices
+        for start in range(0, len(indices), _REWEIGHT_BLOCK_SIZE):
+            end = start + _REWEIGHT_BLOCK_SIZE
+            indices[start: end] = new_indices[indices[start: end]]
+        matrix.resize((n_rows, n_cols))
+        return matrix
+
+
+def _filter_vocabulary(vocabulary, mask):
+    """
+    Filter terms in ``vocabulary`` to those whose ids are in a boolean ``mask``,
+    and re-assign them compact ids, in order.
+
+    Returns:
+        :class:`Vocabulary` or Dict[str, int]: Same kind of mapping as ``vocabulary``.
+    """
+    if isinstance(vocabulary, Vocabulary):
+        terms = vocabulary.terms
+    else:
+        terms = _get_terms_by_id(vocabulary)
+    kept_terms = [terms[term_id] for term_id in np.flatnonzero(mask).tolist()]
+    if isinstance(vocabulary, Vocabulary):
+        return Vocabulary(kept_terms)
+    return dict(compat.zip_(kept_terms, range(len(kept_terms))))
+
+
+def get_doc_knn_matrix(doc_term_matrix, top_n=10, min_sim=None, include_self=False,
+                       block_size=1000, n_jobs=1):
+    """
+    Get the ``top_n`` most similar documents to each document in a doc-term
+    matrix, as a sparse k-nearest-neighbors graph, without computing the full
+    matrix of all pairwise similarities at once.
+
+    Similarities are dot products between documents' rows, computed block-by-block
+    in square blocks of ``block_size`` docs, keeping only the top values in each
+    row of each block. If rows are L2-normalized, as when the doc-term matrix
+    is output by a :class:`Vectorizer` with ``normalize=True``, these are
+    cosine similarities::
+
+        >>> vectorizer = Vectorizer(weighting='tfidf', normalize=True, max_df=0.95)
+        >>> doc_term_matrix = vectorizer.fit_transform(tokenized_docs)
+        >>> knn_matrix = get_doc_knn_matrix(doc_term_matrix, top_n=5, min_sim=0.5)
+        >>> knn_matrix[0].indices  # ids of docs most similar to the first doc
+
+    Args:
+        doc_term_matrix (:class:`scipy.sparse.csr_matrix`): Sparse matrix of
+            shape (# docs, # unique terms), where value (i, j) is the weight
+            of term j in doc i.
+        top_n (int): Maximum number of similar docs to keep per doc.
+        min_sim (float): If specified, only keep similar docs whose similarity
+            is greater than or equal to this value.
+        include_self (bool): If True, a doc may be included among its own
+            most similar docs; otherwise, it's excluded.
+        block_size (int): Number of docs per block of similarities computed
+            at once; larger blocks are faster, but take more memory.
+        n_jobs (int): Number of worker processes across which blocks of rows
+            are processed. If -1, use all available CPUs.
+
+    Returns:
+        :class:`scipy.sparse.csr_matrix`: Sparse matrix of shape (# docs, # docs),
+        where value (i, j) is the similarity between docs i and j, if doc j
+        is among the ``top_n`` most similar docs to doc i; otherwise, it's 0.
+
+    Raises:
+        ValueError: if ``top_n`` or ``block_size`` is less than 1
+    """
+    if top_n < 1:
+        raise ValueError('`top_n` must be a positive integer')
+    if block_size < 1:
+        raise ValueError('`block_size` must be a positive integer')
+    doc_term_matrix = sp.csr_matrix(doc_term_matrix)
+    n_docs = doc_term_matrix.shape[0]
+    row_blocks = [(start, min(start + block_size, n_docs))
+                  for start in range(0, n_docs, block_size)]
+    knn_args = (doc_term_matrix, top_n, min_sim, include_self, block_size)
+
+    n_jobs = utils.get_n_jobs(n_jobs)
+    if n_jobs == 1 or len(row_blocks) < 2:
+        _init_doc_knn_worker(*knn_args)
+        try:
+            results = [_get_doc_knn_block(row_block) for row_block in row_blocks]
+        finally:
+            _init_doc_knn_worker(None, None, None, None, None)
+    else:
+        # the doc-term matrix is sent to each worker only once, up front
+        pool = multiprocessing.Pool(
+            processes=n_jobs, initializer=_init_doc_knn_worker, initargs=knn_args)
+        try:
+            results = list(pool.imap(_get_doc_knn_block, row_blocks))
+        finally:
+            pool.terminate()
+
+    if not results:
+        return sp.csr_matrix((n_docs, n_docs), dtype=np.float64)
+    data, indices, row_lengths = (np.concatenate(arrays) for arrays in zip(*results))
+    return sp.csr_matrix(
+        (data, indices, _get_indptr(row_lengths)), shape=(n_docs, n_docs))
+
+
+_worker_knn_args = None
+
+
+def _init_doc_knn_worker(doc_term_matrix, top_n, min_sim, include_self, block_size):
+    """
+    Set the doc-term matrix and its transposed column blocks, along with other
+    args, by which the most similar docs are found in a worker.
+    """
+    global _worker_knn_args
+    if doc_term_matrix is None:
+        _worker_knn_args = None
+        return
+    n_docs = doc_term_matrix.shape[0]
+    col_blocks = [(start, doc_term_matrix[start: start + block_size].T.tocsr())
+                  for start in range(0, n_docs, block_size)]
+    _worker_knn_args = (doc_term_matrix, col_blocks, top_n, min_sim, include_self)
 
-    return (doc_term_matrix[:, kept_indices], term_to_id)
+
+def _get_doc_knn_block(row_block):
+    """
+    Get the top most similar docs to each doc in a ``row_block`` of docs,
+    given as a (start, end) pair of doc ids, as CSR data, indices, and row lengths,
+    using the args set by :func:`_init_doc_knn_worker()`.
+    """
+    doc_term_matrix, col_blocks, top_n, min_sim, include_self = _worker_knn_args
+    start, end = row_block
+    n_rows = end - start
+    rows_matrix = doc_term_matrix[start: end]
+    # candidates for each row's most similar docs, as chunks of (row, col, sim)
+    # arrays, which are pruned to the top n per row in one pass, once there are
+    # enough of them that doing so costs little per block
+    candidates = []
+    n_candidates = 0
+    max_candidates = 2 * top_n * n_rows
+    # similarity of each row's n-th most similar doc so far, below which
+    # similarities in subsequent blocks can't make the cut
+    thresholds = np.full(n_rows, -np.inf)
+    for col_start, col_block in col_blocks:
+        block_sims = sp.coo_matrix(rows_matrix.dot(col_block))
+        block_cols = block_sims.col + col_start
+        is_kept = block_sims.data != 0
+        is_kept &= block_sims.data >= thresholds[block_sims.row]
+        if min_sim is not None:
+            is_kept &= block_sims.data >= min_sim
+        if include_self is False:
+            is_kept &= block_sims.row + start != block_cols
+        if not is_kept.any():
+            continue
+        candidates.append(
+            (block_sims.row[is_kept], block_cols[is_kept], block_sims.data[is_kept]))
+        n_candidates += candidates[-1][0].shape[0]
+        if n_candidates > max_candidates:
+            rows, cols, sims = _get_top_n_per_row(candidates, n_rows, top_n)
+            candidates = [(rows, cols, sims)]
+            n_candidates = rows.shape[0]
+            row_counts = np.bincount(rows, minlength=n_rows)
+            # values in each row are sorted in descending order
+            is_full = row_counts == top_n
+            thresholds[is_full] = sims[np.cumsum(row_counts)[is_full] - 1]
+    if not candidates:
+        return (np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int32),
+                np.zeros(n_rows, dtype=np.int64))
+    rows, cols, sims = _get_top_n_per_row(candidates, n_rows, top_n)
+    return sims, cols, np.bincount(rows, minlength=n_rows)
+
+
+def _get_top_n_per_row(chunks, n_rows, n):
+    """
+    Get the ``n`` largest values per row of a sparse matrix with ``n_rows`` rows,
+    given as ``chunks`` of (row, col, value) arrays, sorted by row, then in
+    descending order of value, then ascending order of column.
+
+    Returns:
+        Tuple[:class:`numpy.ndarray`]: Rows, cols, and values of the top entries.
+    """
+    rows, cols, values = (np.concatenate(arrays) for arrays in zip(*chunks))
+    order = np.lexsort((cols, -values, rows))
+    rows = rows[order]
+    row_lengths = np.bincount(rows, minlength=n_rows)
+    # rank of each entry within its row, given that rows are contiguous
+    row_starts = np.cumsum(row_lengths) - row_lengths
+    is_top = np.arange(len(rows)) - np.repeat(row_starts, row_lengths) < n
+    top_order = order[is_top]
+    return rows[is_top], cols[top_order], values[top_order]